@@ -21,7 +21,6 @@ The Main Module which serves as the brain of the code.
 
 # pylint: disable=no-member
 
-import difflib
 import importlib
 import os
 import sys
@@ -44,19 +43,28 @@ from scripts.base.cardgen import CardGambler
 from scripts.base.handlers import (
     AutocompleteHandler, ContextHandler, SlashHandler
 )
-from scripts.base.items import Item
+from scripts.base.items import Item, reconcile_indexes, run_in_db_pool
 from scripts.base.models import (
-    Blacklist, Checkpoints, CommandData,
-    Inventory, Nitro, Profiles
+    LEADERBOARD, Blacklist, Checkpoints, CommandData,
+    CommandDataWriter, Inventory, Nitro, Profiles
 )
 from scripts.base.shop import PremiumShop, Shop
 from scripts.base.views import MoreInfoView
+from scripts.helpers.assetcache import RemoteAssetCache
+from scripts.helpers.dispatch import CommandIndex
+from scripts.helpers.imageclasses import (
+    AvatarCache, BadgeGenerator,
+    GladitorMatchHandler, LeaderBoardGenerator,
+    ProfileCardGenerator, WalletGenerator
+)
 from scripts.helpers.logger import CustomLogger
+from scripts.helpers.renderer import RenderService
 # pylint: disable=cyclic-import
 from scripts.helpers.utils import (
-    dm_send, get_ascii, get_commands, get_embed,
+    dm_send, get_ascii, get_embed,
     get_formatted_time, get_modules, is_owner,
-    online_now, parse_command, prettify_discord
+    online_now, parse_command, prettify_discord,
+    showable_command
 )
 
 load_dotenv()
@@ -95,6 +103,7 @@ class PokeGambler(discord.AutoShardedClient):
         # Defaults
         self.active_channels = []
         self.ready = False
+        self.indexes_synced = False
         self.start_time = datetime.now()
         self.owner = None
         self.sess = None
@@ -128,6 +137,33 @@ class PokeGambler(discord.AutoShardedClient):
         #: The :class:`~scripts.base.handlers.AutocompleteHandler` for
         #:  handling command option autocomplete.
         self.autocompleter = AutocompleteHandler(self)
+        #: The :class:`~scripts.base.models.CommandDataWriter` for
+        #:  batching the command logs.
+        self.cmd_writer = CommandDataWriter(logger=self.logger)
+        #: The :class:`~scripts.helpers.dispatch.CommandIndex` for
+        #:  resolving the prefixed commands.
+        self.command_index = CommandIndex()
+        #: The :class:`~scripts.helpers.imageclasses.AvatarCache` for
+        #:  reusing the downloaded user avatars.
+        self.avatar_cache = AvatarCache(self.assets_path)
+        #: The :class:`~scripts.helpers.assetcache.RemoteAssetCache` for
+        #:  reusing the downloaded item images and backgrounds.
+        self.asset_cache = RemoteAssetCache(
+            os.path.join(self.assets_path, "remote")
+        )
+        #: The :class:`~scripts.helpers.renderer.RenderService` which
+        #:  draws and encodes the images off the event loop.
+        self.renderer = RenderService(
+            self.assets_path,
+            mode=os.getenv("RENDER_MODE", "thread"),
+            max_workers=int(os.getenv("RENDER_WORKERS", "2")),
+            max_queue=int(os.getenv("RENDER_QUEUE", "32")),
+            preload=(
+                BadgeGenerator, CardGambler,
+                GladitorMatchHandler, LeaderBoardGenerator,
+                ProfileCardGenerator, WalletGenerator
+            )
+        )
         # Commands
         for module in os.listdir("scripts/commands"):
             if module.endswith("commands.py"):
@@ -275,6 +311,19 @@ class PokeGambler(discord.AutoShardedClient):
 
         super().run(os.getenv('TOKEN'), *args, **kwargs)
 
+    async def close(self):
+        """Closes the connection to Discord after writing
+        the pending command logs to the DB.
+        """
+        await self.cmd_writer.close()
+        await self.asset_cache.close()
+        self.logger.pprint(
+            f"Render latencies (ms): {self.renderer.stats}",
+            color="blue"
+        )
+        self.renderer.close()
+        await super().close()
+
     async def on_guild_join(self, guild: discord.Guild):
         """Called when a :class:`discord.Guild` is either created
         by the :class:`PokeGambler` or when :class:`PokeGambler`
@@ -328,8 +377,12 @@ class PokeGambler(discord.AutoShardedClient):
         if not getattr(self, "owner", False):
             self.owner = self.get_user(self.owner_id)
         self.sess = aiohttp.ClientSession(loop=self.loop)
+        self.cmd_writer.start()
         self.__pprinter()
         self.ready = True
+        # Index builds can take a while, so don't hold up the startup.
+        self.loop.create_task(self.__sync_indexes())
+        await run_in_db_pool(LEADERBOARD.warm)
         Shop.refresh_tradables()
         PremiumShop.refresh_tradables()
         with suppress(topgg.ServerError):
@@ -397,14 +450,18 @@ class PokeGambler(discord.AutoShardedClient):
         for locked_cmd in list(self.pending_cmds):
             if locked_cmd in dir(cmd_class):
                 self.pending_cmds.pop(locked_cmd)
+        previous = getattr(self, f"{module_type}commands", None)
         cmd_obj = cmd_class(ctx=self)
+        # The docstrings only change when the module is reloaded.
+        if reload_module or previous is None:
+            cmd_obj.compile_schemas()
+        else:
+            cmd_obj.schemas = previous.schemas
         setattr(self, f"{module_type}commands", cmd_obj)
-        for attr in dir(cmd_obj):
-            attr_obj = getattr(cmd_obj, attr)
-            if 'autocomplete' in dir(attr_obj):
-                self.autocompleter.register(
-                    attr_obj, getattr(attr_obj, 'autocomplete')
-                )
+        for schema in cmd_obj.schemas.values():
+            if schema.autocomplete:
+                self.autocompleter.register(schema)
+        self.command_index.build(get_modules(self))
         return cmd_obj
 
 # Private Methods
@@ -449,7 +506,7 @@ class PokeGambler(discord.AutoShardedClient):
                     cmd_name, hasattr(method, "admin_only"),
                     kwargs["args"], opts
                 )
-                cmd_data.save()
+                await self.cmd_writer.put(cmd_data)
             if task := method(**kwargs):
                 await task
         except Exception:  # pylint: disable=broad-except
@@ -474,31 +531,15 @@ class PokeGambler(discord.AutoShardedClient):
         cmd = f'cmd_{parsed["Command"]}'
         args = parsed["Args"]
         option_dict = parsed["Kwargs"]
-        method = None
-        all_cmds = []
-        all_aliases = []
-        for com in get_modules(self):
-            if com.enabled:
-                method = getattr(com, cmd, None)
-                if method:
-                    return method, cmd, args, option_dict, cmd
-                all_cmds.extend([
-                    cmd_name.replace(self.prefix, '')
-                    for cmd_name in get_commands(
-                        self, message.author, com
-                    ).splitlines()
-                ])
-                all_aliases.extend([
-                    alias.replace("cmd_", "")
-                    for alias in com.alias
-                ])
-        all_cmd_names = all_cmds + all_aliases
-        closest = difflib.get_close_matches(
-            cmd.replace('cmd_', ''),
-            all_cmd_names,
-            n=1
+        method = self.command_index.get(cmd)
+        if method:
+            return method, cmd, args, option_dict, cmd
+        closest = self.command_index.suggest(
+            cmd,
+            accept=lambda method: showable_command(
+                self, method, message.author
+            )
         )
-        closest = closest[0] if closest else None
         return method, cmd, args, option_dict, closest
 
     async def __no_dm_cmds(self, message: Message):
@@ -619,6 +660,31 @@ class PokeGambler(discord.AutoShardedClient):
 
     # endregion
 
+    async def __sync_indexes(self):
+        if self.indexes_synced:
+            return
+        # Set beforehand, in case on_ready fires again meanwhile.
+        self.indexes_synced = True
+        report = await run_in_db_pool(reconcile_indexes)
+        for coll_name, result in report.items():
+            if result["created"] or result["updated"]:
+                self.logger.pprint(
+                    f"Indexes synced for {coll_name}: "
+                    f"{', '.join(result['created'] + result['updated'])}",
+                    color='blue'
+                )
+            for error in result["errors"]:
+                self.logger.pprint(
+                    f"Unable to sync indexes on {coll_name}: {error}",
+                    color='red',
+                    wrapped_func='__sync_indexes'
+                )
+            for shape in result["collscans"]:
+                self.logger.pprint(
+                    f"Collection scan on {coll_name} for {shape}.",
+                    color='yellow'
+                )
+
     def __pprinter(self):
         pretty = {
             itbl: prettify_discord(
@@ -723,6 +789,10 @@ class PokeGambler(discord.AutoShardedClient):
         )
         self.prefix = os.getenv('COMMAND_PREFIX', '->')
         self.cooldown_time = int(os.getenv('COOLDOWN_TIME', "5"))
+        # One of webp, gif or rounds (an image per round).
+        self.duel_replay = os.getenv('DUEL_REPLAY', "webp").lower()
+        # Max gamble matches running at once in a server.
+        self.gamble_limit = int(os.getenv('GAMBLE_LIMIT', "3"))
         self.is_prod = os.getenv('IS_PROD', "False") == "True"
         self.is_local = os.getenv('IS_LOCAL', "False") == "True"
         for cfg_id in (
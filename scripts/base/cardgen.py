@@ -20,7 +20,8 @@ The Base Card Generation Module
 """
 import os
 import random
-from typing import List, Optional
+from io import BytesIO
+from typing import Dict, List, Optional, Tuple
 
 from PIL import Image
 
@@ -29,13 +30,22 @@ class CardGambler:
     """
     The Pokecard Generator class.
 
+    All the watermarked card faces, along with the closed decks for
+    upto 15 cards, are built once on initialization, so that dealing
+    is just a lookup.
+
     :param assets_path: The path to the asset folder.
     :type assets_path: str
+    :param encode_cards: Also keep the JPEG bytes of every card?
+    :type encode_cards: Optional[bool]
     """
 
     # pylint: disable=too-many-instance-attributes
 
-    def __init__(self, assets_path: str = "assets"):
+    def __init__(
+        self, assets_path: str = "assets",
+        encode_cards: Optional[bool] = True
+    ):
         self.asset_path = assets_path
         self.pokecards_path = os.path.join(self.asset_path, "pokecards")
         self.basecards_path = os.path.join(self.asset_path, "basecards")
@@ -52,10 +62,30 @@ class CardGambler:
         self.watermark = Image.open(
             os.path.join(self.basecards_path, "pokecards-watermark.png")
         )
+        self.atlas: Dict[Tuple[str, str], Image.Image] = {
+            (suit, card): self.__build_card(suit, card)
+            for suit in self.suits
+            for card in self.cards
+        }
+        self.encoded: Dict[Tuple[str, str], bytes] = {}
+        if encode_cards:
+            self.encoded = {
+                key: self.__encode(card_img)
+                for key, card_img in self.atlas.items()
+            }
+            self.encoded[("joker", "JOKER.jpg")] = self.__encode(
+                self.joker_card.convert('RGB')
+            )
+        self._closed_decks: Dict[Tuple[int, int], Tuple[
+            Image.Image, bytes
+        ]] = {}
+        self.prewarm_closed_decks()
 
     def get_card(self, suit: str, card: str) -> Image.Image:
         """Gets the image of a specific card.
 
+        .. note:: The image is shared, so copy it before drawing on it.
+
         :param suit: The suit of the card.
         :type suit: str
         :param card: The card number.
@@ -65,10 +95,21 @@ class CardGambler:
         """
         if ".jpg" not in card:
             card = f"{card.upper()}.jpg"
-        facecard = Image.open(
-            os.path.join(self.pokecards_path, suit, card)
-        ).convert('RGBA')
-        return Image.alpha_composite(facecard, self.watermark).convert('RGB')
+        return self.atlas[(suit, card)]
+
+    def get_card_bytes(self, suit: str, card: str) -> Optional[bytes]:
+        """Gets the pre-encoded JPEG bytes of a specific card.
+
+        :param suit: The suit of the card.
+        :type suit: str
+        :param card: The card number.
+        :type card: str
+        :return: The JPEG bytes, None if the cards weren't encoded.
+        :rtype: Optional[bytes]
+        """
+        if ".jpg" not in card:
+            card = f"{card.upper()}.jpg"
+        return self.encoded.get((suit, card))
 
     @staticmethod
     def get_deck(
@@ -119,8 +160,36 @@ class CardGambler:
         :return: The closed deck image.
         :rtype: :class:`PIL.Image.Image`
         """
-        cards = [self.closed_card for _ in range(num_cards)]
-        return self.get_deck(cards, sep=sep, reverse=True)
+        return self.__get_closed_deck(sep, num_cards)[0].copy()
+
+    def get_closed_deck_bytes(
+        self, sep: Optional[int] = 5,
+        num_cards: Optional[int] = 12
+    ) -> bytes:
+        """Gets the JPEG bytes of a deck of closed cards.
+
+        :param sep: The seperation width, defaults to 5
+        :type sep: Optional[int]
+        :param num_cards: Number of cards, defaults to 12
+        :type num_cards: Optional[int]
+        :return: The encoded closed deck.
+        :rtype: bytes
+        """
+        return self.__get_closed_deck(sep, num_cards)[1]
+
+    def prewarm_closed_decks(
+        self, sep: Optional[int] = 5,
+        max_cards: Optional[int] = 15
+    ):
+        """Renders and encodes the closed decks upto max_cards cards.
+
+        :param sep: The seperation width, defaults to 5
+        :type sep: Optional[int]
+        :param max_cards: The largest deck to build, defaults to 15
+        :type max_cards: Optional[int]
+        """
+        for num_cards in range(1, max_cards + 1):
+            self.__get_closed_deck(sep, num_cards)
 
     def get_random_card(self) -> Image.Image:
         """Alias for :func:`get_random_cards` with ``num_cards = 1``.
@@ -168,7 +237,8 @@ class CardGambler:
             cards.append({
                 "card_num": card_num,
                 "suit": suit,
-                "card_img": card_img
+                "card_img": card_img,
+                "card_bytes": self.get_card_bytes(suit, card_num)
             })
         random.shuffle(cards)
         return cards
@@ -189,3 +259,26 @@ class CardGambler:
             for _ in range(num_cards)
         ]
         return self.get_deck(cards, **kwargs)
+
+    def __get_closed_deck(
+        self, sep: int,
+        num_cards: int
+    ) -> Tuple[Image.Image, bytes]:
+        key = (num_cards, sep)
+        if key not in self._closed_decks:
+            cards = [self.closed_card for _ in range(num_cards)]
+            deck = self.get_deck(cards, sep=sep, reverse=True)
+            self._closed_decks[key] = (deck, self.__encode(deck))
+        return self._closed_decks[key]
+
+    def __build_card(self, suit: str, card: str) -> Image.Image:
+        facecard = Image.open(
+            os.path.join(self.pokecards_path, suit, card)
+        ).convert('RGBA')
+        return Image.alpha_composite(facecard, self.watermark).convert('RGB')
+
+    @staticmethod
+    def __encode(card_img: Image.Image) -> bytes:
+        byio = BytesIO()
+        card_img.save(byio, "JPEG")
+        return byio.getvalue()
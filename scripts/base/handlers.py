@@ -23,10 +23,13 @@ Module which extends Discord.py to allow for custom application commands.
 
 from __future__ import annotations
 
+import hashlib
 import inspect
 import itertools
+import json
+import os
 from typing import (
-    TYPE_CHECKING, Any, Callable, Coroutine,
+    TYPE_CHECKING, Any, Callable,
     Dict, List, Optional, Tuple, Type, Union
 )
 
@@ -37,7 +40,7 @@ from discord.http import Route
 
 from scripts.base.enums import OptionTypes
 
-from ..helpers.parsers import CustomRstParser
+from ..helpers.parsers import CommandSchema
 from ..helpers.utils import get_modules
 from .components import (
     AppCommand, ContextMenu, GuildEvent,
@@ -254,6 +257,20 @@ class CommandListing(list):
                     )
 
 
+def get_schema(command: Callable) -> Optional[CommandSchema]:
+    """Gets the compiled schema of a bound command method.
+
+    :param command: The command method.
+    :type command: Callable
+    :return: The schema, None if the command isn't documented.
+    :rtype: Optional[:class:`~scripts.helpers.parsers.CommandSchema`]
+    """
+    module = getattr(command, "__self__", None)
+    if module is None or not hasattr(module, "get_schema"):
+        return None
+    return module.get_schema(command)
+
+
 def command_to_dict(
     command: Callable,
     local: Optional[bool] = False
@@ -267,53 +284,62 @@ def command_to_dict(
     :return: Dictionary representation of the command.
     :rtype: Dict[str, Any]
     """
-    description = command.__doc__.split("\n")[0]
-    with CustomRstParser() as rst_parser:
-        rst_parser.parse(command.__doc__)
-        meta = rst_parser.meta
-        options = rst_parser.parsed_params
-    desc = meta.description
-    if len(desc) <= 100:
-        description = desc
-    options = sorted(options, key=lambda x: -x['required'])
-    # Fix for Discord API not supporting Default Option
-    for option in options:
-        option.pop('default', None)
-    cmd_name = command.__name__.replace("cmd_", "")
-    if local:
-        cmd_name += "_"
-    return {
-        "name": cmd_name,
-        "description": description,
-        "type": 1,
-        "options": options
-    }
+    return CommandSchema.from_command(command).to_dict(local=local)
 
 
 class SlashHandler:
     """
     | Class which handles custom slash commands.
     | It is an extension of Discord.py's http module.
+
+    :param ctx: The pokegambler client.
+    :type ctx: :class:`bot.PokeGambler`
+    :param manifest_path: The file to store the last synced state in.
+    :type manifest_path: Optional[str]
     """
-    def __init__(self, ctx: PokeGambler):
+    def __init__(
+        self, ctx: PokeGambler,
+        manifest_path: Optional[str] = None
+    ):
         self.ctx = ctx
         self.http = ctx.http
         self.component_class = SlashCommand
         self.registered = CommandListing(self)
         self.official_roles = {}
         self.update_counter = 0
+        #: Where the hashes of the last synced payloads are stored.
+        self.manifest_path = manifest_path or os.path.join(
+            os.path.dirname(ctx.error_log_path), "slash_manifest.json"
+        )
+
+    async def add_slash_commands(
+        self, force: bool = False,
+        **kwargs
+    ) -> Dict[str, Dict[str, List[str]]]:
+        """Syncs all the slash commands to the guild/globally.
+
+        The payloads are grouped by scope (global, official guild and
+        local guild), and hashed. A scope is overwritten in bulk with a
+        single request, only if its hashes differ from the last synced
+        manifest.
 
-    async def add_slash_commands(self, **kwargs):
-        """Add all slash commands to the guild/globally.
+        .. note::
 
+            The global scope also carries the context menu commands,
+            as a bulk overwrite would remove them otherwise.
+
+        :param force: Overwrite every scope, ignoring the manifest?
+        :type force: bool
         :param kwargs: Keyword arguments to pass to the route.
         :type kwargs: Dict
+        :return: The added, changed and removed commands per scope.
+        :rtype: Dict[str, Dict[str, List[str]]]
         """
         if not any([
             self.ctx.is_prod,
             self.ctx.is_local
         ]):
-            return
+            return {}
         if not self.official_roles:
             self.official_roles = {
                 role.name: role.id
@@ -321,29 +347,39 @@ class SlashHandler:
                     self.ctx.official_server
                 ).roles
             }
-        current_commands = []
-        for module in get_modules(self.ctx):
-            current_commands.extend(
-                getattr(module, attr)
-                for attr in dir(module)
-                if (
-                    attr.startswith("cmd_")
-                    and "no_slash" not in dir(
-                        getattr(module, attr)
-                    )
-                )
+        scopes = self.__get_scopes(**kwargs)
+        manifest = {} if force else self.__load_manifest()
+        # Scopes which were synced before, but have no commands anymore.
+        for scope, synced in manifest.items():
+            scopes.setdefault(
+                scope, {"guild_id": synced["guild_id"], "payloads": {}}
             )
-        current_commands = sorted(
-            list(set(current_commands)),
-            key=current_commands.index
-        )
-        await self.__sync_commands(current_commands, **kwargs)
-        for command in current_commands:
-            await self.register_command(command, **kwargs)
-        msg = f"Succesfully synced {len(self.registered)} slash commands."
-        if not self.update_counter:
-            msg = 'No commands require sync.'
-        self.ctx.logger.pprint(msg, color='green')
+        report = {}
+        for scope, desired in scopes.items():
+            hashes = {
+                key: self.__get_hash(payload)
+                for key, payload in desired["payloads"].items()
+            }
+            synced = manifest.get(scope, {})
+            diff = self.__get_diff(hashes, synced.get("commands", {}))
+            if all([
+                not force,
+                synced.get("guild_id") == desired["guild_id"],
+                not any(diff.values())
+            ]):
+                continue
+            if await self.__overwrite(
+                scope, desired["guild_id"],
+                list(desired["payloads"].values())
+            ):
+                report[scope] = diff
+                manifest[scope] = {
+                    "guild_id": desired["guild_id"],
+                    "commands": hashes
+                }
+        self.__save_manifest(manifest)
+        self.__log_report(report)
+        return report
 
     async def delete_command(
         self, command: Union[SlashCommand, Dict],
@@ -433,18 +469,12 @@ class SlashHandler:
             'args': [],
             'mentions': []
         }
-        method = None
         cmd = f'cmd_{data["name"]}'
         if self.ctx.is_local:
             cmd = cmd.rstrip('_')
-        for com in get_modules(self.ctx):
-            if com.enabled:
-                method = getattr(com, cmd, None)
-                if method:
-                    break
-        with CustomRstParser() as rst_parser:
-            rst_parser.parse(method.__doc__)
-            param_names = rst_parser.param_names
+        method = self.ctx.command_index.get(cmd)
+        schema = get_schema(method)
+        param_names = schema.param_names if schema else []
         for opt in data.get('options', {}):
             if opt['name'] in param_names:
                 if opt['type'] == OptionTypes.USER.value:
@@ -497,24 +527,12 @@ class SlashHandler:
             f"[{self.update_counter}] Registering the command: {cmd_name}",
             color='blue'
         )
-        payload = self.__prep_payload(command)
+        payload = self.__get_payload(command)
         if not payload:
             return {}
-        if hasattr(command, "os_only") and self.ctx.is_prod:
-            route = self.get_route(guild_id=self.ctx.official_server)
-        elif self.ctx.is_local:
-            route = self.get_route(**kwargs)
-        else:
-            route = self.get_route()
-        if any(
-            hasattr(command, perm)
-            for perm in (
-                'admin_only',
-                'owner_only'
-            )
-        ) and self.ctx.is_prod:
-            route = self.get_route(guild_id=self.ctx.official_server)
-            payload["default_member_permission"] = "0"
+        route = self.get_route(
+            guild_id=self.__get_scope(command, **kwargs)[1]
+        )
         try:
             resp = await self.http.request(route, json=payload)
             self.registered.remove(cmd_name)
@@ -532,23 +550,8 @@ class SlashHandler:
             return {}
 
     def __params_matched(self, command, cmd_name):
-        params = {}
-        with CustomRstParser() as rst_parser:
-            rst_parser.parse(command.__doc__)
-            if rst_parser.params:
-                params = {
-                    key: {
-                        field: val
-                        for field, val in param.parse().items()
-                        if all([
-                            val is not None,
-                            # Fix for Discord API not supporting Default option
-                            field != 'default'
-                        ])
-                    }
-                    for key, param in rst_parser.params.items()
-                    if key != 'message'
-                }
+        schema = get_schema(command)
+        params = schema.params if schema else {}
         registered_cmd_params = self.registered[cmd_name].parameters
         return params == registered_cmd_params
 
@@ -562,24 +565,167 @@ class SlashHandler:
         """
         if getattr(command, "disabled", False):
             return {}
-        if not command.__doc__:
+        schema = get_schema(command)
+        if schema is None:
             return {}
-        return command_to_dict(
-            command, local=self.ctx.is_local
-        )
+        return schema.to_dict(local=self.ctx.is_local)
 
-    async def __sync_commands(self, current_commands, **kwargs):
+    def __get_scopes(self, **kwargs) -> Dict[str, Dict[str, Any]]:
+        current_commands = []
+        for module in get_modules(self.ctx):
+            current_commands.extend(
+                getattr(module, attr)
+                for attr in dir(module)
+                if (
+                    attr.startswith("cmd_")
+                    and "no_slash" not in dir(
+                        getattr(module, attr)
+                    )
+                )
+            )
+        current_commands = sorted(
+            list(set(current_commands)),
+            key=current_commands.index
+        )
+        scopes = {}
+        for command in current_commands:
+            payload = self.__get_payload(command)
+            if not payload:
+                continue
+            scope, guild_id = self.__get_scope(command, **kwargs)
+            scopes.setdefault(
+                scope, {"guild_id": guild_id, "payloads": {}}
+            )["payloads"][self.__get_key(payload)] = payload
         if not self.ctx.is_local:
-            await self.registered.refresh(fresh=True)
-        await self.registered.refresh(**kwargs)
-        pad = '' if not self.ctx.is_local else '_'
-        cmds = [
-            cmd.__name__.replace('cmd_', '') + pad
-            for cmd in current_commands
-        ]
-        for command in self.registered:
-            if command.name not in cmds:
-                await self.delete_command(command, **kwargs)
+            global_scope = scopes.setdefault(
+                "global", {"guild_id": None, "payloads": {}}
+            )
+            for payload in self.ctx.ctx_cmds.get_payloads():
+                global_scope["payloads"][self.__get_key(payload)] = payload
+        return scopes
+
+    def __log_report(self, report: Dict[str, Dict[str, List[str]]]):
+        self.update_counter = sum(
+            len(keys)
+            for diff in report.values()
+            for keys in diff.values()
+        )
+        for scope, diff in report.items():
+            self.ctx.logger.pprint(
+                f"[{scope}] " + ", ".join(
+                    f"{change}: {keys or '-'}"
+                    for change, keys in diff.items()
+                ),
+                color='blue'
+            )
+        msg = f"Succesfully synced {len(report)} slash command scopes."
+        if not report:
+            msg = 'No commands require sync.'
+        self.ctx.logger.pprint(msg, color='green')
+
+    @staticmethod
+    def __get_diff(
+        hashes: Dict[str, str],
+        old_hashes: Dict[str, str]
+    ) -> Dict[str, List[str]]:
+        return {
+            "added": sorted(set(hashes) - set(old_hashes)),
+            "changed": sorted(
+                key for key in set(hashes) & set(old_hashes)
+                if hashes[key] != old_hashes[key]
+            ),
+            "removed": sorted(set(old_hashes) - set(hashes))
+        }
+
+    def __get_payload(self, command: Callable) -> Dict:
+        payload = self.__prep_payload(command)
+        if payload and self.ctx.is_prod and any(
+            hasattr(command, perm)
+            for perm in (
+                'admin_only',
+                'owner_only'
+            )
+        ):
+            payload["default_member_permission"] = "0"
+        return payload
+
+    def __get_scope(
+        self, command: Callable,
+        **kwargs
+    ) -> Tuple[str, Optional[int]]:
+        scope = ("global", None)
+        if hasattr(command, "os_only") and self.ctx.is_prod:
+            scope = ("official", self.ctx.official_server)
+        elif self.ctx.is_local:
+            scope = ("local", kwargs.get("guild_id"))
+        if any(
+            hasattr(command, perm)
+            for perm in (
+                'admin_only',
+                'owner_only'
+            )
+        ) and self.ctx.is_prod:
+            scope = ("official", self.ctx.official_server)
+        return scope
+
+    async def __overwrite(
+        self, scope: str, guild_id: Optional[int],
+        payloads: List[Dict]
+    ) -> bool:
+        route = self.get_route("PUT", guild_id=guild_id)
+        try:
+            resp = await self.http.request(route, json=payloads)
+        except discord.HTTPException as excp:
+            self.ctx.logger.pprint(
+                f"[{scope}] {str(excp).splitlines()[-1]}",
+                color='red'
+            )
+            return False
+        # The scope now holds exactly the commands in the response.
+        for command in list(self.registered):
+            if str(command.guild_id or '') == str(guild_id or ''):
+                self.registered.remove(command)
+        for command in resp:
+            if command['type'] not in self.component_class.types():
+                continue
+            for option in command.get('options', []):
+                option['autocomplete'] = option.get('autocomplete', False)
+            self.registered.append(command)
+        return True
+
+    def __load_manifest(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.manifest_path, encoding="utf-8") as fptr:
+                manifest = json.load(fptr)
+        except (OSError, ValueError):
+            return {}
+        if manifest.get("application_id") != self.ctx.user.id:
+            return {}
+        return manifest.get("scopes", {})
+
+    def __save_manifest(self, scopes: Dict[str, Dict[str, Any]]):
+        with open(self.manifest_path, "w", encoding="utf-8") as fptr:
+            json.dump(
+                {
+                    "application_id": self.ctx.user.id,
+                    "scopes": scopes
+                },
+                fptr, indent=4, sort_keys=True
+            )
+
+    @staticmethod
+    def __get_hash(payload: Dict) -> str:
+        return hashlib.sha1(
+            json.dumps(
+                payload, sort_keys=True, separators=(',', ':')
+            ).encode()
+        ).hexdigest()
+
+    @staticmethod
+    def __get_key(payload: Dict) -> str:
+        if payload.get("type", 1) == 1:
+            return payload["name"]
+        return f"{payload['name']} (menu)"
 
     @staticmethod
     def __get_entity(val, getter, alt_getter=None):
@@ -667,6 +813,28 @@ class ContextHandler:
             path=path
         )
 
+    def get_payloads(self) -> List[Dict[str, Any]]:
+        """Get the payloads of all the decorated Context Menu commands.
+
+        :return: The payloads, as they would be registered.
+        :rtype: List[Dict[str, Any]]
+        """
+        names = {
+            getattr(module, cmd).__name__.title().replace('Cmd_', '')
+            for module in get_modules(self.ctx)
+            for cmd in dir(module)
+            if cmd.startswith('cmd_') and hasattr(
+                getattr(module, cmd), 'ctx_command'
+            )
+        }
+        return [
+            {
+                "name": name,
+                "type": 2
+            }
+            for name in sorted(names)
+        ]
+
     async def register_command(
         self, callback: Callable,
         type_: Optional[int] = 2
@@ -748,20 +916,16 @@ class AutocompleteHandler:
         self.commands = {}
         self.cache = TTLCache(maxsize=10, ttl=60)
 
-    def register(
-        self, cmd: Coroutine,
-        callback_dict: Dict[str, Callable[
-            [discord.Interaction], List[Any]
-        ]]
-    ):
+    def register(self, schema: CommandSchema):
         """Register a command with its choices.
 
-        :param cmd: The command to register.
-        :param callback_dict: The callback dictionary.
+        :param schema: The compiled schema of the command.
+        :type schema: :class:`~scripts.helpers.parsers.CommandSchema`
         """
-        cmd_dict = command_to_dict(cmd, local=self.ctx.is_local)
-        cmd = SlashCommand.from_dict(cmd_dict)
-        self.commands[cmd] = callback_dict
+        cmd = SlashCommand.from_dict(
+            schema.to_dict(local=self.ctx.is_local)
+        )
+        self.commands[cmd] = schema.autocomplete
 
     def unregister(self, cmd: SlashCommand):
         """Unregister a command.
@@ -20,25 +20,32 @@ This module contains schematics for all the items in the Pokegambler world.
 """
 
 # pylint: disable=no-member, unused-argument
-# pylint: disable=too-many-instance-attributes
+# pylint: disable=too-many-instance-attributes, too-many-lines
+# pylint: disable=too-many-public-methods
 
 from __future__ import annotations
 
+import asyncio
 import os
 import random
 import re
 from abc import ABC
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime
-from functools import total_ordering
+from functools import partial, total_ordering
 from hashlib import md5
 from io import BytesIO
-from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Type
+from typing import (
+    TYPE_CHECKING, Any, Callable, Dict,
+    List, Optional, Tuple, Type
+)
 
 import certifi
 from dotenv import load_dotenv
 from PIL import Image
-from pymongo import MongoClient
+from pymongo import IndexModel, MongoClient
+from pymongo.errors import PyMongoError
 
 # pylint: disable=cyclic-import
 from ..helpers.utils import dedent, get_embed
@@ -47,6 +54,8 @@ if TYPE_CHECKING:
     from aiohttp import ClientSession
     from discord import Embed
 
+    from ..helpers.assetcache import RemoteAssetCache
+
 load_dotenv()
 
 DB_CLIENT = MongoClient(
@@ -54,6 +63,120 @@ DB_CLIENT = MongoClient(
     tlsCAfile=certifi.where()
 ).pokegambler
 
+#: Bounded pool of worker threads which runs the blocking pymongo calls,
+#: so that slow queries don't stall the discord.py event loop.
+DB_EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.getenv("DB_POOL_SIZE", "8")),
+    thread_name_prefix="pg-mongo"
+)
+
+
+async def run_in_db_pool(func: Callable, *args, **kwargs) -> Any:
+    """Runs a blocking DB call in the :data:`DB_EXECUTOR` and awaits it.
+    Can wrap any of the synchronous Model/Item methods.
+
+    :param func: The blocking callable to execute.
+    :type func: Callable
+    :return: The return value of the callable.
+    :rtype: Any
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        DB_EXECUTOR, partial(func, *args, **kwargs)
+    )
+
+
+#: Indexes and query shapes declared for each collection.
+#: Models declare them as class attributes, which are registered
+#: by :class:`~scripts.base.models.NameSetter`.
+INDEX_REGISTRY: Dict[str, Dict[str, List]] = {}
+
+
+def register_indexes(
+    collection: str,
+    indexes: Optional[List[IndexModel]] = None,
+    query_shapes: Optional[List[Dict]] = None
+):
+    """Registers the indexes and the hot query filters of a collection
+    for :func:`reconcile_indexes`.
+
+    :param collection: The name of the collection.
+    :type collection: str
+    :param indexes: The indexes which the collection should have.
+    :type indexes: Optional[List[:class:`pymongo.IndexModel`]]
+    :param query_shapes: Sample filters which should be served by an index.
+    :type query_shapes: Optional[List[Dict]]
+    """
+    entry = INDEX_REGISTRY.setdefault(
+        collection, {"indexes": [], "query_shapes": []}
+    )
+    entry["indexes"].extend(indexes or [])
+    entry["query_shapes"].extend(query_shapes or [])
+
+
+def reconcile_indexes() -> Dict[str, Dict[str, List]]:
+    """Creates the missing registered indexes, updates drifted TTLs
+    and explains the registered query shapes to find collection scans.
+    Blocking, so run it via :func:`run_in_db_pool`.
+
+    :return: Created/updated indexes, errors and scanning queries
+        for each collection.
+    :rtype: Dict[str, Dict[str, List]]
+    """
+    def has_collscan(plan: Any) -> bool:
+        if isinstance(plan, dict):
+            if plan.get("stage") == "COLLSCAN":
+                return True
+            return any(has_collscan(val) for val in plan.values())
+        if isinstance(plan, list):
+            return any(has_collscan(val) for val in plan)
+        return False
+
+    report = {}
+    for coll_name, entry in INDEX_REGISTRY.items():
+        coll = DB_CLIENT[coll_name]
+        result = {
+            "created": [], "updated": [],
+            "errors": [], "collscans": []
+        }
+        report[coll_name] = result
+        try:
+            existing = coll.index_information()
+        except PyMongoError as excp:
+            result["errors"].append(str(excp))
+            continue
+        for idx in entry["indexes"]:
+            name = idx.document["name"]
+            ttl = idx.document.get("expireAfterSeconds")
+            try:
+                if name not in existing:
+                    coll.create_indexes([idx])
+                    result["created"].append(name)
+                elif existing[name].get("expireAfterSeconds") != ttl:
+                    DB_CLIENT.command(
+                        "collMod", coll_name,
+                        index={"name": name, "expireAfterSeconds": ttl}
+                    )
+                    result["updated"].append(name)
+            except PyMongoError as excp:
+                result["errors"].append(f"{name}: {excp}")
+        for shape in entry["query_shapes"]:
+            try:
+                plan = coll.find(shape).explain().get("queryPlanner", {})
+            except PyMongoError as excp:
+                result["errors"].append(f"{shape}: {excp}")
+                continue
+            if has_collscan(plan.get("winningPlan")):
+                result["collscans"].append(shape)
+    return report
+
+
+register_indexes(
+    "items",
+    indexes=[IndexModel("name")],
+    query_shapes=[{"name": ""}]
+)
+
 
 # region Base Classes
 @dataclass
@@ -126,14 +249,21 @@ class Item(ABC):
             )
         )
 
-    async def get_image(self, sess: ClientSession) -> Image.Image:
+    async def get_image(
+        self, sess: ClientSession,
+        cache: Optional[RemoteAssetCache] = None
+    ) -> Image.Image:
         """Downloads and returns the image of the item.
 
         :param sess: An aiohttp ClientSession object.
         :type sess: :class:`aiohttp.ClientSession`
+        :param cache: The cache to reuse the downloaded images from.
+        :type cache: Optional[:class:`~scripts.helpers.assetcache.RemoteAssetCache`]
         :return: The image of the item.
         :rtype: :class:`PIL.Image.Image`
         """
+        if cache is not None:
+            return await cache.get_image(sess, self.asset_url)
         byio = BytesIO()
         async with sess.get(self.asset_url) as resp:
             data = await resp.read()
@@ -157,6 +287,12 @@ class Item(ABC):
         attrs["created_on"] = datetime.now()
         self.mongo.insert_one(attrs)
 
+    async def asave(self):
+        """
+        Awaitable version of :meth:`save`.
+        """
+        await run_in_db_pool(self.save)
+
     def update(
         self, modify_all: Optional[bool] = False,
         **kwargs
@@ -251,6 +387,42 @@ class Item(ABC):
             return None
         return cls._new_item(item, force_new=force_new)
 
+    @classmethod
+    async def afrom_id(
+        cls: Type[Item], itemid: str,
+        force_new: bool = False
+    ) -> Item:
+        """Awaitable version of :meth:`from_id`.
+
+        :param itemid: The id of the Item.
+        :type itemid: str
+        :param force_new: Force a new Item to be created, defaults to False.
+        :type force_new: bool
+        :return: The existing/newly created Item.
+        :rtype: :class:`Item`
+        """
+        return await run_in_db_pool(
+            cls.from_id, itemid, force_new=force_new
+        )
+
+    @classmethod
+    async def abulk_from_id(
+        cls: Type[Item], itemids: List[str],
+        force_new: bool = False
+    ) -> List[Item]:
+        """Awaitable version of :meth:`bulk_from_id`.
+
+        :param itemids: The ids of the Items.
+        :type itemids: List[str]
+        :param force_new: Force a new Item to be created, defaults to False.
+        :type force_new: bool
+        :return: The existing/newly created Items.
+        :rtype: List[:class:`Item`]
+        """
+        return await run_in_db_pool(
+            cls.bulk_from_id, itemids, force_new=force_new
+        )
+
     @classmethod
     def bulk_from_id(
         cls: Type[Item], itemids: List[str],
@@ -24,26 +24,318 @@ This module contains a compilation of data models.
 
 from __future__ import annotations
 
+import asyncio
 import os
+import threading
+import time
+from contextlib import suppress
+from copy import deepcopy
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from functools import wraps
 from inspect import ismethod
+from types import MappingProxyType
 from typing import (
     TYPE_CHECKING, Any, Callable, Dict, Iterable,
-    List, Optional, Tuple, Type, Union
+    List, Mapping, Optional, Tuple, Type, Union
 )
 
 import discord
 from bson import ObjectId
+from cachetools import TTLCache
 from discord import Guild, Member, Role, TextChannel, User
-from pymongo import UpdateOne
+from pymongo import IndexModel, ReturnDocument, UpdateOne
 
 if TYPE_CHECKING:
     from bot import PokeGambler
+    from ..helpers.logger import CustomLogger
 
 # pylint: disable=cyclic-import, wrong-import-position
-from ..base.items import DB_CLIENT, Item
+from ..base.items import (
+    DB_CLIENT, DB_EXECUTOR, Item, register_indexes, run_in_db_pool
+)
+from ..helpers.ranking import RankIndex
+from ..helpers.utils import CacheStats
+
+
+class ModelCache(CacheStats):
+    """Process-wide LRU + TTL cache for the documents of
+    :class:`UnlockedModel`, keyed by (model_name, user_id).
+    Thread-safe, since models are also built inside the DB pool.
+
+    :param maxsize: The maximum number of cached documents.
+    :type maxsize: int
+    :param ttl: Seconds after which a cached document goes stale.
+    :type ttl: float
+    """
+
+    def __init__(self, maxsize: int = 4096, ttl: float = 300.0):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        # Bumped on every invalidation, so that a document read
+        # before a concurrent write doesn't get cached.
+        self._epoch = 0
+
+    @property
+    def stats(self) -> Dict[str, Union[int, float]]:
+        """Hit/Miss statistics of the cache.
+
+        :return: The counters along with the hit ratio and size.
+        :rtype: Dict[str, Union[int, float]]
+        """
+        return self.get_stats(self._cache)
+
+    def fetch(
+        self, key: Tuple[str, str],
+        loader: Callable[[], Optional[Dict]]
+    ) -> Optional[Dict]:
+        """Returns a copy of the cached document for the key,
+        calling the loader to populate it on a miss.
+
+        :param key: The (model_name, user_id) pair.
+        :type key: Tuple[str, str]
+        :param loader: Queries the document from the DB.
+        :type loader: Callable[[], Optional[Dict]]
+        :return: The document, None if it doesn't exist.
+        :rtype: Optional[Dict]
+        """
+        with self._lock:
+            doc = self._cache.get(key)
+            epoch = self._epoch
+            if doc is not None:
+                self.hits += 1
+                return deepcopy(doc)
+            self.misses += 1
+        doc = loader()
+        if doc is not None:
+            with self._lock:
+                if epoch == self._epoch:
+                    self._cache[key] = deepcopy(doc)
+        return doc
+
+    def invalidate(
+        self, model_name: str,
+        user_id: Optional[str] = None
+    ):
+        """Drops the cached document of a user for a model,
+        or all the documents of the model if no user is given.
+
+        :param model_name: The name of the model.
+        :type model_name: str
+        :param user_id: The ID of the user.
+        :type user_id: Optional[str]
+        """
+        with self._lock:
+            self._epoch += 1
+            if user_id is not None:
+                self._cache.pop((model_name, user_id), None)
+                return
+            for key in [
+                key for key in self._cache
+                if key[0] == model_name
+            ]:
+                self._cache.pop(key, None)
+
+
+#: The :class:`ModelCache` shared by all the :class:`UnlockedModel`.
+MODEL_CACHE = ModelCache(
+    maxsize=int(os.getenv("MODEL_CACHE_SIZE", "4096")),
+    ttl=float(os.getenv("MODEL_CACHE_TTL", "300"))
+)
+
+
+class Leaderboard:
+    """Materialized leaderboard of the :class:`Profiles` with atleast
+    one win, kept in memory and updated whenever a ranking field of a
+    Profile changes. Ranks are looked up in O(log n) and pages of
+    k entries are read in O(log n + k).
+    """
+
+    #: The supported orderings and their (descending) sort fields.
+    orderings: Dict[str, Tuple[str, ...]] = {
+        "wins": ("num_wins", "num_matches", "balance"),
+        "balance": ("balance",)
+    }
+    #: The fields stored for every entry.
+    fields: Tuple[str, ...] = (
+        "user_id", "name", "num_wins", "num_matches", "balance"
+    )
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        # Serializes the rebuilds, which run without holding _lock.
+        self._build_lock = threading.Lock()
+        self._entries: Dict[str, Dict] = {}
+        self._indexes = self._new_indexes()
+        self._warm = False
+        # Bumped on every invalidation, to discard outdated rebuilds.
+        self._generation = 0
+        # Changes made while a rebuild is running, replayed after it.
+        self._pending: Optional[List[Tuple[Callable, Any]]] = None
+
+    def __len__(self) -> int:
+        self.warm()
+        return len(self._entries)
+
+    def invalidate(self):
+        """
+        Drops the materialized leaderboard and rebuilds it in the
+        :data:`~scripts.base.items.DB_EXECUTOR`, so that the full scan
+        never runs on the event loop.
+        """
+        with self._lock:
+            self._generation += 1
+            self._warm = False
+            self._entries = {}
+            self._indexes = self._new_indexes()
+        DB_EXECUTOR.submit(self.warm)
+
+    def page(
+        self, start: int = 0,
+        stop: Optional[int] = None,
+        ordering: str = "wins"
+    ) -> List[Dict]:
+        """Reads a slice of the leaderboard.
+
+        :param start: The 0-based position of the first entry.
+        :type start: int
+        :param stop: The position to stop at., default is the end.
+        :type stop: Optional[int]
+        :param ordering: One of the :attr:`orderings`., default is wins.
+        :type ordering: str
+        :return: Copies of the entries in the slice.
+        :rtype: List[Dict]
+        """
+        self.warm()
+        with self._lock:
+            return [
+                dict(self._entries[key[-1]])
+                for key in self._indexes[ordering].islice(start, stop)
+            ]
+
+    def rank(self, user_id: str, ordering: str = "wins") -> int:
+        """Looks up the rank of a user.
+
+        :param user_id: The ID of the user.
+        :type user_id: str
+        :param ordering: One of the :attr:`orderings`., default is wins.
+        :type ordering: str
+        :return: The 1-based rank, 0 if the user isn't ranked.
+        :rtype: int
+        """
+        self.warm()
+        with self._lock:
+            if (entry := self._entries.get(user_id)) is None:
+                return 0
+            return self._indexes[ordering].rank(
+                self._key(ordering, entry)
+            ) + 1
+
+    def refresh(self, document: Dict):
+        """Updates the entry of a user after their Profile changes.
+
+        :param document: The updated fields of the Profile.
+        :type document: Dict
+        """
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((self._refresh, document))
+            elif self._warm:
+                self._refresh(document)
+
+    def remove(self, user_id: str):
+        """Removes a user from the leaderboard.
+
+        :param user_id: The ID of the user.
+        :type user_id: str
+        """
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((self._remove, user_id))
+            self._remove(user_id)
+
+    def warm(self):
+        """
+        Builds the leaderboard from the DB, if it isn't built already.
+        The scan runs without holding the lock, so the updates from
+        other threads aren't blocked meanwhile.
+        """
+        with self._build_lock:
+            while True:
+                with self._lock:
+                    if self._warm:
+                        return
+                    generation = self._generation
+                    self._pending = []
+                entries: Dict[str, Dict] = {}
+                indexes = self._new_indexes()
+                try:
+                    for doc in Profiles.mongo.find(
+                        {"num_wins": {"$gte": 1}},
+                        {field: 1 for field in self.fields}
+                    ):
+                        doc.pop("_id", None)
+                        self._insert(doc, entries, indexes)
+                except BaseException:
+                    with self._lock:
+                        self._pending = None
+                    raise
+                with self._lock:
+                    pending, self._pending = self._pending, None
+                    # Else it was invalidated meanwhile, so scan again.
+                    if generation == self._generation:
+                        self._entries = entries
+                        self._indexes = indexes
+                        self._warm = True
+                        for apply, arg in pending:
+                            apply(arg)
+
+    def _insert(
+        self, entry: Dict,
+        entries: Optional[Dict[str, Dict]] = None,
+        indexes: Optional[Dict[str, RankIndex]] = None
+    ):
+        entries = self._entries if entries is None else entries
+        indexes = self._indexes if indexes is None else indexes
+        entries[entry["user_id"]] = entry
+        for ordering, index in indexes.items():
+            index.add(self._key(ordering, entry))
+
+    def _key(self, ordering: str, entry: Dict) -> Tuple:
+        return tuple(
+            -entry.get(field, 0)
+            for field in self.orderings[ordering]
+        ) + (entry["user_id"],)
+
+    def _new_indexes(self) -> Dict[str, RankIndex]:
+        return {
+            ordering: RankIndex()
+            for ordering in self.orderings
+        }
+
+    def _refresh(self, document: Dict):
+        user_id = document["user_id"]
+        entry = {
+            **self._entries.get(user_id, {}),
+            **{
+                field: document[field]
+                for field in self.fields
+                if field in document
+            }
+        }
+        self._remove(user_id)
+        if entry.get("num_wins", 0) >= 1:
+            self._insert(entry)
+
+    def _remove(self, user_id: str):
+        if (entry := self._entries.pop(user_id, None)) is None:
+            return
+        for ordering, index in self._indexes.items():
+            index.discard(self._key(ordering, entry))
+
+
+#: The :class:`Leaderboard` of all the :class:`Profiles`.
+LEADERBOARD = Leaderboard()
 
 
 def expire_cache(func: Callable):
@@ -60,7 +352,10 @@ def expire_cache(func: Callable):
         from ..commands.basecommand import Commands
 
         Commands.expire_cache(self.user.id)
-        return func(self, *args, **kwargs)
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            MODEL_CACHE.invalidate(self.model_name, str(self.user.id))
     return wrapper
 
 
@@ -106,7 +401,8 @@ class NameSetter(type):
     """
     Metaclass to set the mongo collection for the model.
     Useful for DB actions in Classmethods.
-    Also used for setting default class attributes.
+    Also used for setting default class attributes
+    and registering the declared indexes.
 
     :meta private:
     """
@@ -120,6 +416,14 @@ class NameSetter(type):
         new_cl._uid_fields = dct.get('uid_fields', [])
         new_cl.sort_order = dct.get('sort_order', [])
         new_cl.read_only = dct.get('read_only', False)
+        new_cl.indexes = dct.get('indexes', [])
+        new_cl.query_shapes = dct.get('query_shapes', [])
+        if new_cl.indexes or new_cl.query_shapes:
+            register_indexes(
+                new_cl.model_name,
+                new_cl.indexes,
+                new_cl.query_shapes
+            )
         return new_cl
 
 
@@ -178,7 +482,8 @@ class Model(metaclass=NameSetter):
                     "excludes", "no_uinfo",
                     "uid_fields", "classes",
                     "count", "pk_field",
-                    "sort_order", "read_only"
+                    "sort_order", "read_only",
+                    "indexes", "query_shapes"
                 ],
                 not ismethod(getattr(self, attr)),
                 not isinstance(
@@ -207,6 +512,27 @@ class Model(metaclass=NameSetter):
             cls._uid_fields.append(('user_id', str))
         return cls._uid_fields
 
+    async def adrop(self):
+        """
+        Awaitable version of :meth:`drop`.
+        """
+        await run_in_db_pool(self.drop)
+
+    async def aget(self, *args, **kwargs) -> Any:
+        """Awaitable version of :meth:`get`.
+        Useful for models whose properties query the DB.
+
+        :return: The attribute value.
+        :rtype: Any
+        """
+        return await run_in_db_pool(self.get, *args, **kwargs)
+
+    async def asave(self, *args, **kwargs):
+        """
+        Awaitable version of :meth:`save`.
+        """
+        await run_in_db_pool(self.save, *args, **kwargs)
+
     def drop(self):
         """
         Deletes all entries in the Collection for the user.
@@ -219,6 +545,7 @@ class Model(metaclass=NameSetter):
                 {"played_by": str(self.user.id)}
             ]
         })
+        MODEL_CACHE.invalidate(self.model_name, str(self.user.id))
 
     def get(self, param=None) -> Any:
         """Returns the Model object as a dictionary.
@@ -269,6 +596,7 @@ class Model(metaclass=NameSetter):
         if cls.read_only:
             raise MethodNotAllowed("This model is read-only.")
         cls.mongo.delete_many({})
+        MODEL_CACHE.invalidate(cls.model_name)
 
     @classmethod
     @property
@@ -329,9 +657,12 @@ class Model(metaclass=NameSetter):
             ]
             if modified_records:
                 res = model.mongo.bulk_write(modified_records)
+                # Censored records can be cached under any of their users.
+                MODEL_CACHE.invalidate(model.model_name)
                 raw = res.bulk_api_result
                 if raw.get('nModified', 0) > 0:
                     num_deleted += raw['nModified']
+        LEADERBOARD.remove(str(user.id))
         return num_deleted
 
     @classmethod
@@ -359,6 +690,8 @@ class Blacklist(Model):
     """
 
     uid_fields = [('blacklisted_by', dict)]
+    indexes = [IndexModel("user_id")]
+    query_shapes = [{"user_id": ""}]
 
     def __init__(
         self, user: discord.Member,
@@ -371,6 +704,12 @@ class Blacklist(Model):
         self.blacklisted_by = to_dict(mod) if mod else None
         self.reason = reason
 
+    async def asave(self, *args, **kwargs):
+        """
+        :meth:`save` is already a coroutine, so it is awaited directly.
+        """
+        await self.save()
+
     @expire_cache
     def pardon(self):
         """
@@ -445,6 +784,19 @@ class CommandData(Model):
     :type kwargs: Dict[str, Any]
     """
 
+    indexes = [
+        IndexModel("user_id"),
+        IndexModel("command"),
+        IndexModel("guild.id"),
+        IndexModel("used_at")
+    ]
+    query_shapes = [
+        {"user_id": ""},
+        {"command": ""},
+        {"guild.id": 0},
+        {"used_at": {"$gte": datetime.min}}
+    ]
+
     def __init__(
         self, user: discord.Member,
         message: discord.Message,
@@ -467,13 +819,23 @@ class CommandData(Model):
         """
         Override Save to serialize Discord objects in args or kwargs.
         """
+        self.serialize()
+        super().save()
+
+    def serialize(self) -> Dict:
+        """Converts the record into an insertable document,
+        serializing the Discord objects in args or kwargs.
+
+        :return: The document to be inserted.
+        :rtype: Dict
+        """
         for idx, arg in enumerate(self.args):
             if isinstance(arg, (Guild, TextChannel, User, Member, Role)):
                 self.args[idx] = to_dict(arg)
         for key, value in self.kwargs.items():
             if isinstance(value, (Guild, TextChannel, User, Member, Role)):
                 self.kwargs[key] = to_dict(value)
-        super().save()
+        return dict(self)
 
     @classmethod
     def history(cls, limit: Optional[int] = 5, **kwargs) -> List[Dict]:
@@ -698,6 +1060,168 @@ class CommandData(Model):
         ])
 
 
+class CommandDataWriter:
+    """Write-behind buffer for :class:`CommandData` records.
+    Records are queued in memory and written with a single insert_many
+    once ``batch_size`` of them pile up or ``flush_interval`` passes.
+
+    :param batch_size: Number of queued records which triggers a flush.
+    :type batch_size: int
+    :param flush_interval: Max seconds a record waits before a flush.
+    :type flush_interval: float
+    :param max_queue: Max records held in memory, after which
+        :meth:`put` waits for the next flush (backpressure).
+    :type max_queue: int
+    :param logger: Optional logger for reporting failed flushes.
+    :type logger: Optional[:class:`~scripts.helpers.logger.CustomLogger`]
+    """
+
+    def __init__(
+        self, batch_size: int = 50,
+        flush_interval: float = 5.0,
+        max_queue: int = 1000,
+        logger: Optional[CustomLogger] = None
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.logger = logger
+        self._queue: Optional[asyncio.Queue] = None
+        self._flush_evt: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._closing = False
+        self._counters = {
+            "queued": 0,
+            "written": 0,
+            "failed": 0,
+            "flushes": 0,
+            "last_flush_ms": 0.0,
+            "max_flush_ms": 0.0,
+            "total_flush_ms": 0.0
+        }
+
+    @property
+    def running(self) -> bool:
+        """Is the background flusher running?
+
+        :return: True if the flusher task is alive.
+        :rtype: bool
+        """
+        return self._worker is not None and not self._worker.done()
+
+    @property
+    def stats(self) -> Dict[str, Union[int, float]]:
+        """Counters for the queue depth and flush latency.
+
+        :return: A snapshot of the writer counters.
+        :rtype: Dict[str, Union[int, float]]
+        """
+        flushes = self._counters["flushes"]
+        return {
+            **self._counters,
+            "depth": self._queue.qsize() if self._queue else 0,
+            "avg_flush_ms": (
+                self._counters["total_flush_ms"] / flushes
+                if flushes else 0.0
+            )
+        }
+
+    def start(self):
+        """
+        Starts the background flusher in the running event loop.
+        """
+        if self.running:
+            return
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._flush_evt = asyncio.Event()
+        self._worker = asyncio.get_running_loop().create_task(
+            self.__flush_loop()
+        )
+
+    async def put(self, record: CommandData):
+        """Queues a :class:`CommandData` record for writing.
+        Waits if the queue is full, and writes the record directly
+        if the flusher hasn't been started.
+
+        :param record: The record to queue.
+        :type record: :class:`CommandData`
+        """
+        if not self.running:
+            await run_in_db_pool(record.save)
+            return
+        if record.read_only:
+            raise MethodNotAllowed("This model is read-only.")
+        await self._queue.put(record.serialize())
+        self._counters["queued"] += 1
+        if self._queue.qsize() >= self.batch_size:
+            self._flush_evt.set()
+
+    async def flush(self):
+        """
+        Writes all the queued records to the DB in batches.
+        """
+        while self._queue and not self._queue.empty():
+            docs = []
+            while not self._queue.empty() and len(docs) < self.batch_size:
+                docs.append(self._queue.get_nowait())
+            started = time.perf_counter()
+            try:
+                await run_in_db_pool(
+                    CommandData.mongo.insert_many,
+                    docs, ordered=False
+                )
+                self._counters["written"] += len(docs)
+            # Includes the BSON errors of unserializable records.
+            except Exception as excp:  # pylint: disable=broad-except
+                self._counters["failed"] += len(docs)
+                if self.logger:
+                    self.logger.pprint(
+                        f"Failed to write {len(docs)} command records: "
+                        f"{excp}",
+                        color="red",
+                        wrapped_func="CommandDataWriter.flush"
+                    )
+            elapsed = (time.perf_counter() - started) * 1000
+            self._counters["flushes"] += 1
+            self._counters["last_flush_ms"] = elapsed
+            self._counters["total_flush_ms"] += elapsed
+            self._counters["max_flush_ms"] = max(
+                self._counters["max_flush_ms"], elapsed
+            )
+
+    async def close(self):
+        """
+        Stops the background flusher and writes the pending records.
+        """
+        if self.running:
+            self._closing = True
+            self._flush_evt.set()
+            await self._worker
+        self._worker = None
+        self._closing = False
+        await self.flush()
+
+    async def __flush_loop(self):
+        while not self._closing:
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(
+                    self._flush_evt.wait(),
+                    timeout=self.flush_interval
+                )
+            self._flush_evt.clear()
+            try:
+                await self.flush()
+            except Exception as excp:  # pylint: disable=broad-except
+                # Keep flushing, else every later record gets stuck.
+                if self.logger:
+                    self.logger.pprint(
+                        f"Command record flush failed: {excp}",
+                        color="red",
+                        wrapped_func="CommandDataWriter.flush"
+                    )
+
+
 class DuelActionsModel(Model):
     """
     Wrapper for duel actions based DB actions
@@ -760,6 +1284,8 @@ class Exchanges(Model):
     """
 
     uid_fields = [("admin", dict)]
+    indexes = [IndexModel("user_id")]
+    query_shapes = [{"user_id": ""}]
 
     def __init__(
         self, user: discord.Member,
@@ -828,6 +1354,12 @@ class Inventory(Model):
     :type user: :class:`discord.Member`
     """
 
+    indexes = [IndexModel([("user_id", 1), ("itemid", 1)])]
+    query_shapes = [
+        {"user_id": ""},
+        {"user_id": "", "itemid": ""}
+    ]
+
     # pylint: disable=arguments-differ
 
     def __init__(
@@ -836,6 +1368,55 @@ class Inventory(Model):
         super().__init__(user)
         self.user_id = str(self.user.id)
 
+    async def abulk_insert(self, items: List[str]):
+        """Awaitable version of :meth:`bulk_insert`.
+
+        :param items: The list of item ids to insert.
+        :type items: List[str]
+        """
+        await run_in_db_pool(self.bulk_insert, items)
+
+    async def adelete(
+        self, item_inp: Union[str, List[str]],
+        quantity: int = -1,
+        is_name: bool = False
+    ) -> int:
+        """Awaitable version of :meth:`delete`.
+
+        :param item_inp: The name or list of item ids to delete.
+        :type item_inp: Union[str, List[str]]
+        :param quantity: The quantity of items to delete., default is -1.
+        :type quantity: int
+        :param is_name: Whether the input is a name or list of item ids.
+        :type is_name: bool
+        :return: The number of items deleted.
+        :rtype: int
+        """
+        return await run_in_db_pool(
+            self.delete, item_inp,
+            quantity=quantity, is_name=is_name
+        )
+
+    async def afrom_id(self, itemid: str) -> Item:
+        """Awaitable version of :meth:`from_id`.
+
+        :param itemid: The ItemID of the item.
+        :type itemid: str
+        :return: The Item object.
+        :rtype: :class:`~.items.Item`
+        """
+        return await run_in_db_pool(self.from_id, itemid)
+
+    async def afrom_name(self, name: str) -> List[str]:
+        """Awaitable version of :meth:`from_name`.
+
+        :param name: The name of the item.
+        :type name: str
+        :return: The list of ItemIDs.
+        :rtype: List[str]
+        """
+        return await run_in_db_pool(self.from_name, name)
+
     def delete(
         self, item_inp: Union[str, List[str]],
         quantity: int = -1,
@@ -1070,6 +1651,16 @@ class Matches(Model):
         ('participants', list),
         ('winner', dict)
     ]
+    indexes = [
+        IndexModel("played_by"),
+        IndexModel("participants.id"),
+        IndexModel("winner.id"),
+        IndexModel("played_at")
+    ]
+    query_shapes = [
+        {"$or": [{"played_by": ""}, {"participants.id": 0}]},
+        {"winner.id": 0}
+    ]
 
     def __init__(
         self, user: discord.Member,
@@ -1169,6 +1760,10 @@ class Trades(Model):
         ('traded_by', str),
         ('traded_to', dict)
     ]
+    indexes = [
+        IndexModel("traded_by"),
+        IndexModel("traded_to.id")
+    ]
 
     def __init__(
         self, user: discord.Member,
@@ -1209,6 +1804,14 @@ class Transactions(Model):
     :type redeemed: bool
     """
 
+    indexes = [
+        IndexModel("tx_id"),
+        IndexModel("user_id")
+    ]
+    query_shapes = [
+        {"user_id": ""},
+        {"user_id": "", "tx_id": ""}
+    ]
     sort_order: Optional[List] = [
         'created_at',
         "user",
@@ -1433,7 +2036,7 @@ class UnlockedModel(Model):
         super().__init__(user, *args, **kwargs)
         if getattr(self, "_prefetched", False):
             return
-        if existing := self._query_existing():
+        if existing := self._fetch_existing():
             for key, val in existing.items():
                 setattr(self, key, val)
             self._prefetched = True
@@ -1441,6 +2044,68 @@ class UnlockedModel(Model):
             self._default()
             self.save()
 
+    @classmethod
+    async def afetch(
+        cls: Type[UnlockedModel],
+        user: discord.Member,
+        *args, **kwargs
+    ) -> UnlockedModel:
+        """Awaitable constructor for the Model.
+        The lookup (and creation for new users) runs in the DB pool.
+
+        :param user: The user to map the collection to.
+        :type user: :class:`discord.Member`
+        :return: The populated Model.
+        :rtype: :class:`UnlockedModel`
+        """
+        return await run_in_db_pool(cls, user, *args, **kwargs)
+
+    @classmethod
+    def from_document(
+        cls: Type[UnlockedModel],
+        user: discord.Member,
+        document: Dict
+    ) -> UnlockedModel:
+        """Builds the Model from an already fetched document,
+        without querying the DB.
+
+        :param user: The user to map the collection to.
+        :type user: :class:`discord.Member`
+        :param document: The document of the user from the collection.
+        :type document: Dict
+        :return: The populated Model.
+        :rtype: :class:`UnlockedModel`
+        """
+        obj = cls.__new__(cls)
+        for key, val in document.items():
+            setattr(obj, key, val)
+        obj._prefetched = True
+        obj.__init__(user)  # pylint: disable=unnecessary-dunder-call
+        return obj
+
+    async def areset(self):
+        """
+        Awaitable version of :meth:`reset`.
+        """
+        await run_in_db_pool(self.reset)
+
+    async def aupdate(self, **kwargs):
+        """
+        Awaitable version of :meth:`update`.
+        """
+        await run_in_db_pool(self.update, **kwargs)
+
+    def _fetch_existing(self):
+        """
+        Serves :meth:`_query_existing` through the :data:`MODEL_CACHE`.
+        """
+        if self.pk_field != 'user_id':
+            return self._query_existing()
+        return MODEL_CACHE.fetch(
+            (self.model_name, str(self.user.id)),
+            self._query_existing
+        )
+
     def _query_existing(self):
         """
         Send a MongoDB query to prepopulate the Model if a record exists.
@@ -1453,6 +2118,58 @@ class UnlockedModel(Model):
             )
         })
 
+    @expire_cache
+    def increment(
+        self, min_values: Optional[Dict[str, int]] = None,
+        **kwargs
+    ) -> Optional[Dict]:
+        """Atomically increments (server-side ``$inc``) numeric fields.
+        Unlike a read-modify-write with :meth:`update`, concurrent
+        increments on the same user are never lost.
+
+        :param min_values: Optional guard mapping fields to the minimum
+            value they must currently hold for the update to apply.
+        :type min_values: Optional[Dict[str, int]]
+        :return: The updated document, None if the guard failed.
+        :rtype: Optional[Dict]
+        """
+        if not kwargs:
+            return None
+        filter_ = {
+            self.pk_field: (
+                str(self.user.id) if self.pk_field == 'user_id'
+                else getattr(self, self.pk_field)
+            )
+        }
+        for key, val in (min_values or {}).items():
+            filter_[key] = {"$gte": val}
+        updated = self.mongo.find_one_and_update(
+            filter_,
+            {"$inc": kwargs},
+            return_document=ReturnDocument.AFTER
+        )
+        if updated is None:
+            return None
+        for key in kwargs:
+            setattr(self, key, updated[key])
+        return updated
+
+    async def aincrement(
+        self, min_values: Optional[Dict[str, int]] = None,
+        **kwargs
+    ) -> Optional[Dict]:
+        """Awaitable version of :meth:`increment`.
+
+        :param min_values: Optional guard mapping fields to the minimum
+            value they must currently hold for the update to apply.
+        :type min_values: Optional[Dict[str, int]]
+        :return: The updated document, None if the guard failed.
+        :rtype: Optional[Dict]
+        """
+        return await run_in_db_pool(
+            self.increment, min_values=min_values, **kwargs
+        )
+
     @expire_cache
     def reset(self):
         """
@@ -1567,6 +2284,9 @@ class Boosts(UnlockedModel):
     :type user: :class:`discord.Member`
     """
 
+    indexes = [IndexModel("user_id", unique=True)]
+    query_shapes = [{"user_id": ""}]
+
     def _default(self):
         self.user_id: str = str(self.user.id)
         self.lucky_looter: int = 0
@@ -1588,6 +2308,7 @@ class Boosts(UnlockedModel):
                 "flipster": 0
             }}
         )
+        MODEL_CACHE.invalidate(cls.model_name)
 
 
 class Loots(UnlockedModel):
@@ -1596,6 +2317,10 @@ class Loots(UnlockedModel):
     :param user: The user to map the collection to.
     :type user: :class:`discord.Member`
     """
+
+    indexes = [IndexModel("user_id", unique=True)]
+    query_shapes = [{"user_id": ""}]
+
     def _default(self):
         self.user_id: str = str(self.user.id)
         self.tier: int = 1
@@ -1621,6 +2346,7 @@ class Loots(UnlockedModel):
                 "daily_streak": 0
             }}
         )
+        MODEL_CACHE.invalidate(cls.model_name)
 
 
 class Profiles(UnlockedModel):
@@ -1630,6 +2356,9 @@ class Profiles(UnlockedModel):
     :type user: :class:`discord.Member`
     """
 
+    indexes = [IndexModel("user_id", unique=True)]
+    query_shapes = [{"user_id": ""}]
+
     # pylint: disable=access-member-before-definition
 
     def __init__(self, user: discord.Member):
@@ -1710,45 +2439,56 @@ class Profiles(UnlockedModel):
             }
         ]))
 
-    @expire_cache
-    def credit(self, amount: int, bonds: bool = False):
+    def credit(
+        self, amount: int,
+        bonds: bool = False
+    ) -> Optional[Dict]:
         """Shorthand method to credit user\'s balance and won_chips.
 
         :param amount: The amount to credit to the balance.
         :type amount: int
         :param bonds: Currency type is Pokebonds?
         :type bonds: bool
+        :return: The updated profile document.
+        :rtype: Optional[Dict]
         """
         if bonds:
-            self.update(
-                balance=self.balance + (amount * 10),
-                pokebonds=self.pokebonds + amount
-            )
-        else:
-            self.update(
-                balance=self.balance + amount,
-                won_chips=self.won_chips + amount
+            return self.increment(
+                balance=amount * 10,
+                pokebonds=amount
             )
+        return self.increment(
+            balance=amount,
+            won_chips=amount
+        )
 
-    @expire_cache
-    def debit(self, amount: int, bonds: bool = False):
+    def debit(
+        self, amount: int,
+        bonds: bool = False,
+        guarded: bool = False
+    ) -> Optional[Dict]:
         """Shorthand method to debit user\'s balance and won_chips.
 
         :param amount: The amount to debit from the balance.
         :type amount: int
         :param bonds: Currency type is Pokebonds?
         :type bonds: bool
+        :param guarded: Only debit if the user can afford it?
+        :type guarded: bool
+        :return: The updated profile document, None if it was unaffordable.
+        :rtype: Optional[Dict]
         """
         if bonds:
-            self.update(
-                balance=self.balance - (amount * 10),
-                pokebonds=self.pokebonds - amount
-            )
-        else:
-            self.update(
-                balance=self.balance - amount,
-                won_chips=self.won_chips - amount
+            return self.increment(
+                min_values={"pokebonds": amount} if guarded else None,
+                balance=-(amount * 10),
+                pokebonds=-amount
             )
+        return self.increment(
+            min_values={"balance": amount} if guarded else None,
+            balance=-amount,
+            won_chips=-amount
+        )
 
     def get_badges(self) -> List[str]:
         """Computes the Badges unlocked by the user.
@@ -1788,47 +2528,7 @@ class Profiles(UnlockedModel):
         :return: The user\'s rank in the leaderboard.
         :rtype: int
         """
-        res = self.mongo.aggregate([
-            {
-                "$match": {"num_wins": {"$gte": 1}}
-            },
-            {
-                "$sort": {
-                    "num_wins": -1,
-                    "num_matches": -1,
-                    "balance": -1
-                }
-            },
-            {"$limit": 20},
-            {
-                "$group": {
-                    "_id": 0,
-                    "users": {
-                        "$push": {
-                            "_id": "$user_id",
-                            "num_wins": "$num_wins",
-                            "num_matches": "$num_matches",
-                            "balance": "$balance"
-                        }
-                    }
-                }
-            },
-            {
-                "$unwind": {
-                    "path": "$users",
-                    "includeArrayIndex": "rank"
-                }
-            },
-            {
-                "$match": {
-                    "users._id": str(self.user.id)
-                }
-            },
-            {"$project": {
-                "rank": {"$add": ["$rank", 1]}
-            }}
-        ])
-        return next(res, {"rank": 0})["rank"]
+        return LEADERBOARD.rank(str(self.user.id))
 
     @classmethod
     def get_all(
@@ -1872,26 +2572,32 @@ class Profiles(UnlockedModel):
     @classmethod
     def get_leaderboard(
         cls: Type[Profiles],
-        sort_by: List[str]
+        sort_by: List[str],
+        start: int = 0,
+        stop: Optional[int] = None
     ) -> List[Dict]:
         """Get the global leaderboard of PokeGambler.
 
         :param sort_by: The fields to sort the leaderboard by.
         :type sort_by: List[str]
+        :param start: The position of the first entry., default is 0.
+        :type start: int
+        :param stop: The position to stop at., default is the end.
+        :type stop: Optional[int]
         :return: The leaderboard.
         :rtype: List[Dict]
         """
-        yield from cls.mongo.aggregate([
-            {
-                "$match": {"num_wins": {"$gte": 1}}
-            },
-            {
-                "$sort": {
-                    field: -1
-                    for field in sort_by
-                }
-            }
-        ])
+        ordering = "balance" if sort_by == ["balance"] else "wins"
+        return LEADERBOARD.page(start, stop, ordering=ordering)
+
+    @classmethod
+    def get_leaderboard_size(cls: Type[Profiles]) -> int:
+        """Get the number of Profiles in the global leaderboard.
+
+        :return: The number of ranked Profiles.
+        :rtype: int
+        """
+        return len(LEADERBOARD)
 
     @classmethod
     def reset_all(cls: Type[Profiles]):
@@ -1910,6 +2616,37 @@ class Profiles(UnlockedModel):
                 "embed_color": None
             }}
         )
+        MODEL_CACHE.invalidate(cls.model_name)
+        LEADERBOARD.invalidate()
+
+    @classmethod
+    def purge(cls: Type[Profiles]):
+        super().purge()
+        LEADERBOARD.invalidate()
+
+    def drop(self):
+        super().drop()
+        LEADERBOARD.remove(str(self.user.id))
+
+    def increment(
+        self, min_values: Optional[Dict[str, int]] = None,
+        **kwargs
+    ) -> Optional[Dict]:
+        updated = super().increment(min_values=min_values, **kwargs)
+        if updated is not None:
+            LEADERBOARD.refresh(updated)
+        return updated
+
+    def update(self, **kwargs):
+        super().update(**kwargs)
+        if set(kwargs) & set(Leaderboard.fields):
+            LEADERBOARD.refresh({
+                "user_id": str(self.user.id),
+                **{
+                    field: getattr(self, field)
+                    for field in Leaderboard.fields[1:]
+                }
+            })
 
     def _default(self):
         init_dict = {
@@ -1941,6 +2678,9 @@ class Votes(UnlockedModel):
     :type user: :class:`discord.Member`
     """
 
+    indexes = [IndexModel("user_id", unique=True)]
+    query_shapes = [{"user_id": ""}]
+
     def _default(self):
         self.user_id: str = str(self.user.id)
         self.last_voted: datetime = (
@@ -1987,6 +2727,7 @@ class Votes(UnlockedModel):
                 "reward_claimed": False
             }}
         )
+        MODEL_CACHE.invalidate(cls.model_name)
 
     @classmethod
     @property
@@ -2003,6 +2744,124 @@ class Votes(UnlockedModel):
             {"count": 0}
         )["count"]
 
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    """Read-only views of a user's :class:`Profiles`, :class:`Loots`,
+    :class:`Boosts`, :class:`Votes` and the active temporary boosts,
+    fetched with a single aggregate.
+
+    :param user: The user whose documents were fetched.
+    :type user: :class:`discord.Member`
+    :param profile: The Profiles document.
+    :type profile: Mapping[str, Any]
+    :param loots: The Loots document.
+    :type loots: Mapping[str, Any]
+    :param boosts: The permanent Boosts document.
+    :type boosts: Mapping[str, Any]
+    :param votes: The Votes document.
+    :type votes: Mapping[str, Any]
+    :param tempboosts: The temporary boosts, keyed by the boost id.
+    :type tempboosts: Mapping[str, Dict]
+    """
+
+    user: discord.Member
+    profile: Mapping[str, Any]
+    loots: Mapping[str, Any]
+    boosts: Mapping[str, Any]
+    votes: Mapping[str, Any]
+    tempboosts: Mapping[str, Dict]
+
+    #: The models which are part of the snapshot.
+    models = (Profiles, Loots, Boosts, Votes)
+
+    @classmethod
+    def fetch(cls: Type[UserSnapshot], user: discord.Member) -> UserSnapshot:
+        """Fetches the snapshot for a user.
+        Missing documents (new users) are created with their defaults.
+
+        :param user: The user to fetch the snapshot for.
+        :type user: :class:`discord.Member`
+        :return: The snapshot of the user.
+        :rtype: :class:`UserSnapshot`
+        """
+        user_id = str(user.id)
+        joined = [
+            model.model_name
+            for model in cls.models[1:]
+        ] + ["tempboosts"]
+        doc = next(
+            Profiles.mongo.aggregate([
+                {"$match": {"user_id": user_id}},
+                {"$limit": 1},
+                *[
+                    {
+                        "$lookup": {
+                            "from": coll_name,
+                            "localField": "user_id",
+                            "foreignField": "user_id",
+                            "as": coll_name
+                        }
+                    }
+                    for coll_name in joined
+                ]
+            ]),
+            None
+        ) or {}
+        subdocs = {
+            coll_name: doc.pop(coll_name, [])
+            for coll_name in joined
+        }
+        subdocs[Profiles.model_name] = [doc] if doc else []
+        views = {}
+        for model in cls.models:
+            raw = next(iter(subdocs[model.model_name]), None)
+            if not raw:
+                model(user)
+                raw = model.mongo.find_one({"user_id": user_id})
+            views[model.model_name] = MappingProxyType(raw)
+        return cls(
+            user=user,
+            profile=views[Profiles.model_name],
+            loots=views[Loots.model_name],
+            boosts=views[Boosts.model_name],
+            votes=views[Votes.model_name],
+            tempboosts=MappingProxyType({
+                boost["boost_id"]: boost
+                for boost in subdocs["tempboosts"]
+            })
+        )
+
+    @classmethod
+    async def afetch(
+        cls: Type[UserSnapshot],
+        user: discord.Member
+    ) -> UserSnapshot:
+        """Awaitable version of :meth:`fetch`.
+
+        :param user: The user to fetch the snapshot for.
+        :type user: :class:`discord.Member`
+        :return: The snapshot of the user.
+        :rtype: :class:`UserSnapshot`
+        """
+        return await run_in_db_pool(cls.fetch, user)
+
+    def to_model(self, model: Type[UnlockedModel]) -> UnlockedModel:
+        """Builds a writable Model from the snapshot, without querying.
+
+        :param model: One of the models in :attr:`models`.
+        :type model: Type[:class:`UnlockedModel`]
+        :return: The populated Model.
+        :rtype: :class:`UnlockedModel`
+        """
+        view = {
+            Profiles: self.profile,
+            Loots: self.loots,
+            Boosts: self.boosts,
+            Votes: self.votes
+        }[model]
+        return model.from_document(self.user, deepcopy(dict(view)))
+
 # endregion
 
 
@@ -2034,6 +2893,7 @@ class Webshop(UnboundModel, UnlockedModel):
     pk_field: str = "name"
     no_uinfo: bool = True
     read_only: bool = True
+    indexes = [IndexModel("name")]
     uid_fields: List[str] = []
 
     def __init__(self, *args, **kwargs):
@@ -2166,6 +3026,8 @@ class Duels(Minigame):
         ("played_by", str),
         ("opponent", dict)
     ]
+    indexes = [IndexModel("played_by")]
+    query_shapes = [{"played_by": ""}]
 
     def __init__(
         self, user: discord.Member,
@@ -2228,6 +3090,8 @@ class Flips(Minigame):
     """
 
     uid_fields = [("played_by", str)]
+    indexes = [IndexModel("played_by")]
+    query_shapes = [{"played_by": ""}]
 
     def __init__(
         self, user: discord.Member,
@@ -2255,6 +3119,8 @@ class Moles(Minigame):
     """
 
     uid_fields = [("played_by", str)]
+    indexes = [IndexModel("played_by")]
+    query_shapes = [{"played_by": ""}]
 
     def __init__(
         self, user: discord.Member,
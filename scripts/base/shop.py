@@ -32,14 +32,28 @@ from queue import Queue
 from typing import TYPE_CHECKING, Dict, List, Optional, Type, Union
 
 from discord.errors import Forbidden, HTTPException
+from pymongo import IndexModel
 
-from ..base.items import DB_CLIENT, Item
+from ..base.items import DB_CLIENT, Item, register_indexes
 from ..base.models import Boosts, Inventory, Loots, Profiles
 from ..helpers.utils import get_embed
 
 if TYPE_CHECKING:
     from discord import Member, Message
 
+# Temporary boosts expire 30 minutes after purchase.
+register_indexes(
+    "tempboosts",
+    indexes=[
+        IndexModel("added_on", expireAfterSeconds=30 * 60),
+        IndexModel([("user_id", 1), ("boost_id", 1)])
+    ],
+    query_shapes=[
+        {"user_id": ""},
+        {"user_id": "", "boost_id": ""}
+    ]
+)
+
 
 class Listing(Queue):
     """A dynamically flowing Queue with the provision
@@ -284,20 +298,28 @@ class BoostItem(ShopItem):
 
     @classmethod
     def get_boosts(
-        cls: Type[BoostItem], user_id: str
+        cls: Type[BoostItem], user_id: str,
+        prefetched: Optional[Dict[str, Dict]] = None
     ) -> Dict:
         """Returns a list of all the temporary boosts for the user.
 
         :param user_id: The id of the user.
         :type user_id: str
+        :param prefetched: Temporary boosts which were already fetched
+            (eg. by :class:`~scripts.base.models.UserSnapshot`).
+        :type prefetched: Optional[Dict[str, Dict]]
         :return: A list of all the temporary boosts for the user.
         :rtype: Dict
         """
+        if prefetched is None:
+            prefetched = {
+                boost["boost_id"]: boost
+                for boost in DB_CLIENT["tempboosts"].find({
+                    "user_id": user_id
+                })
+            }
         return {
-            boost.itemid: DB_CLIENT["tempboosts"].find_one({
-                "user_id": user_id,
-                "boost_id": boost.itemid
-            }) or {
+            boost.itemid: prefetched.get(boost.itemid) or {
                 "stack": 0,
                 "name": boost.name,
                 "description": boost.description,
@@ -328,10 +350,6 @@ class BoostItem(ShopItem):
         user: Member, quantity: int
     ):
         boost_dict["stack"] += quantity
-        DB_CLIENT["tempboosts"].create_index(
-            "added_on",
-            expireAfterSeconds=30 * 60
-        )
         DB_CLIENT["tempboosts"].update_one(
             {"user_id": str(user.id), "boost_id": self.itemid},
             {"$set": boost_dict},
@@ -399,8 +417,7 @@ class PremiumBoostItem(BoostItem):
         tier = Loots(user).tier
         boost = Boosts(user)
         boost_name = self.name.lower().replace(' ', '_')
-        curr = boost.get(boost_name)
-        boost.update(**{boost_name: curr + quantity})
+        boost.increment(**{boost_name: quantity})
         Profiles(user).debit(
             amount=((self.price * (10 ** (tier - 2))) * quantity),
             bonds=True
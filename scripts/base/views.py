@@ -37,7 +37,7 @@ import discord
 
 if TYPE_CHECKING:
     from ..commands.basecommand import Commands
-    from ..commands.gamblecommands import GambleCommands
+    from ..commands.gamblecommands import GambleCommands, GambleSession
 
 
 def validate(in_view=False):
@@ -474,9 +474,12 @@ class GambleCounter(BaseView):
         defaults to 12.
     :type max_players: Optional[int]
     :param timeout: The timeout for the registration, defaults to 180.
+    :param session: The session of the match, players of which
+        can't register for other matches.
+    :type session: Optional[:class:`~scripts.commands.gamblecommands.GambleSession`]
     """
 
-    # pylint: disable=too-many-arguments
+    # pylint: disable=too-many-arguments, too-many-instance-attributes
 
     def __init__(
         self, gamble_cmd: GambleCommands,
@@ -484,10 +487,12 @@ class GambleCounter(BaseView):
         reg_embed: discord.Embed,
         fee: Optional[int] = 50,
         max_players: Optional[int] = 12,
-        timeout: Optional[float] = 30.0
+        timeout: Optional[float] = 30.0,
+        session: Optional[GambleSession] = None
     ):
         super().__init__(timeout=timeout)
         self.registration_list = []
+        self.session = session
         self.start_time = datetime.now()
         self.gamble_cmd = gamble_cmd
         self.gamble_thread = gamble_thread
@@ -540,6 +545,15 @@ class GambleCounter(BaseView):
         from .models import Profiles
 
         usr = interaction.user
+        if busy := self.gamble_cmd.sessions.get_playing(
+            usr, exclude=self.session
+        ):
+            await interaction.response.send_message(
+                "You're already registered for a match in "
+                f"{busy.channel.mention}.",
+                ephemeral=True
+            )
+            return
         bal = Profiles(usr).get("balance")
         if bal < self.fee:
             await self.gamble_cmd.handle_low_balance(
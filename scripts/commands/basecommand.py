@@ -20,16 +20,18 @@ This module contains the Abstract Base Class for Commands.
 It also has some useful decorators for the commands.
 """
 
-# pylint: disable=unused-argument
+# pylint: disable=unused-argument, too-many-lines
 
 from __future__ import annotations
 
 import json
+import time
 from abc import ABC
 from datetime import datetime
 from functools import wraps
+from io import BytesIO
 from typing import (
-    TYPE_CHECKING, Any, Callable, Coroutine,
+    TYPE_CHECKING, Any, Awaitable, Callable, Coroutine,
     Dict, List, Optional, Tuple, Union
 )
 
@@ -42,19 +44,27 @@ from ..base.models import Inventory, Model, Profiles
 from ..base.shop import PremiumShop, Shop
 from ..base.views import CallbackButton, CallbackButtonView, LinkView
 from ..helpers.paginator import Paginator
+from ..helpers.parsers import CommandSchema
 from ..helpers.utils import (
-    ImageCacher, dedent, dm_send, get_embed,
-    is_admin, is_dealer, is_owner
+    RenderCache, dedent, dm_send, get_embed,
+    get_modules, is_admin, is_dealer, is_owner
 )
 from ..helpers.validators import HexValidator, IntegerValidator
 
 if TYPE_CHECKING:
     from discord import Embed, File, Member, Message, TextChannel
+    from PIL.Image import Image
 
     from bot import PokeGambler
 
 load_dotenv()
 
+#: Coroutine function which creates the (Embed, File) for a page index.
+PageProducer = Callable[
+    [int],
+    Coroutine[Any, Any, Tuple[Optional[discord.Embed], Optional[discord.File]]]
+]
+
 
 def get_commands_btn_view(
     message: Union[Message, CustomInteraction],
@@ -260,42 +270,6 @@ def autocomplete(callback_dict: Dict[str, Coroutine]):
     return decorator
 
 
-def cache_images(func: Callable):
-    '''Cache sent images for a particular user.
-
-    :param func: The command to be decorated.
-    :type func: Callable
-    :return: The decorated function.
-    :rtype: Callable
-    '''
-    if not func.__dict__.get("image_cache"):
-        func.__dict__["image_cache"] = {}
-
-    @wraps(func)
-    def wrapped(self, message, *args, **kwargs):
-        user = kwargs.get("user", message.author)
-        if (
-            user.id not in func.__dict__["image_cache"]
-            or func.__dict__["image_cache"][user.id].kwargs != kwargs
-        ):
-            cache = func.__dict__["image_cache"]
-            cache.update({
-                user.id: ImageCacher(**{
-                    **kwargs,
-                    "user": user
-                })
-            })
-            if user.id not in Commands.caches:
-                Commands.caches.update({user.id: []})
-            Commands.caches[user.id].append(
-                cache[user.id]
-            )
-        if existing := func.__dict__["image_cache"][user.id].cached:
-            return message.reply(content=existing)
-        return func(self, *args, message=message, **kwargs)
-    return wrapped
-
-
 def check_completion(func: Callable):
     '''Checks if a command is already in progress for a user.
 
@@ -744,7 +718,7 @@ async def get_profile(
                 )
             )
             return None
-        return Profiles(user)
+        return await Profiles.afetch(user)
     except discord.HTTPException:
         await message.reply(
             embed=get_embed(
@@ -764,7 +738,8 @@ class Commands(ABC):
     :param ctx: The PokeGambler client.
     :type ctx: :class:`bot.PokeGambler`
     '''
-    caches = {}
+    #: The :class:`~scripts.helpers.utils.RenderCache` shared by all commands.
+    render_cache = RenderCache()
 
     def __init__(
         self, ctx: PokeGambler,
@@ -788,6 +763,36 @@ class Commands(ABC):
             for name in cmd.alias:
                 self.alias.append(f"cmd_{name}")
                 setattr(self, f"cmd_{name}", cmd)
+        #: The compiled :class:`~scripts.helpers.parsers.CommandSchema`
+        #: of every documented command, keyed by the command name.
+        self.schemas: Dict[str, CommandSchema] = {}
+
+    def compile_schemas(self):
+        '''Compiles the schemas of all the documented commands.
+        Aliases share the schema of the original command.
+        '''
+        self.schemas = {}
+        for attr in dir(self):
+            # Other attributes include the enable/disable properties.
+            if not attr.startswith("cmd_"):
+                continue
+            cmd = getattr(self, attr)
+            if all([
+                callable(cmd),
+                cmd.__doc__,
+                cmd.__name__ not in self.schemas
+            ]):
+                self.schemas[cmd.__name__] = CommandSchema.from_command(cmd)
+
+    def get_schema(self, command: Callable) -> Optional[CommandSchema]:
+        '''Gets the compiled schema of a command of this module.
+
+        :param command: The command method.
+        :type command: Callable
+        :return: The schema, None if the command isn't documented.
+        :rtype: Optional[:class:`~scripts.helpers.parsers.CommandSchema`]
+        '''
+        return self.schemas.get(command.__name__)
 
     @property
     def enable(self) -> bool:
@@ -797,6 +802,7 @@ class Commands(ABC):
         :rtype: bool
         '''
         self.enabled = True
+        self.ctx.command_index.build(get_modules(self.ctx))
         return self.enabled
 
     @property
@@ -807,13 +813,17 @@ class Commands(ABC):
         :rtype: bool
         '''
         self.enabled = False
+        self.ctx.command_index.build(get_modules(self.ctx))
         return self.enabled
 
+    # pylint: disable=too-many-arguments
     async def paginate(
         self, message: Message,
         embeds: List[Embed],
         files: Optional[List[File]] = None,
-        content: Optional[str] = None
+        content: Optional[str] = None,
+        producer: Optional[PageProducer] = None,
+        num_pages: Optional[int] = None
     ):
         """Convenience method for conditional pagination.
 
@@ -821,19 +831,28 @@ class Commands(ABC):
         :type message: :class:`discord.Message`
         :param embeds: The Embeds to paginate.
         :type embeds: List[:class:`discord.Embed`]
-        :param files: Optional Files to paginate.
+        :param files: Optional Files to paginate, attached to the pages.
         :type files: Optional[List[:class:`discord.File`]]
         :param content: Optional content to include in the message.
         :type content: Optional[str]
+        :param producer: Optional coroutine function which lazily creates
+            the (Embed, File) for a page index, instead of using embeds.
+        :type producer: Optional[PageProducer]
+        :param num_pages: The number of pages, required with a producer.
+        :type num_pages: Optional[int]
         """
-        if not embeds and not files:
+        if producer is None and files:
+            producer = self.__get_file_producer(embeds, files)
+            num_pages = len(files)
+        if producer is not None:
+            await self.__paginate_lazy(
+                message, producer, num_pages, content
+            )
+            return
+        if not embeds:
             if content:
                 await message.reply(content=content)
             return
-        if files:
-            embeds = await self.__handle_files(
-                message, embeds, files
-            )
         if len(embeds) == 1:
             await message.reply(
                 content=content,
@@ -923,28 +942,101 @@ class Commands(ABC):
                 view=action_view
             )
 
-    async def __handle_files(self, message, embeds, files):
-        asset_chan = message.guild.get_channel(
-            self.ctx.img_upload_channel
-        ) or self.ctx.get_channel(
-            self.ctx.img_upload_channel
+    # pylint: disable=too-many-arguments
+    async def reply_rendered(
+        self, message: Message, user_id: int,
+        inputs: Tuple, render: Callable[[], Awaitable[Image]],
+        fname: str, ext: str = "JPEG"
+    ) -> Message:
+        """Replies with a rendered image, reusing the previous upload
+        from the :attr:`render_cache` if the inputs are unchanged.
+
+        :param message: The Message which triggered the command.
+        :type message: :class:`discord.Message`
+        :param user_id: The ID of the user the image belongs to.
+        :type user_id: int
+        :param inputs: Everything that affects the rendered image.
+        :type inputs: Tuple
+        :param render: Coroutine function which renders the image.
+        :type render: Callable[[], Awaitable[:class:`PIL.Image.Image`]]
+        :param fname: The filename of the image.
+        :type fname: str
+        :param ext: The format of the image., default is JPEG.
+        :type ext: str
+        :return: The reply message.
+        :rtype: :class:`discord.Message`
+        """
+        cache = Commands.render_cache
+        key = cache.make_key(ext, *inputs)
+        entry = cache.get(key)
+        if entry is None:
+            data = await self.ctx.renderer.encode_bytes(await render(), ext)
+        elif time.time() - entry["uploaded"] < cache.url_ttl:
+            return await message.reply(content=entry["url"])
+        else:
+            data = entry["data"]
+        msg = await message.reply(file=discord.File(BytesIO(data), fname))
+        cache.put(key, user_id, msg.attachments[0].proxy_url, data)
+        return msg
+
+    @staticmethod
+    async def __paginate_lazy(message, producer, num_pages, content):
+        async def produce(idx):
+            embed, page_file = await producer(idx)
+            attachment = None
+            if page_file:
+                embed = embed or discord.Embed()
+                embed.set_image(url=f"attachment://{page_file.filename}")
+                attachment = (page_file.filename, page_file.fp.read())
+                page_file.close()
+            if num_pages > 1 and embed.footer.text is discord.Embed.Empty:
+                embed.set_footer(text=f"{idx+1}/{num_pages}")
+            return embed, attachment
+
+        if not num_pages:
+            if content:
+                await message.reply(content=content)
+            return
+        view = Paginator(
+            [], content=content,
+            producer=produce,
+            num_pages=num_pages
         )
-        if not embeds:
-            embeds = [discord.Embed() for _ in files]
-        msg = await asset_chan.send(files=files)
-        for idx, embed in enumerate(embeds):
-            embed.set_image(
-                url=msg.attachments[idx].proxy_url
+        page = await view.get_page(0)
+        sendables = {
+            "content": content,
+            "embed": page[0]
+        }
+        if page[1] is not None:
+            sendables["files"] = view.get_files(page)
+        if num_pages == 1:
+            await message.reply(**sendables)
+            return
+        view.prefetch_next(0)
+        await message.reply(**sendables, view=view)
+        await view.wait()
+
+    @staticmethod
+    def __get_file_producer(embeds, files):
+        # Files can be read only once, so keep the contents around.
+        pages = [
+            (
+                embeds[idx] if idx < len(embeds or []) else None,
+                fl.filename, fl.fp.read()
             )
-        return embeds
+            for idx, fl in enumerate(files)
+        ]
+
+        async def producer(idx):
+            embed, fname, data = pages[idx]
+            return embed, discord.File(BytesIO(data), fname)
+        return producer
 
     @classmethod
     def expire_cache(cls, user_id: int):
-        '''Expires all the caches for a user.
+        '''Expires all the rendered images for a user.
 
         :param user_id: The user ID to expire caches for.
         :type user_id: int
         '''
-        if user_id in cls.caches:
-            for cache in cls.caches[user_id]:
-                cache.expire()
+        cls.render_cache.invalidate(user_id)
@@ -35,8 +35,8 @@ import discord
 
 from ..base.items import Item
 from ..base.models import (
-    Checkpoints, CommandData, Minigame,
-    Model, UnlockedModel
+    MODEL_CACHE, Checkpoints, CommandData,
+    Minigame, Model, UnlockedModel
 )
 from ..base.views import SelectView
 from ..helpers.utils import (
@@ -157,6 +157,40 @@ class ControlCommands(Commands):
             files.append(d_fl)
         await self.paginate(message, embeds, files)
 
+    @owner_only
+    @no_log
+    async def cmd_cache_stats(self, message: Message, **kwargs):
+        """
+        :param message: The message which triggered this command.
+        :type message: :class:`discord.Message`
+
+        .. meta::
+            :description: Check the hit ratio and size of the caches.
+
+        .. rubric:: Syntax
+        .. code:: coffee
+
+            /cache_stats
+
+        .. rubric:: Description
+
+        ``👑 Owner Command``
+        Shows the size and hit ratio of the render cache
+        and the model cache.
+        """
+        embeds = []
+        for title, stats in (
+            ("Render Cache", Commands.render_cache.stats),
+            ("Model Cache", MODEL_CACHE.stats)
+        ):
+            emb = get_embed(title=title)
+            for key, val in stats.items():
+                if key == "hit_ratio":
+                    val = f"{val:.2%}"
+                emb.add_field(name=key, value=str(val))
+            embeds.append(emb)
+        await self.paginate(message, embeds)
+
     # pylint: disable=too-many-arguments
     @owner_only
     @no_log
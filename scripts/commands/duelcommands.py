@@ -27,10 +27,12 @@ import asyncio
 import random
 import re
 from collections import namedtuple
-from typing import TYPE_CHECKING, Dict, List, Optional
+from io import BytesIO
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 
 import discord
 from cachetools import TTLCache, cached
+from PIL import features
 
 from ..base.items import Gladiator, Item
 from ..base.modals import CallbackReplyModal
@@ -43,7 +45,7 @@ from ..helpers.checks import user_check
 from ..helpers.imageclasses import GladitorMatchHandler
 from ..helpers.utils import (
     dedent, get_embed,
-    img2file, wait_for, dm_send
+    wait_for, dm_send
 )
 from ..helpers.validators import (
     ItemNameValidator, MinValidator,
@@ -56,6 +58,7 @@ from .basecommand import (
 
 if TYPE_CHECKING:
     from discord import Member, Message
+    from PIL import Image
 
     from bot import PokeGambler
 
@@ -632,7 +635,9 @@ class DuelCommands(Commands):
                 color=profile.get("embed_color")
             )
         )
-        gladiator.image = await gladiator.get_image(self.ctx.sess)
+        gladiator.image = await gladiator.get_image(
+            self.ctx.sess, cache=self.ctx.asset_cache
+        )
         gladiator.owner = user
         return gladiator
 
@@ -652,30 +657,38 @@ class DuelCommands(Commands):
         ]
         if not self.duelactions.normal:
             self.duelactions.refresh()
-        gladhandler = GladitorMatchHandler(self.ctx.assets_path)
-        base, thread = await self.__duel_start(message, gladhandler, glads)
-        if base is None:
-            return
-        emb = discord.Embed()
-        adjust = 1
-        for idx, (img, dmg1, dmg2) in enumerate(gladhandler.get(glads)):
-            if dmg1 == dmg2 == 0:
-                adjust -= 1
-                continue
-            dmg_dict[players[0].id].append(dmg1)
-            dmg_dict[players[1].id].append(dmg2)
-            round_fl = img2file(img, f"duel_{idx}.jpg")
-            action = self.__duel_get_action(glads, [dmg1, dmg2])
-            emb.add_field(
-                name=f"Round {idx + adjust}",
-                value=f"```md\n{dedent(action)}\n```",
-                inline=False
+        names = [glad.owner.name for glad in glads]
+        sprites = [glad.image for glad in glads]
+        fmt = self.ctx.duel_replay
+        if fmt == "webp" and not features.check("webp_anim"):
+            fmt = "gif"
+        if fmt == "rounds":
+            rounds = await self.ctx.renderer.render(
+                GladitorMatchHandler, "get_rounds", names, sprites
             )
-            emb.set_image(url=f"attachment://duel_{idx}.jpg")
-            await asyncio.sleep(3.0)
-            await thread.send(
-                embed=emb, file=round_fl
+            start_fl = await self.ctx.renderer.encode(
+                rounds[0][0], "start.jpg"
             )
+            damages = [
+                (dmg1, dmg2)
+                for _, dmg1, dmg2 in rounds
+                if dmg1 or dmg2
+            ]
+        else:
+            start, replay, damages = await self.ctx.renderer.render(
+                GladitorMatchHandler, "get_replay",
+                names, sprites, fmt=fmt.upper()
+            )
+            start_fl = discord.File(BytesIO(start), "start.jpg")
+        thread = await self.__duel_start(message, start_fl, glads)
+        if fmt == "rounds":
+            await self.__duel_send_rounds(thread, glads, rounds)
+        else:
+            replay_fl = discord.File(BytesIO(replay), f"duel.{fmt}")
+            await self.__duel_send_replay(thread, glads, replay_fl, damages)
+        for dmg1, dmg2 in damages:
+            dmg_dict[players[0].id].append(dmg1)
+            dmg_dict[players[1].id].append(dmg2)
         winner = max(
             profiles,
             key=lambda x: sum(dmg_dict[x.user.id])
@@ -734,45 +747,81 @@ class DuelCommands(Commands):
             return False
         return True
 
+    async def __duel_send_replay(
+        self, thread: discord.Thread,
+        glads: List[Gladiator],
+        replay_fl: discord.File,
+        damages: List[Tuple[int, int]]
+    ):
+        """
+        Uploads the animated replay once and adds the commentary
+        for every round by editing the same message.
+        """
+        emb = discord.Embed()
+        emb.set_image(url=f"attachment://{replay_fl.filename}")
+        msg = await thread.send(embed=emb, file=replay_fl)
+        emb.set_image(url=msg.embeds[0].image.url)
+        for idx, (dmg1, dmg2) in enumerate(damages, start=1):
+            action = self.__duel_get_action(glads, [dmg1, dmg2])
+            emb.add_field(
+                name=f"Round {idx}",
+                value=f"```md\n{dedent(action)}\n```",
+                inline=False
+            )
+            await asyncio.sleep(3.0)
+            await msg.edit(embed=emb)
+
+    async def __duel_send_rounds(
+        self, thread: discord.Thread,
+        glads: List[Gladiator],
+        rounds: List[Tuple[Image.Image, int, int]]
+    ):
+        """
+        Sends a separate image for every round.
+        """
+        emb = discord.Embed()
+        adjust = 1
+        for idx, (img, dmg1, dmg2) in enumerate(rounds):
+            if dmg1 == dmg2 == 0:
+                adjust -= 1
+                continue
+            round_fl = await self.ctx.renderer.encode(img, f"duel_{idx}.jpg")
+            action = self.__duel_get_action(glads, [dmg1, dmg2])
+            emb.add_field(
+                name=f"Round {idx + adjust}",
+                value=f"```md\n{dedent(action)}\n```",
+                inline=False
+            )
+            emb.set_image(url=f"attachment://duel_{idx}.jpg")
+            await asyncio.sleep(3.0)
+            await thread.send(
+                embed=emb, file=round_fl
+            )
+
     @staticmethod
     async def __duel_start(
         message: Message,
-        gladhandler: GladitorMatchHandler,
+        start_fl: discord.File,
         glads: List[Gladiator]
-    ) -> Message:
+    ) -> discord.Thread:
         fresh_emb = discord.Embed(
             title="Match Starting..."
         )
-        try:
-            start_fl = img2file(
-                next(gladhandler.get(glads))[0],
-                "start.jpg"
-            )
-            fresh_emb.set_image(
-                url="attachment://start.jpg"
-            )
-            base = await message.channel.send(
-                content=" vs ".join(
-                    glad.owner.mention
-                    for glad in glads
-                ),
-                embed=fresh_emb,
-                file=start_fl
-            )
-            thread = await message.channel.create_thread(
-                name=" vs ".join(
-                    f"{glad.owner.name}『{glad}』"
-                    for glad in glads
-                ),
-                message=base
-            )
-            return base, thread
-        except StopIteration:
-            await message.channel.send(
-                embed=get_embed(
-                    "Something went wrong.",
-                    embed_type="error",
-                    title="Could Not Start Duel"
-                )
-            )
-            return None, None
+        fresh_emb.set_image(
+            url="attachment://start.jpg"
+        )
+        base = await message.channel.send(
+            content=" vs ".join(
+                glad.owner.mention
+                for glad in glads
+            ),
+            embed=fresh_emb,
+            file=start_fl
+        )
+        return await message.channel.create_thread(
+            name=" vs ".join(
+                f"{glad.owner.name}『{glad}』"
+                for glad in glads
+            ),
+            message=base
+        )
@@ -19,7 +19,7 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 Gambling Commands Module
 """
 
-# pylint: disable=too-many-arguments, too-many-locals
+# pylint: disable=too-many-arguments, too-many-locals, too-many-lines
 # pylint: disable=too-many-instance-attributes, unused-argument
 
 from __future__ import annotations
@@ -27,19 +27,21 @@ from __future__ import annotations
 import asyncio
 import math
 import random
-from typing import TYPE_CHECKING, Optional
+from dataclasses import dataclass, field
+from io import BytesIO
+from typing import TYPE_CHECKING, Dict, List, Optional
 
 import discord
 
-from ..base.models import Boosts, Flips, Loots, Matches, Moles, Profiles
+from ..base.cardgen import CardGambler
+from ..base.models import (
+    Flips, Loots, Matches, Moles, Profiles, UserSnapshot
+)
 from ..base.shop import BoostItem
 from ..base.views import GambleCounter, MultiSelectView, SelectView
 from ..helpers.checks import user_rctn
 from ..helpers.imageclasses import BoardGenerator
-from ..helpers.utils import (
-    get_embed, get_enum_embed,
-    img2file
-)
+from ..helpers.utils import get_embed, get_enum_embed
 from ..helpers.validators import (
     ChainValidator, MaxValidator,
     MinValidator
@@ -51,7 +53,135 @@ from .basecommand import (
 )
 
 if TYPE_CHECKING:
-    from discord import Message
+    from discord import Member, Message, TextChannel, Thread
+
+
+@dataclass
+class GambleSession:
+    """
+    The state of a single gamble match, from the registration
+    till the cleanup of its thread.
+    """
+    #: The channel in which the match was started.
+    channel: TextChannel
+    #: The entry fee of the match.
+    fee: int = 50
+    #: Whether or not the lower number card wins.
+    lower_wins: bool = False
+    #: The thread in which the match takes place.
+    thread: Optional[Thread] = None
+    #: Whether the joker chance is increased.
+    hot_time: bool = False
+    #: The registered players, in the order of registration.
+    players: List[Member] = field(default_factory=list)
+    #: The card dealt to every player.
+    dealed_deck: Dict[Member, Dict] = field(default_factory=dict)
+    #: The profiles of the charged players.
+    profiles: Dict[Member, Profiles] = field(default_factory=dict)
+
+    @property
+    def transaction_rate(self) -> float:
+        """The share of the pot deducted before crediting the winner.
+        Increases by 5% per 3 players, if more than 12.
+
+        :return: The transaction rate.
+        :rtype: float
+        """
+        return 0.1 + 0.05 * math.floor(
+            max(0, len(self.players) - 12) / 3
+        )
+
+
+class GambleSessions:
+    """
+    Registry of the running :class:`GambleSession`, keyed by channel.
+    Only one match can run in a channel, and upto max_per_guild
+    matches can run at once in a guild.
+
+    :param max_per_guild: Max matches running in a guild., default is 3.
+    :type max_per_guild: int
+    """
+    def __init__(self, max_per_guild: int = 3):
+        self.max_per_guild = max_per_guild
+        self._sessions: Dict[int, GambleSession] = {}
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def close(self, session: GambleSession):
+        """Removes a session from the registry.
+
+        :param session: The session to remove.
+        :type session: :class:`GambleSession`
+        """
+        if self._sessions.get(session.channel.id) is session:
+            self._sessions.pop(session.channel.id)
+
+    def get(self, channel_id: int) -> Optional[GambleSession]:
+        """Gets the session running in a channel.
+
+        :param channel_id: The ID of the channel.
+        :type channel_id: int
+        :return: The running session, if any.
+        :rtype: Optional[:class:`GambleSession`]
+        """
+        return self._sessions.get(channel_id)
+
+    def get_playing(
+        self, user: Member,
+        exclude: Optional[GambleSession] = None
+    ) -> Optional[GambleSession]:
+        """Gets the session a user is registered in, if any.
+
+        :param user: The user to look for.
+        :type user: :class:`discord.Member`
+        :param exclude: A session to skip, usually the one being joined.
+        :type exclude: Optional[:class:`GambleSession`]
+        :return: The session having the user as a player.
+        :rtype: Optional[:class:`GambleSession`]
+        """
+        for session in self._sessions.values():
+            if session is exclude:
+                continue
+            if any(player.id == user.id for player in session.players):
+                return session
+        return None
+
+    def in_guild(self, guild_id: int) -> List[GambleSession]:
+        """Lists the sessions running in a guild.
+
+        :param guild_id: The ID of the guild.
+        :type guild_id: int
+        :return: The running sessions.
+        :rtype: List[:class:`GambleSession`]
+        """
+        return [
+            session
+            for session in self._sessions.values()
+            if session.channel.guild.id == guild_id
+        ]
+
+    def open(
+        self, channel: TextChannel,
+        **kwargs
+    ) -> Optional[GambleSession]:
+        """Starts a session in a channel, if the limits allow it.
+
+        :param channel: The channel to start the session in.
+        :type channel: :class:`discord.TextChannel`
+        :param kwargs: The settings of the :class:`GambleSession`.
+        :type kwargs: Dict
+        :return: The new session, None if the channel or guild is busy.
+        :rtype: Optional[:class:`GambleSession`]
+        """
+        if any([
+            channel.id in self._sessions,
+            len(self.in_guild(channel.guild.id)) >= self.max_per_guild
+        ]):
+            return None
+        session = GambleSession(channel, **kwargs)
+        self._sessions[channel.id] = session
+        return session
 
 
 class GambleCommands(Commands):
@@ -61,7 +191,8 @@ class GambleCommands(Commands):
     """
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.registered = []
+        #: The :class:`GambleSessions` of the matches running right now.
+        self.sessions = GambleSessions(self.ctx.gamble_limit)
         self.conv_table = {
             f"{i}": i
             for i in range(2, 11)
@@ -156,52 +287,39 @@ class GambleCommands(Commands):
             "lower_wins": lower_wins,
             "max_players": max_players
         }
-        gamble_channel, hot_time = await self.__gamble_register(
-            message, **kwargs
+        session = self.sessions.open(
+            message.channel,
+            fee=fee, lower_wins=lower_wins
         )
-        if len(self.registered) <= 1:
-            await message.channel.send(
+        if session is None:
+            await message.reply(
                 embed=get_embed(
-                    "This match has been cancelled due to lack of players.",
-                    embed_type="warning",
-                    title="Not enough players!"
+                    "There's already a match going on in this channel."
+                    if self.sessions.get(message.channel.id)
+                    else f"Only {self.sessions.max_per_guild} matches "
+                    "can run at once in a server.\n"
+                    "Please wait for one of them to finish.",
+                    embed_type="error",
+                    title="Match in Progress"
                 )
             )
-            await self.__gamble_cleanup(gamble_channel, delay=10.0)
             return
         try:
-            joker_chance = 0.2 if hot_time else 0.05
-            num_cards = len(self.registered)
-            dealed_deck, closed_decks = self.__gamble_get_decks(
-                num_cards, joker_chance
-            )
-            profiles = self.__gamble_charge_player(dealed_deck, fee)
-            for deck, (player, card) in zip(closed_decks, dealed_deck.items()):
-                joker_found = await self.__gamble_handle_roll(
-                    message, deck, player, card,
-                    gamble_channel, dealed_deck
+            await self.__gamble_register(message, session, **kwargs)
+            if len(session.players) <= 1:
+                await message.channel.send(
+                    embed=get_embed(
+                        "This match has been cancelled "
+                        "due to lack of players.",
+                        embed_type="warning",
+                        title="Not enough players!"
+                    )
                 )
-                if joker_found:
-                    break
-            winner, is_joker = await self.__gamble_handle_winner(
-                dealed_deck, gamble_channel,
-                profiles, lower_wins, fee
-            )
-            Matches(
-                message.author,
-                started_by=message.author,
-                participants=profiles,
-                winner=winner,
-                lower_wins=lower_wins,
-                deal_cost=fee,
-                by_joker=is_joker
-            ).save()
+                await self.__gamble_cleanup(session, delay=10.0)
+                return
+            await self.__gamble_play(message, session)
         finally:
-            await self.__gamble_cleanup(
-                gamble_channel,
-                delay=30.0,
-                completed=True
-            )
+            self.sessions.close(session)
 
     @model([Flips, Profiles])
     @alias(["flip", "chipflip", "flips"])
@@ -253,7 +371,8 @@ class GambleCommands(Commands):
 
             /flip amount:1000
         """
-        profile = Profiles(message.author)
+        snapshot = await UserSnapshot.afetch(message.author)
+        profile = snapshot.to_model(Profiles)
         amount = await self.__flip_input_handler(
             message, amount, profile,
             min_chips=50, max_chips=9999
@@ -294,12 +413,10 @@ class GambleCommands(Commands):
         ][idx]
         msg = f"PokeGambler choose {valids[idx]}.\n"
         if choice == idx:
-            amt_mult = 1 + (
-                0.1 * Boosts(
-                    message.author
-                ).get("flipster")
+            amt_mult = 1 + (0.1 * snapshot.boosts["flipster"])
+            boosts = BoostItem.get_boosts(
+                str(message.author.id), snapshot.tempboosts
             )
-            boosts = BoostItem.get_boosts(str(message.author.id))
             amt_mult += boosts['boost_flip']['stack'] * 0.1
             tot_amt = amount + int(amount * amt_mult)
             msg += f"You have won {tot_amt} {self.chip_emoji}"
@@ -535,7 +652,11 @@ class GambleCommands(Commands):
                 channel=message.channel
             )
             return
-        board, board_img = self.boardgen.get_board(level)
+        # Only slow the first time a level is played.
+        await asyncio.get_running_loop().run_in_executor(
+            None, self.boardgen.encode_level, level
+        )
+        board, board_bytes = self.boardgen.get_board_bytes(level)
         multi_select_view = MultiSelectView(
             kwarg_list=[
                 {
@@ -566,7 +687,7 @@ class GambleCommands(Commands):
         )
         opt_msg = await message.reply(
             embed=emb,
-            file=img2file(board_img, f"{board}.jpg"),
+            file=discord.File(BytesIO(board_bytes), f"{board}.jpg"),
             view=multi_select_view
         )
         await multi_select_view.dispatch(self)
@@ -578,7 +699,7 @@ class GambleCommands(Commands):
                 reverse=True
             )
         )
-        rolled, board_img = self.boardgen.get(level)
+        rolled, board_bytes = self.boardgen.get_bytes(level)
         await opt_msg.delete()
         if choice == rolled:
             content = "**Congratulations! You guessed it correctly.**\n" + \
@@ -604,7 +725,7 @@ class GambleCommands(Commands):
                 color=color,
                 image=f"attachment://{rolled}.jpg"
             ),
-            file=img2file(board_img, f"{rolled}.jpg"),
+            file=discord.File(BytesIO(board_bytes), f"{rolled}.jpg"),
             view=multi_select_view
         )
 
@@ -641,42 +762,80 @@ class GambleCommands(Commands):
             return None
         return amount
 
-    async def __gamble_announce_winner(
-        self, gamble_channel, dealed_deck,
-        winner, fee, profiles
-    ):
-        profile = profiles[winner]
-        data = profile.get()
-        bal = data["balance"]
-        num_wins = data["num_wins"]
-        won_chips = data["won_chips"]
-        transaction_rate = 0.1 + 0.05 * math.floor(
-            max(
-                0,
-                len(self.registered) - 12
-            ) / 3
-        )
+    async def __gamble_play(self, message, session):
+        try:
+            dropped = self.__gamble_charge_player(session)
+            if dropped:
+                await session.thread.send(
+                    embed=get_embed(
+                        ', '.join(player.name for player in dropped)
+                        + " no longer had enough pokechips, "
+                        "so they were removed from the match.",
+                        embed_type="warning",
+                        title="Insufficient Balance"
+                    )
+                )
+            if len(session.players) <= 1:
+                self.__gamble_refund_players(session)
+                await session.thread.send(
+                    embed=get_embed(
+                        "This match has been cancelled "
+                        "due to lack of players.",
+                        embed_type="warning",
+                        title="Not enough players!"
+                    )
+                )
+                return
+            joker_chance = 0.2 if session.hot_time else 0.05
+            closed_decks = self.__gamble_get_decks(session, joker_chance)
+            for deck, (player, card) in zip(
+                closed_decks, session.dealed_deck.items()
+            ):
+                joker_found = await self.__gamble_handle_roll(
+                    message, deck, player, card, session
+                )
+                if joker_found:
+                    break
+            winner, is_joker = await self.__gamble_handle_winner(session)
+            Matches(
+                message.author,
+                started_by=message.author,
+                participants=session.profiles,
+                winner=winner,
+                lower_wins=session.lower_wins,
+                deal_cost=session.fee,
+                by_joker=is_joker
+            ).save()
+        finally:
+            await self.__gamble_cleanup(
+                session,
+                delay=30.0,
+                completed=True
+            )
+
+    @staticmethod
+    async def __gamble_announce_winner(session, winner):
+        profile = session.profiles[winner]
+        transaction_rate = session.transaction_rate
         incr = int(
-            (fee * len(dealed_deck.items())) * (1 - transaction_rate)
+            (session.fee * len(session.dealed_deck)) * (1 - transaction_rate)
         )
-        bal += incr
-        num_wins += 1
+        updated = profile.increment(
+            balance=incr,
+            num_wins=1,
+            won_chips=incr
+        )
+        num_wins = updated["num_wins"]
         if num_wins == 25:
             loot_table = Loots(winner)
             loot_table.update(tier=2)
         elif num_wins == 100:
             loot_table = Loots(winner)
             loot_table.update(tier=3)
-        won_chips += incr
-        profile.update(
-            balance=bal,
-            num_wins=num_wins,
-            won_chips=won_chips
-        )
         title = f"The winner is {winner}!"
         is_joker = [
             player
-            for player, card in dealed_deck.items()
+            for player, card in session.dealed_deck.items()
             if card["card_num"] == "Joker"
         ]
         if is_joker:
@@ -684,35 +843,48 @@ class GambleCommands(Commands):
         winner_embed = get_embed(
             f"{incr} pokechips have been added to their balance.",
             title=title,
-            footer="10% pokechips from the pot deducted as transaction fee."
+            footer=f"{round(transaction_rate * 100)}% pokechips from "
+            "the pot deducted as transaction fee."
         )
-        await gamble_channel.send(embed=winner_embed)
+        await session.thread.send(embed=winner_embed)
         return bool(is_joker)
 
-    def __gamble_charge_player(self, dealed_deck, fee):
-        profiles = {}
-        for player, _ in dealed_deck.items():
-            profiles[player] = profile = Profiles(player)
-            data = profile.get()
-            bal = data["balance"]
-            num_matches = data["num_matches"]
-            won_chips = data["won_chips"]
-            bal -= fee
-            won_chips -= fee
-            num_matches += 1
-            profile.update(
-                balance=bal,
-                num_matches=num_matches,
-                won_chips=won_chips
+    @staticmethod
+    def __gamble_charge_player(session):
+        dropped = []
+        for player in list(session.players):
+            profile = Profiles(player)
+            # Guarded, since the balance might have been spent meanwhile.
+            charged = profile.increment(
+                min_values={"balance": session.fee},
+                balance=-session.fee,
+                num_matches=1,
+                won_chips=-session.fee
+            )
+            if charged is None:
+                session.players.remove(player)
+                dropped.append(player)
+                continue
+            session.profiles[player] = profile
+        return dropped
+
+    @staticmethod
+    def __gamble_refund_players(session):
+        for profile in session.profiles.values():
+            profile.increment(
+                balance=session.fee,
+                num_matches=-1,
+                won_chips=session.fee
             )
-            self.registered.remove(player)
-        return profiles
 
     async def __gamble_cleanup(
-        self, gamble_thread,
+        self, session,
         delay=30.0, completed=False
     ):
+        # The match is over, so the players are free to join others.
+        session.players = []
         await asyncio.sleep(delay)
+        gamble_thread = session.thread
         if gamble_thread:
             if completed:
                 await gamble_thread.edit(
@@ -725,33 +897,34 @@ class GambleCommands(Commands):
             await gamble_thread.parent.set_permissions(
                 gamblers, send_messages=True
             )
-        self.registered = []
-
-    def __gamble_get_decks(self, num_cards, joker_chance):
-        dealed_deck = {
-            self.registered[i]: card
-            for i, card in enumerate(
-                self.ctx.dealer.get_random_cards(
-                    num_cards=num_cards,
-                    joker_chance=joker_chance
-                )
+
+    def __gamble_get_decks(self, session, joker_chance):
+        num_cards = len(session.players)
+        session.dealed_deck = dict(zip(
+            session.players,
+            self.ctx.dealer.get_random_cards(
+                num_cards=num_cards,
+                joker_chance=joker_chance
             )
-        }
-        closed_decks = [
-            self.ctx.dealer.get_closed_deck(num_cards=i)
+        ))
+        return [
+            self.ctx.dealer.get_closed_deck_bytes(num_cards=i)
             for i in range(num_cards, 0, -1)
         ]
-        return dealed_deck, closed_decks
 
     async def __gamble_handle_roll(
         self, message, deck, player,
-        card, gamble_channel, dealed_deck
+        card, session
     ):
-        closed_fl = img2file(deck, "closed.png")
-        card_fl = img2file(
-            card["card_img"],
-            f"{card['card_num']}{card['suit']}.jpeg"
-        )
+        gamble_channel = session.thread
+        closed_fl = discord.File(BytesIO(deck), "closed.jpg")
+        card_name = f"{card['card_num']}{card['suit']}.jpeg"
+        if card.get("card_bytes"):
+            card_fl = discord.File(BytesIO(card["card_bytes"]), card_name)
+        else:
+            card_fl = await self.ctx.renderer.encode(
+                card["card_img"], card_name
+            )
         closed_msg = await gamble_channel.send(
             content=f"{player.mention}, react with 👀 within 10 seconds.",
             file=closed_fl
@@ -773,9 +946,10 @@ class GambleCommands(Commands):
                 )
             )
             await closed_msg.delete()
-            dealed_deck[player].update({
+            session.dealed_deck[player].update({
                 "card_num": "0",
-                "card_img": self.ctx.dealer.closed_card.copy()
+                "card_img": self.ctx.dealer.closed_card.copy(),
+                "card_bytes": None
             })
             return
         await closed_msg.delete()
@@ -786,11 +960,8 @@ class GambleCommands(Commands):
         if card["card_num"] == "Joker":
             return "Joker"
 
-    async def __gamble_handle_winner(
-        self, dealed_deck,
-        gamble_channel, profiles,
-        lower_wins, fee
-    ):
+    async def __gamble_handle_winner(self, session):
+        dealed_deck = session.dealed_deck
         embed = get_enum_embed(
             [
                 f"{player} rolled a 『{card['card_num']} {card['suit']}』."
@@ -810,7 +981,7 @@ class GambleCommands(Commands):
             ),
             reverse=True
         )
-        if lower_wins:
+        if session.lower_wins:
             players = players[::-1]
             idx = 0
             # Push all non-reactors to the bottom.
@@ -837,21 +1008,23 @@ class GambleCommands(Commands):
                 for pl in players
             ]
         ]
-        rolled_deck = self.ctx.dealer.get_deck(rolled, reverse=True)
-        rolled_fl = img2file(rolled_deck, "rolled.jpg")
+        rolled_deck = await self.ctx.renderer.render(
+            CardGambler, "get_deck", rolled, reverse=True
+        )
+        rolled_fl = await self.ctx.renderer.encode(rolled_deck, "rolled.jpg")
         embed.set_image(url="attachment://rolled.jpg")
-        await gamble_channel.send(embed=embed, file=rolled_fl)
+        await session.thread.send(embed=embed, file=rolled_fl)
         # Return is_joker for saving into DB
         return (
             winner,
-            await self.__gamble_announce_winner(
-                gamble_channel, dealed_deck,
-                winner, fee, profiles
-            )
+            await self.__gamble_announce_winner(session, winner)
         )
 
-    async def __gamble_register(self, message: Message, **kwargs):
-        fee = kwargs["fee"]
+    async def __gamble_register(
+        self, message: Message,
+        session: GambleSession, **kwargs
+    ):
+        fee = session.fee
         max_players = max(2, int(kwargs.pop("max_players", 12) or 12))
         gamblers = self.__get_gambler_role(message.channel)
         await message.channel.set_permissions(
@@ -868,6 +1041,7 @@ class GambleCommands(Commands):
                 name="gamble-here",
                 message=msg
             )
+        session.thread = gamble_thread
         rules = ', '.join(
             self.rules[key]
             for key in kwargs
@@ -885,9 +1059,8 @@ class GambleCommands(Commands):
             for role in message.guild.roles
             if role.name.lower() == "admins"
         ][0]
-        hot_time = False
         if admins in message.author.roles:
-            hot_time = True
+            session.hot_time = True
             desc += "**:fire: Hot Time is active! " + \
                 "The chance to get Joker is increased to `20%`!**\n"
         else:
@@ -901,8 +1074,10 @@ class GambleCommands(Commands):
         gamble_view = GambleCounter(
             self, gamble_thread,
             register_embed, fee,
-            max_players
+            max_players, session=session
         )
+        # Shared, so that other sessions see the registrations live.
+        session.players = gamble_view.registration_list
         first_embed = register_embed.copy()
         first_embed.description = first_embed.description.replace("<tr>", "10")
         # Isolate the ping since it gets silenced on edit.
@@ -914,10 +1089,8 @@ class GambleCommands(Commands):
             view=gamble_view
         )
         await gamble_view.dispatch(self)
-        self.registered = gamble_view.registration_list
         await cnt_msg.delete()
         await emb_msg.delete()
-        return gamble_thread, hot_time
 
     @staticmethod
     def __get_gambler_role(channel):
@@ -24,19 +24,18 @@ Profile Commands Module
 
 from __future__ import annotations
 
+import math
 import random
 from datetime import datetime, timedelta
-from io import BytesIO
 from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union
 
 import discord
-from PIL import Image
 
-from ..base.items import Chest
+from ..base.items import Chest, run_in_db_pool
 from ..base.modals import CallbackReplyModal
 from ..base.models import (
     Blacklist, Boosts, CommandData, Inventory,
-    Loots, Matches, Minigame, Profiles, Votes
+    Loots, Matches, Minigame, Profiles, UserSnapshot, Votes
 )
 from ..base.shop import BoostItem
 from ..base.views import CallbackButton, LinkView, SelectView
@@ -48,12 +47,12 @@ from ..helpers.imageclasses import (
 from ..helpers.unicodex import UnicodeProgressBar, Unicodex
 from ..helpers.utils import (
     LineTimer, dm_send, get_embed, get_formatted_time,
-    get_modules, img2file, wait_for
+    get_modules, wait_for
 )
 from ..helpers.validators import HexValidator, ImageUrlValidator
 
 from .basecommand import (
-    Commands, alias, check_completion, cache_images,
+    Commands, alias, check_completion,
     cooldown, defer, get_commands_btn_view, model,
     get_profile, needs_ticket
 )
@@ -69,10 +68,7 @@ class ProfileCommands(Commands):
     """
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.pcg = ProfileCardGenerator(self.ctx.assets_path)
-        self.walletgen = WalletGenerator(self.ctx.assets_path)
         self.lbg = LeaderBoardGenerator(self.ctx.assets_path)
-        self.bdgen = BadgeGenerator(self.ctx.assets_path)
 
     @needs_ticket("Background Change")
     @check_completion
@@ -144,7 +140,6 @@ class ProfileCommands(Commands):
 
     @alias("bdg")
     @model(Profiles)
-    @cache_images
     async def cmd_badges(self, message: Message, **kwargs):
         """
         :param message: The message which triggered this command.
@@ -165,16 +160,15 @@ class ProfileCommands(Commands):
         """
         profile = await get_profile(self.ctx, message, message.author)
         badges = profile.get_badges()
-        badgestrip = self.bdgen.get(badges)
-        discord_file = img2file(badgestrip, "badges.png", ext="PNG")
-        msg = await message.reply(file=discord_file)
-        self.cmd_badges.__dict__["image_cache"][message.author.id].register(
-            msg.attachments[0].proxy_url
+        await self.reply_rendered(
+            message, message.author.id,
+            ("badges", badges),
+            lambda: self.ctx.renderer.render(BadgeGenerator, "get", badges),
+            "badges.png", ext="PNG"
         )
 
     @alias(["bal", "chips"])
     @model(Profiles)
-    @cache_images
     async def cmd_balance(self, message: Message, **kwargs):
         """
         :param message: The message which triggered this command.
@@ -205,13 +199,11 @@ class ProfileCommands(Commands):
             )
             for key, val in profile.items()
         }
-        wallet = self.walletgen.get(data)
-        discord_file = img2file(wallet, "wallet.png", ext="PNG")
-        msg = await message.reply(
-            file=discord_file
-        )
-        self.cmd_balance.__dict__["image_cache"][message.author.id].register(
-            msg.attachments[0].proxy_url
+        await self.reply_rendered(
+            message, message.author.id,
+            ("wallet", data["won_chips"], data["pokebonds"], data["balance"]),
+            lambda: self.ctx.renderer.render(WalletGenerator, "get", data),
+            "wallet.png", ext="PNG"
         )
 
     @model([Boosts, BoostItem, Profiles])
@@ -250,9 +242,13 @@ class ProfileCommands(Commands):
                 expires_in = "Expired / Not Purchased Yet"
             desc_str += f"\nExpires in: {expires_in}"
             return f"```css\n{desc_str}\n```"
-        boosts = BoostItem.get_boosts(str(message.author.id))
-        profile = Profiles(message.author)
-        perm_boosts = Boosts(message.author).get()
+        snapshot = await UserSnapshot.afetch(message.author)
+        boosts = BoostItem.get_boosts(
+            str(message.author.id), snapshot.tempboosts
+        )
+        profile = snapshot.profile
+        perm_boosts = dict(snapshot.boosts)
+        perm_boosts.pop('_id', None)
         perm_boosts.pop('user_id')
         if not (
             boosts or any(
@@ -348,9 +344,12 @@ class ProfileCommands(Commands):
                 message = f"in {ts_fmt}.\n`{prog_bar}`"
             return f"You can use {key.title()} again {message}"
         emb_data = {}
+        snapshot = await UserSnapshot.afetch(message.author)
         loot_elapsed, loot_total = self.__loot_get_cooldown(
-            message, Boosts(message.author),
-            BoostItem.get_boosts(str(message.author.id))
+            message, snapshot.boosts,
+            BoostItem.get_boosts(
+                str(message.author.id), snapshot.tempboosts
+            )
         )
         emb_data['Loot'] = _get_message(
             'loot', loot_elapsed, loot_total,
@@ -358,12 +357,10 @@ class ProfileCommands(Commands):
         )
         (
             daily_elapsed, daily_base_cd, *_
-        ) = self.__daily_get_cooldown(
-            Loots(message.author)
-        )
+        ) = self.__daily_get_cooldown(snapshot.loots)
         emb_data['Daily'] = _get_message('daily', daily_elapsed, daily_base_cd)
         _, vote_elapsed, vote_total = self.__vote_get_cooldown(
-            Votes(message.author)
+            snapshot.to_model(Votes)
         )
         emb_data['Vote'] = _get_message('vote', vote_elapsed, vote_total)
         emb_data.update({
@@ -376,7 +373,7 @@ class ProfileCommands(Commands):
         })
         emb = get_embed(
             title='Your cooldowns',
-            color=Profiles(message.author).get('embed_color')
+            color=snapshot.profile.get('embed_color')
         )
         for key, value in emb_data.items():
             emb.add_field(name=key, value=value, inline=False)
@@ -420,7 +417,6 @@ class ProfileCommands(Commands):
         loot_info = loot_model.get()
         boost_info = boost_model.get()
         boost = boost_info["lucky_looter"] + 1
-        earned = loot_info["earned"]
         tier = loot_info["tier"]
         daily_streak = loot_info["daily_streak"]
         (
@@ -459,8 +455,8 @@ class ProfileCommands(Commands):
             color=profile.get('embed_color')
         )
         profile.credit(int(loot))
+        loot_model.increment(earned=int(loot))
         loot_model.update(
-            earned=(earned + loot),
             daily_streak=daily_streak,
             daily_claimed_on=datetime.today()
         )
@@ -602,14 +598,24 @@ class ProfileCommands(Commands):
             leaderboard = await self.__lb_handle_mg_input(message)
             if leaderboard is None:
                 return
+            num_entries = len(leaderboard)
+
+            async def get_entries(start, stop):
+                return leaderboard[start:stop]
         else:
             sort_by = [
                 "num_wins", "num_matches"
             ] if not sort_by else ["balance"]
-            leaderboard = Profiles.get_leaderboard(
-                sort_by=sort_by
+            num_entries = await run_in_db_pool(
+                Profiles.get_leaderboard_size
             )
-        if not leaderboard:
+
+            async def get_entries(start, stop):
+                return await run_in_db_pool(
+                    Profiles.get_leaderboard,
+                    sort_by=sort_by, start=start, stop=stop
+                )
+        if not num_entries:
             await message.reply(
                 embed=get_embed(
                     "No matches were played yet.",
@@ -617,39 +623,39 @@ class ProfileCommands(Commands):
                 )
             )
             return
-        lbd = []
-        idx = 0
-        for data in leaderboard:
-            if not self.ctx.get_user(int(data["user_id"])):
-                continue
-            data["rank"] = idx + 1
-            data["balance"] = f'{int(data["balance"]):,}'
-            lbd.append(data)
-            idx += 1
-        embeds = []
-        files = []
-        with LineTimer(self.logger, "Create Leaderboard Images"):
-            for i in range(0, len(lbd), 4):
-                batch_4 = lbd[i: i + 4]
+
+        async def render_page(page):
+            batch_4 = []
+            entries = await get_entries(page * 4, (page + 1) * 4)
+            for idx, data in enumerate(entries, start=page * 4 + 1):
+                if not self.ctx.get_user(int(data["user_id"])):
+                    continue
+                batch_4.append({
+                    "rank": idx,
+                    **data,
+                    "balance": f'{int(data["balance"]):,}'
+                })
+            with LineTimer(
+                self.logger, f"Create Leaderboard Page {page + 1}"
+            ):
                 img = await self.lbg.get(self.ctx, batch_4)
-                lb_fl = img2file(img, f"leaderboard{i}.jpg")
-                emb = discord.Embed(
-                    title="",
-                    description="",
-                    color=discord.Colour.dark_theme()
-                )
-                embeds.append(emb)
-                files.append(lb_fl)
-        if not embeds:
-            await message.reply(
-                embed=get_embed(
-                    "No matches were played yet.",
-                    embed_type="warning"
+            with LineTimer(self.logger, "Leaderboard Encode"):
+                lb_fl = await self.ctx.renderer.encode(
+                    img, f"leaderboard{page * 4}.jpg"
                 )
+            emb = discord.Embed(
+                title="",
+                description="",
+                color=discord.Colour.dark_theme()
             )
-            return
+            return emb, lb_fl
+
         with LineTimer(self.logger, "Leaderboard Pagination"):
-            await self.paginate(message, embeds, files)
+            await self.paginate(
+                message, [],
+                producer=render_page,
+                num_pages=math.ceil(num_entries / 4)
+            )
 
     @model([Loots, Profiles, Chest, Inventory])
     @alias('lt')
@@ -679,8 +685,11 @@ class ProfileCommands(Commands):
             :class:`~scripts.base.models.Boosts` can be purchased from
             the :class:`~scripts.base.shop.Shop`.
         """
-        perm_boosts = Boosts(message.author).get()
-        boosts = BoostItem.get_boosts(str(message.author.id))
+        snapshot = await UserSnapshot.afetch(message.author)
+        perm_boosts = snapshot.boosts
+        boosts = BoostItem.get_boosts(
+            str(message.author.id), snapshot.tempboosts
+        )
         on_cooldown = self.ctx.loot_cd.get(message.author, None)
         elapsed, total_cd = self.__loot_get_cooldown(
             message, perm_boosts, boosts
@@ -694,11 +703,9 @@ class ProfileCommands(Commands):
         tr_mult = 0.1 * (perm_boosts["fortune_burst"] + 1)
         loot_mult += 0.05 * boosts['boost_lt']['stack']
         tr_mult += 0.1 * boosts['boost_tr']['stack']
-        profile = Profiles(message.author)
-        loot_model = Loots(message.author)
-        loot_info = loot_model.get()
-        earned = loot_info["earned"]
-        tier = loot_info["tier"]
+        profile = snapshot.to_model(Profiles)
+        loot_model = snapshot.to_model(Loots)
+        tier = snapshot.loots["tier"]
         loot = int(
             random.randint(5, 10) * (
                 10 ** (tier - 1)
@@ -708,7 +715,7 @@ class ProfileCommands(Commands):
         if random.uniform(0, 1.0) <= tr_mult:
             embed = self.__loot_handle_treasure(message, profile, tier)
         profile.credit(loot)
-        loot_model.update(earned=earned + loot)
+        loot_model.increment(earned=loot)
         await message.reply(
             f"**You found {loot} {self.chip_emoji}! "
             "Added to your balance.**",
@@ -717,7 +724,6 @@ class ProfileCommands(Commands):
 
     @model([Profiles, Blacklist])
     @alias("pr")
-    @cache_images
     async def cmd_profile(
         self, message: Message,
         user: Optional[discord.Member] = None,
@@ -774,33 +780,40 @@ class ProfileCommands(Commands):
             return
         badges = profile.get_badges()
         profile = profile.get()
-        avatar_byio = BytesIO()
-        await user.display_avatar.with_size(512).save(avatar_byio)
-        avatar = Image.open(avatar_byio)
         name = profile["name"]
         balance = f'{int(profile["balance"]):,}'
         num_played = str(profile["num_matches"])
         num_won = str(profile["num_wins"])
-        background = None
-        if profile.get("background", None):
-            background = await self.__profile_get_bg(profile)
-        profilecard = self.pcg.get(
-            name, avatar, balance,
-            num_played, num_won, badges,
-            blacklisted=Blacklist.is_blacklisted(
-                str(user.id)
-            ), background=background
-        )
-        discord_file = img2file(profilecard, "profilecard.jpg")
-        msg = await message.reply(file=discord_file)
-        self.cmd_profile.__dict__["image_cache"][user.id].register(
-            msg.attachments[0].proxy_url
+        blacklisted = Blacklist.is_blacklisted(str(user.id))
+
+        async def render():
+            avatar = await self.ctx.avatar_cache.get(
+                user.id, user.display_avatar, 512
+            )
+            background = None
+            if profile.get("background", None):
+                background = await self.__profile_get_bg(profile)
+            return await self.ctx.renderer.render(
+                ProfileCardGenerator, "get",
+                name, avatar, balance,
+                num_played, num_won, badges,
+                blacklisted=blacklisted,
+                background=background
+            )
+
+        await self.reply_rendered(
+            message, user.id,
+            (
+                "profile", name, balance, num_played, num_won,
+                badges, user.display_avatar.key,
+                profile.get("background"), blacklisted
+            ),
+            render, "profilecard.jpg"
         )
 
     @defer
     @model(Profiles)
     @alias("#")
-    @cache_images
     async def cmd_rank(self, message: Message, **kwargs):
         """
         :param message: The message which triggered this command.
@@ -826,21 +839,23 @@ class ProfileCommands(Commands):
                 message,
                 message.author
             )
-            rank = profile.get_rank()
-            data = profile.get()
+            rank = await run_in_db_pool(profile.get_rank)
+            data = await profile.aget()
             data["rank"] = rank or 0
             data["balance"] = f'{int(data["balance"]):,}'
-        with LineTimer(self.logger, "Create Rank Image"):
-            img = await self.lbg.get_rankcard(self.ctx, data, heading=True)
-            discord_file = img2file(
-                img,
-                f"rank_{message.author}.png",
-                ext="PNG"
-            )
-        with LineTimer(self.logger, "Send Rank Image"):
-            msg = await message.reply(file=discord_file)
-            self.cmd_rank.__dict__["image_cache"][message.author.id].register(
-                msg.attachments[0].proxy_url
+        avatar = message.author.avatar or message.author.default_avatar
+        with LineTimer(self.logger, "Create and Send Rank Image"):
+            await self.reply_rendered(
+                message, message.author.id,
+                (
+                    "rank", avatar.key,
+                    *(data[key] for key in (
+                        "name", "rank", "num_wins",
+                        "num_matches", "balance"
+                    ))
+                ),
+                lambda: self.lbg.get_rankcard(self.ctx, data, heading=True),
+                f"rank_{message.author}.png", ext="PNG"
             )
 
     @model([Minigame, Loots, CommandData])
@@ -1208,13 +1223,12 @@ class ProfileCommands(Commands):
         )
 
     async def __profile_get_bg(self, profile):
-        bg_byio = BytesIO()
         try:
-            async with self.ctx.sess.get(profile["background"]) as resp:
-                data = await resp.read()
-            bg_byio.write(data)
-            bg_byio.seek(0)
-            background = Image.open(bg_byio).resize((960, 540))
+            background = await self.ctx.asset_cache.get_image(
+                self.ctx.sess, profile["background"],
+                variant="960x540",
+                process=lambda img: img.resize((960, 540)).convert('RGBA')
+            )
         except Exception:  # pylint: disable=broad-except
             background = None
         return background
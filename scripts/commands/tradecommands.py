@@ -373,10 +373,9 @@ class TradeCommands(Commands):
             return
         author_prof = Profiles(message.author)
         mention_prof = Profiles(user)
-        if author_prof.get("balance") < chips:
+        if author_prof.debit(chips, guarded=True) is None:
             await self.handle_low_balance(message, author_prof)
             return
-        author_prof.debit(chips)
         mention_prof.credit(chips)
         Trades(
             message.author,
@@ -690,7 +689,12 @@ class TradeCommands(Commands):
             )
             return
         profile = Profiles(message.author)
-        if profile.get("pokebonds") < chips // 10:
+        # Bonds are worth 10 chips each, so the balance stays the same.
+        if profile.increment(
+            min_values={"pokebonds": chips // 10},
+            pokebonds=-(chips // 10),
+            won_chips=chips
+        ) is None:
             await message.reply(
                 embed=get_embed(
                     f"You cannot afford that many chips.\n"
@@ -700,8 +704,6 @@ class TradeCommands(Commands):
                 )
             )
             return
-        profile.debit(chips // 10, bonds=True)
-        profile.credit(chips)
         await message.reply(
             embed=get_embed(
                 f"Succesfully converted **{chips // 10}** {self.bond_emoji}"
@@ -1462,10 +1464,7 @@ class TradeCommands(Commands):
         profile = Profiles(message.author)
         profile.credit(chips)
         loot_model = Loots(message.author)
-        earned = loot_model.get("earned")
-        loot_model.update(
-            earned=(earned + chips)
-        )
+        loot_model.increment(earned=chips)
         content = f"You have recieved **{chips}** {self.chip_emoji}."
         items = []
         for openable in openables:
@@ -1517,22 +1516,17 @@ class TradeCommands(Commands):
 
             if transaction.webitem.meta.get('has_currency'):
                 profile = Profiles(message.author)
-                # pylint: disable=no-member
-                won_chips = profile.won_chips
-                pokebonds = profile.pokebonds
-                balance = profile.balance
-                profile.update(
-                    won_chips=won_chips + (
+                profile.increment(
+                    won_chips=(
                         transaction.webitem.reward_pokechips
                         * transaction.quantity
                     ),
-                    pokebonds=pokebonds + (
+                    pokebonds=(
                         transaction.webitem.reward_pokebonds
                         * transaction.quantity
                     ),
                     balance=(
-                        balance
-                        + (
+                        (
                             transaction.webitem.reward_pokechips
                             * transaction.quantity
                         )
@@ -0,0 +1,317 @@
+"""
+PokeGambler - A Pokemon themed gambling bot for Discord.
+Copyright (C) 2021 Harshith Thota
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as
+published by the Free Software Foundation, either version 3 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+----------------------------------------------------------------------------
+
+Disk Cache Module for the images downloaded from remote URLs.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import glob
+import hashlib
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+from contextlib import suppress
+from io import BytesIO
+from typing import (
+    Any, Callable, Dict, Optional,
+    Set, Tuple, TYPE_CHECKING
+)
+
+from PIL import Image
+
+from .utils import coalesce
+
+if TYPE_CHECKING:
+    from aiohttp import ClientSession
+
+
+def _read(path: str) -> bytes:
+    with open(path, "rb") as fptr:
+        return fptr.read()
+
+
+def _write(path: str, data: bytes):
+    with open(path, "wb") as fptr:
+        fptr.write(data)
+
+
+def _decode(data: bytes) -> Image.Image:
+    img = Image.open(BytesIO(data))
+    img.load()
+    return img
+
+
+def _remove(pattern: str):
+    for path in glob.glob(pattern):
+        os.remove(path)
+
+
+def _load(path: str) -> Image.Image:
+    with Image.open(path) as img:
+        img.load()
+        return img.copy()
+
+
+class RemoteAssetCache:
+    """
+    Disk backed cache for remote images, keyed by URL.
+
+    Stores the raw bytes along with any post-processed variants,
+    and evicts the least recently used URLs once the total size
+    goes over the budget. Stale entries are revalidated with
+    ETag/Last-Modified, and concurrent requests for the same URL
+    share a single download.
+
+    .. note::
+
+        The last use of an entry is only kept in memory, call
+        :meth:`close` to persist it for the next run.
+
+    :param cache_dir: The directory to store the files in.
+    :type cache_dir: str
+    :param max_bytes: The size budget on disk., default is 128 MB.
+    :type max_bytes: int
+    :param max_age: Seconds for which an entry is used without
+        revalidation, unless the server says otherwise.
+    :type max_age: float
+    """
+
+    def __init__(
+        self, cache_dir: str = os.path.join("assets", "remote"),
+        max_bytes: int = 128 * 1024 * 1024,
+        max_age: float = 3600.0
+    ):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # Least recently used entries come first.
+        self._entries: OrderedDict[str, Dict[str, Any]] = OrderedDict()
+        self._inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+        # Entries used since their index file was last written.
+        self._dirty: Set[str] = set()
+        self.__load_index()
+
+    @property
+    def size(self) -> int:
+        """Total size of the cached files.
+
+        :return: The size in bytes.
+        :rtype: int
+        """
+        return sum(entry["size"] for entry in self._entries.values())
+
+    async def close(self):
+        """
+        Persists the last use of the entries used since their index
+        files were written, so that the LRU order survives restarts.
+        """
+        for key in list(self._dirty):
+            if (entry := self._entries.get(key)) is not None:
+                await self.__save(entry)
+        self._dirty.clear()
+
+    async def get_bytes(self, sess: ClientSession, url: str) -> bytes:
+        """Returns the raw bytes of a remote file.
+
+        :param sess: An aiohttp ClientSession object.
+        :type sess: :class:`aiohttp.ClientSession`
+        :param url: The URL of the file.
+        :type url: str
+        :return: The contents of the file.
+        :rtype: bytes
+        """
+        key = hashlib.sha1(url.encode()).hexdigest()
+        return await coalesce(
+            self._inflight, (key, "raw"),
+            self.__fetch_raw, sess, url, key
+        )
+
+    async def get_image(
+        self, sess: ClientSession, url: str,
+        variant: Optional[str] = None,
+        process: Optional[Callable[[Image.Image], Image.Image]] = None
+    ) -> Image.Image:
+        """Returns a remote image, optionally post-processed.
+
+        :param sess: An aiohttp ClientSession object.
+        :type sess: :class:`aiohttp.ClientSession`
+        :param url: The URL of the image.
+        :type url: str
+        :param variant: The name under which the processed image is cached.
+        :type variant: Optional[str]
+        :param process: Transforms the downloaded image into the variant.
+        :type process: Optional[Callable]
+        :return: The decoded image.
+        :rtype: :class:`PIL.Image.Image`
+        """
+        loop = asyncio.get_running_loop()
+        key = hashlib.sha1(url.encode()).hexdigest()
+        entry = self._entries.get(key)
+        # A fresh variant doesn't need the raw bytes at all.
+        if (
+            variant is not None and process is not None
+            and entry is not None and variant in entry["variants"]
+            and time.time() - entry["fetched"] < entry["max_age"]
+        ):
+            with suppress(OSError):
+                img = await loop.run_in_executor(
+                    None, _load, self.__path(key, variant)
+                )
+                self.__touch(entry)
+                return img
+        raw = await self.get_bytes(sess, url)
+        if variant is None or process is None:
+            return await loop.run_in_executor(None, _decode, raw)
+        return await coalesce(
+            self._inflight, (key, variant),
+            self.__get_variant, key, raw, variant, process
+        )
+
+    async def __fetch_raw(
+        self, sess: ClientSession,
+        url: str, key: str
+    ) -> bytes:
+        loop = asyncio.get_running_loop()
+        raw_path = self.__path(key, "raw")
+        entry = self._entries.get(key)
+        headers = {}
+        if entry is not None and os.path.exists(raw_path):
+            if time.time() - entry["fetched"] < entry["max_age"]:
+                self.__touch(entry)
+                return await loop.run_in_executor(None, _read, raw_path)
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        else:
+            entry = None
+        async with sess.get(url, headers=headers) as resp:
+            if resp.status == 304 and entry is not None:
+                entry["fetched"] = time.time()
+                entry["max_age"] = self.__get_max_age(resp.headers)
+                self.__touch(entry)
+                await self.__save(entry)
+                return await loop.run_in_executor(None, _read, raw_path)
+            resp.raise_for_status()
+            data = await resp.read()
+            resp_headers = resp.headers
+        # Any older copy (and its variants) is outdated now.
+        await self.__drop(key)
+        entry = {
+            "key": key,
+            "url": url,
+            "etag": resp_headers.get("ETag"),
+            "last_modified": resp_headers.get("Last-Modified"),
+            "fetched": time.time(),
+            "max_age": self.__get_max_age(resp_headers),
+            "size": len(data),
+            "variants": []
+        }
+        await loop.run_in_executor(None, _write, raw_path, data)
+        self._entries[key] = entry
+        self.__touch(entry)
+        await self.__save(entry)
+        await self.__evict(keep=key)
+        return data
+
+    def __get_max_age(self, headers: Dict[str, str]) -> float:
+        cache_control = headers.get("Cache-Control", "")
+        if "no-cache" in cache_control or "no-store" in cache_control:
+            return 0.0
+        if match := re.search(r"max-age=(\d+)", cache_control):
+            return float(match.group(1))
+        return self.max_age
+
+    async def __get_variant(
+        self, key: str, raw: bytes, variant: str,
+        process: Callable[[Image.Image], Image.Image]
+    ) -> Image.Image:
+        loop = asyncio.get_running_loop()
+        path = self.__path(key, variant)
+        entry = self._entries.get(key)
+        if entry and variant in entry["variants"] and os.path.exists(path):
+            self.__touch(entry)
+            return await loop.run_in_executor(None, _load, path)
+
+        def build() -> Tuple[Image.Image, int]:
+            img = process(_decode(raw))
+            img.save(path, "PNG")
+            return img, os.path.getsize(path)
+
+        img, size = await loop.run_in_executor(None, build)
+        # The raw file might have been evicted or replaced meanwhile.
+        if entry is not None and self._entries.get(key) is entry:
+            entry["variants"].append(variant)
+            entry["size"] += size
+            self.__touch(entry)
+            await self.__save(entry)
+            await self.__evict(keep=key)
+        return img
+
+    async def __drop(self, key: str):
+        entry = self._entries.pop(key, None)
+        self._dirty.discard(key)
+        if entry is None:
+            return
+        await asyncio.get_running_loop().run_in_executor(
+            None, _remove, os.path.join(self.cache_dir, f"{key}.*")
+        )
+
+    async def __evict(self, keep: str):
+        total = self.size
+        for key in list(self._entries):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            total -= self._entries[key]["size"]
+            await self.__drop(key)
+
+    def __load_index(self):
+        entries = []
+        for path in glob.glob(os.path.join(self.cache_dir, "*.json")):
+            try:
+                with open(path, encoding="utf-8") as fptr:
+                    entries.append(json.load(fptr))
+            except (OSError, ValueError):
+                continue
+        for entry in sorted(entries, key=lambda entry: entry["used"]):
+            self._entries[entry["key"]] = entry
+
+    def __path(self, key: str, variant: str) -> str:
+        ext = "bin" if variant == "raw" else f"{variant}.png"
+        return os.path.join(self.cache_dir, f"{key}.{ext}")
+
+    async def __save(self, entry: Dict[str, Any]):
+        self._dirty.discard(entry["key"])
+        index = json.dumps(entry).encode()
+        await asyncio.get_running_loop().run_in_executor(
+            None, _write,
+            os.path.join(self.cache_dir, f"{entry['key']}.json"),
+            index
+        )
+
+    def __touch(self, entry: Dict[str, Any]):
+        entry["used"] = time.time()
+        self._entries.move_to_end(entry["key"])
+        self._dirty.add(entry["key"])
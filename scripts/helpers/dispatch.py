@@ -0,0 +1,189 @@
+"""
+PokeGambler - A Pokemon themed gambling bot for Discord.
+Copyright (C) 2021 Harshith Thota
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as
+published by the Free Software Foundation, either version 3 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+----------------------------------------------------------------------------
+
+Command Dispatch Module for resolving prefixed commands.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import (
+    Callable, Dict, Iterable,
+    Optional, Set, TYPE_CHECKING
+)
+
+if TYPE_CHECKING:
+    from ..commands.basecommand import Commands
+
+
+def edit_distance(word: str, other: str) -> int:
+    """Computes the Levenshtein distance between two words.
+
+    :param word: The first word.
+    :type word: str
+    :param other: The second word.
+    :type other: str
+    :return: The minimum number of single character edits.
+    :rtype: int
+    """
+    if len(word) < len(other):
+        word, other = other, word
+    previous = list(range(len(other) + 1))
+    for idx, char in enumerate(word, start=1):
+        current = [idx]
+        for jdx, other_char in enumerate(other, start=1):
+            current.append(min(
+                previous[jdx] + 1,
+                current[jdx - 1] + 1,
+                previous[jdx - 1] + (char != other_char)
+            ))
+        previous = current
+    return previous[-1]
+
+
+class TypoIndex:  # pylint: disable=too-few-public-methods
+    """
+    An n-gram index over a set of names, for suggesting the closest
+    name to a misspelt word. Only the names sharing an n-gram with the
+    word are compared, using the edit distance.
+
+    :param names: The names to index.
+    :type names: Iterable[str]
+    :param size: The size of the n-grams., default is 2.
+    :type size: int
+    :param cutoff: Min similarity (0 to 1) of a suggestion., default is 0.6.
+    :type cutoff: float
+    """
+
+    def __init__(
+        self, names: Iterable[str],
+        size: int = 2, cutoff: float = 0.6
+    ):
+        self.size = size
+        self.cutoff = cutoff
+        self._grams: Dict[str, Set[str]] = defaultdict(set)
+        for name in names:
+            for gram in self.__get_grams(name):
+                self._grams[gram].add(name)
+
+    def suggest(
+        self, word: str,
+        accept: Optional[Callable[[str], bool]] = None
+    ) -> Optional[str]:
+        """Returns the indexed name closest to the word.
+
+        :param word: The misspelt word.
+        :type word: str
+        :param accept: Filter for the names which can be suggested.
+        :type accept: Optional[Callable[[str], bool]]
+        :return: The closest name, None if nothing is close enough.
+        :rtype: Optional[str]
+        """
+        shared: Dict[str, int] = defaultdict(int)
+        for gram in self.__get_grams(word):
+            for name in self._grams.get(gram, ()):
+                shared[name] += 1
+        distances = {
+            name: edit_distance(word, name)
+            for name in shared
+        }
+        ranked = sorted(
+            shared,
+            key=lambda name: (distances[name], -shared[name], name)
+        )
+        for name in ranked:
+            similarity = 1 - distances[name] / max(len(word), len(name))
+            if similarity < self.cutoff:
+                continue
+            if accept is None or accept(name):
+                return name
+        return None
+
+    def __get_grams(self, word: str) -> Set[str]:
+        padded = f"^{word.lower()}$"
+        return {
+            padded[idx:idx + self.size]
+            for idx in range(max(len(padded) - self.size + 1, 1))
+        }
+
+
+class CommandIndex:
+    """
+    Maps the names and aliases of the commands from the enabled
+    :class:`~scripts.commands.basecommand.Commands` modules to their
+    bound methods, so that a prefixed command is a single lookup.
+
+    .. note::
+
+        The index is a snapshot, so it needs to be rebuilt whenever
+        a module is (re)loaded, enabled or disabled.
+    """
+
+    def __init__(self):
+        self.commands: Dict[str, Callable] = {}
+        self.typos = TypoIndex(())
+
+    def build(self, modules: Iterable[Commands]):
+        """Rebuilds the index from the command modules.
+        If more than one module has a command, the first one wins.
+
+        :param modules: The command modules.
+        :type modules: Iterable[:class:`~scripts.commands.basecommand.Commands`]
+        """
+        commands = {}
+        for module in modules:
+            if not module.enabled:
+                continue
+            for attr in dir(module):
+                if attr.startswith("cmd_") and attr not in commands:
+                    commands[attr] = getattr(module, attr)
+        self.commands = commands
+        self.typos = TypoIndex(
+            cmd.replace("cmd_", "", 1)
+            for cmd in commands
+        )
+
+    def get(self, cmd: str) -> Optional[Callable]:
+        """Gets the method of a command.
+
+        :param cmd: The command name, prefixed with cmd\\_.
+        :type cmd: str
+        :return: The bound method, None if the command doesn't exist.
+        :rtype: Optional[Callable]
+        """
+        return self.commands.get(cmd)
+
+    def suggest(
+        self, cmd: str,
+        accept: Optional[Callable[[Callable], bool]] = None
+    ) -> Optional[str]:
+        """Suggests the closest existing command for a misspelt one.
+
+        :param cmd: The command name, prefixed with cmd\\_.
+        :type cmd: str
+        :param accept: Filter for the methods which can be suggested.
+        :type accept: Optional[Callable[[Callable], bool]]
+        :return: The closest command name (without cmd\\_), if any.
+        :rtype: Optional[str]
+        """
+        return self.typos.suggest(
+            cmd.replace("cmd_", "", 1),
+            accept=None if accept is None else (
+                lambda name: accept(self.commands[f"cmd_{name}"])
+            )
+        )
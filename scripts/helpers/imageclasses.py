@@ -19,27 +19,55 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 This module is a compilation of Image Generation Classes.
 """
 
-# pylint: disable=arguments-differ, too-many-arguments
+# pylint: disable=arguments-differ, too-many-arguments, too-many-lines
 
 from __future__ import annotations
+import asyncio
+import glob
 import os
 import random
+import threading
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from functools import lru_cache
 from io import BytesIO
 from typing import (
     Dict, Generator, List,
     Optional, Tuple, TYPE_CHECKING
 )
 
+from cachetools import LRUCache
 from PIL import (
     Image, ImageDraw,
     ImageEnhance, ImageFont
 )
 from ..base.items import Gladiator
+from .renderer import encode_image
+from .utils import LineTimer, coalesce
 
 if TYPE_CHECKING:
+    from discord import Asset
+
     from bot import PokeGambler
 
+# (font path, max size, text length, bbox width) -> fitted font size.
+_FIT_CACHE = LRUCache(maxsize=1024)
+_FIT_LOCK = threading.Lock()
+
+
+@lru_cache(maxsize=256)
+def load_font(path: str, size: int) -> ImageFont.FreeTypeFont:
+    """Loads a TrueType font, reusing the ones loaded before.
+
+    :param path: The path to the font file.
+    :type path: str
+    :param size: The size of the font.
+    :type size: int
+    :return: The font object.
+    :rtype: :class:`PIL.ImageFont.FreeTypeFont`
+    """
+    return ImageFont.truetype(path, size)
+
 
 class AssetGenerator(ABC):
     """
@@ -65,7 +93,11 @@ class AssetGenerator(ABC):
 
     @staticmethod
     def get_font(font, txt: str, bbox: List[int]) -> ImageFont:
-        """Shrinks the font size until the text fits in bbox.
+        """Finds the largest font size (upto the font\'s own size)
+        at which the text fits in bbox.
+
+        The size found for a text length and bbox is remembered, and
+        used as the starting guess for the next text of that length.
 
         :param font: The font to be used.
         :type font: :class:`PIL.ImageFont.ImageFont`
@@ -76,11 +108,26 @@ class AssetGenerator(ABC):
         :return: The font object.
         :rtype: :class:`PIL.ImageFont.ImageFont`
         """
-        fontsize = font.size
-        while font.getsize(txt)[0] > bbox[0]:
-            fontsize -= 1
-            font = ImageFont.truetype(font.path, fontsize)
-        return font
+        def fits(size: int) -> bool:
+            return load_font(font.path, size).getsize(txt)[0] <= bbox[0]
+
+        key = (font.path, font.size, len(txt), bbox[0])
+        with _FIT_LOCK:
+            guess = _FIT_CACHE.get(key, font.size)
+        low, high = 1, font.size
+        if fits(guess):
+            low = guess
+        else:
+            high = guess - 1
+        while low < high:
+            mid = (low + high + 1) // 2
+            if fits(mid):
+                low = mid
+            else:
+                high = mid - 1
+        with _FIT_LOCK:
+            _FIT_CACHE[key] = low
+        return load_font(font.path, low)
 
     def imprint_text(
         self, canvas: ImageDraw.Draw,
@@ -100,7 +147,7 @@ class AssetGenerator(ABC):
         :param fontsize: The font size to be used.
         :type fontsize: int
         """
-        font = ImageFont.truetype(
+        font = load_font(
             os.path.join(self.asset_path, "Exo-ExtraBold.ttf"),
             fontsize
         )
@@ -113,6 +160,93 @@ class AssetGenerator(ABC):
         canvas.text(pos, txt, fill=(255, 255, 255), font=font)
 
 
+class AvatarCache:  # pylint: disable=too-few-public-methods
+    """
+    Cache of decoded RGBA user avatars, keyed by (user id, avatar hash,
+    size), with a bounded in-memory LRU backed by a disk directory.
+    Concurrent requests for the same avatar share a single download.
+
+    :param asset_path: The path to the assets folder.
+    :type asset_path: str
+    :param maxsize: Max avatars kept in memory., default is 256.
+    :type maxsize: int
+    """
+    def __init__(self, asset_path: str = "assets", maxsize: int = 256):
+        self.cache_dir = os.path.join(asset_path, "avatars")
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._memory = LRUCache(maxsize=maxsize)
+        self._inflight: Dict[Tuple[str, str, int], asyncio.Future] = {}
+
+    async def get(
+        self, user_id: int,
+        asset: Asset, size: int = 512
+    ) -> Image.Image:
+        """Returns the avatar of a user as an RGBA image.
+
+        .. note:: The returned image is shared, so copy before mutating.
+
+        :param user_id: The ID of the user who owns the avatar.
+        :type user_id: int
+        :param asset: The avatar (or default avatar) of the user.
+        :type asset: :class:`discord.Asset`
+        :param size: The size of the avatar., default is 512.
+        :type size: int
+        :return: The avatar image.
+        :rtype: :class:`PIL.Image.Image`
+        """
+        key = (str(user_id), asset.key, size)
+        if (avatar := self._memory.get(key)) is not None:
+            return avatar
+        return await coalesce(self._inflight, key, self.__fetch, key, asset)
+
+    async def __fetch(
+        self, key: Tuple[str, str, int],
+        asset: Asset
+    ) -> Image.Image:
+        loop = asyncio.get_running_loop()
+        avatar = await loop.run_in_executor(None, self._load, key)
+        if avatar is None:
+            data = await asset.with_size(key[2]).read()
+            avatar = await loop.run_in_executor(
+                None, self._store, key, data
+            )
+            # The avatar has changed, so drop the ones with older hashes.
+            for stale in list(self._memory.keys()):
+                if stale[0] == key[0] and stale[1] != key[1]:
+                    self._memory.pop(stale, None)
+        self._memory[key] = avatar
+        return avatar
+
+    def _load(self, key: Tuple[str, str, int]) -> Optional[Image.Image]:
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        with Image.open(path) as img:
+            return img.convert('RGBA')
+
+    def _path(self, key: Tuple[str, str, int]) -> str:
+        user_id, avatar_hash, size = key
+        return os.path.join(
+            self.cache_dir, f"{user_id}_{avatar_hash}_{size}.png"
+        )
+
+    def _store(
+        self, key: Tuple[str, str, int],
+        data: bytes
+    ) -> Image.Image:
+        # Runs in the executor, so it must not touch the memory LRU.
+        user_id, avatar_hash, _ = key
+        for path in glob.glob(os.path.join(self.cache_dir, f"{user_id}_*")):
+            if not os.path.basename(path).startswith(
+                f"{user_id}_{avatar_hash}_"
+            ):
+                os.remove(path)
+        with Image.open(BytesIO(data)) as img:
+            avatar = img.convert('RGBA')
+        avatar.save(self._path(key), "PNG")
+        return avatar
+
+
 class BadgeGenerator(AssetGenerator):
     """
     Badgestrip Image Generation Class
@@ -167,12 +301,22 @@ class BadgeGenerator(AssetGenerator):
 class BoardGenerator(AssetGenerator):
     """
     The Board Generator for Wackamole minigame.
+
+    A level only has (level + 3) ** 2 possible outcomes, so the JPEG
+    bytes of all of them, along with the empty board, are encoded the
+    first time the level is used and reused for every round after that.
     """
+    tile_size = 250
+
     def __init__(self, asset_path: str):
         super().__init__(asset_path=asset_path)
-        self.mole = Image.new('RGB', (250, 250), (0, 0, 0))
+        self.mole = Image.new(
+            'RGB', (self.tile_size, self.tile_size), (0, 0, 0)
+        )
         self.mole.paste(
-            self.pokechip.resize((250, 250)).convert('RGB')
+            self.pokechip.resize(
+                (self.tile_size, self.tile_size)
+            ).convert('RGB')
         )
         self.boards = []
         self.board_names = []
@@ -189,6 +333,9 @@ class BoardGenerator(AssetGenerator):
                     )
                 )
             )
+        # level -> {tile position (None for the empty board): JPEG bytes}
+        self._encoded: Dict[int, Dict[Optional[Tuple[int, int]], bytes]] = {}
+        self._encode_lock = threading.Lock()
 
     def get(
         self, level: Optional[int] = 0
@@ -201,20 +348,8 @@ class BoardGenerator(AssetGenerator):
         :return: The board image and the board name.
         :rtype: Tuple[str, :class:`PIL.Image.Image`]
         """
-        pos = (
-            random.randint(0, level + 2),
-            random.randint(0, level + 2)
-        )
-        tile_w, tile_h = (250, 250)
-        board_img = self.boards[level].copy()
-        board_img.paste(
-            self.mole,
-            (pos[0] * tile_w, pos[1] * tile_h)
-        )
-        letter = ('A', 'B', 'C', 'D', 'E', 'F', 'G')[pos[0]]
-        num = pos[1] + 1
-        rolled = f"{letter}{num}"
-        return (rolled, board_img)
+        pos = self.__roll(level)
+        return (self.__tile_name(pos), self.__draw(level, pos))
 
     def get_board(
         self, level: Optional[int] = 0
@@ -231,6 +366,86 @@ class BoardGenerator(AssetGenerator):
             self.boards[level].copy()
         )
 
+    def get_board_bytes(
+        self, level: Optional[int] = 0
+    ) -> Tuple[str, bytes]:
+        """Returns the JPEG bytes of an empty board of given level.
+
+        :param level: The level of the board., default is 0.
+        :type level: Optional[int]
+        :return: The board name and the encoded board.
+        :rtype: Tuple[str, bytes]
+        """
+        return (
+            self.board_names[level],
+            self.encode_level(level)[None]
+        )
+
+    def get_bytes(
+        self, level: Optional[int] = 0
+    ) -> Tuple[str, bytes]:
+        """Returns the JPEG bytes of a Board with a random tile \
+            replaced with a pokechip.
+
+        :param level: The level of the board., default is 0.
+        :type level: Optional[int]
+        :return: The rolled tile and the encoded board.
+        :rtype: Tuple[str, bytes]
+        """
+        pos = self.__roll(level)
+        return (
+            self.__tile_name(pos),
+            self.encode_level(level)[pos]
+        )
+
+    def encode_level(
+        self, level: Optional[int] = 0
+    ) -> Dict[Optional[Tuple[int, int]], bytes]:
+        """Encodes every possible board of a level, if not done already.
+
+        .. note::
+
+            The first call for a level is slow, so make it
+            off the event loop.
+
+        :param level: The level of the board., default is 0.
+        :type level: Optional[int]
+        :return: The JPEG bytes per tile position, None for empty board.
+        :rtype: Dict[Optional[Tuple[int, int]], bytes]
+        """
+        if level in self._encoded:
+            return self._encoded[level]
+        with self._encode_lock:
+            if level not in self._encoded:
+                encoded = {None: encode_image(self.boards[level])}
+                for col in range(level + 3):
+                    for row in range(level + 3):
+                        encoded[(col, row)] = encode_image(
+                            self.__draw(level, (col, row))
+                        )
+                self._encoded[level] = encoded
+        return self._encoded[level]
+
+    def __draw(self, level: int, pos: Tuple[int, int]) -> Image.Image:
+        board_img = self.boards[level].copy()
+        board_img.paste(
+            self.mole,
+            (pos[0] * self.tile_size, pos[1] * self.tile_size)
+        )
+        return board_img
+
+    @staticmethod
+    def __roll(level: int) -> Tuple[int, int]:
+        return (
+            random.randint(0, level + 2),
+            random.randint(0, level + 2)
+        )
+
+    @staticmethod
+    def __tile_name(pos: Tuple[int, int]) -> str:
+        letter = ('A', 'B', 'C', 'D', 'E', 'F', 'G')[pos[0]]
+        return f"{letter}{pos[1] + 1}"
+
     @staticmethod
     def get_valids(
         level: Optional[int] = 0
@@ -255,48 +470,70 @@ class BoardGenerator(AssetGenerator):
         )
 
 
+@dataclass(frozen=True)
+class DuelAssets:
+    """
+    The immutable assets used in Gladiator Matches.
+    Loaded once per process and shared by all the matches,
+    so they should never be drawn upon directly.
+    """
+    arena: Image.Image
+    bloods: Tuple[Image.Image, ...]
+    hp_bar: Image.Image
+    color_bars: Tuple[Image.Image, ...]
+    font: ImageFont.FreeTypeFont
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def load(asset_path: str = "assets") -> DuelAssets:
+        """Returns the duel assets from the asset folder.
+
+        :param asset_path: The path to the assets folder.
+        :type asset_path: str
+        :return: The shared duel assets.
+        :rtype: :class:`DuelAssets`
+        """
+        bloods_path = os.path.join(asset_path, 'duel', 'bloods')
+        bloods = []
+        for fname in os.listdir(bloods_path):
+            with Image.open(os.path.join(bloods_path, fname)) as blood:
+                bloods.append(blood.convert('RGBA'))
+        arena = Image.open(os.path.join(asset_path, "duel", "arena.jpg"))
+        hp_bar = Image.open(os.path.join(asset_path, "duel", "hp_bar.png"))
+        arena.load()
+        hp_bar.load()
+        return DuelAssets(
+            arena=arena,
+            bloods=tuple(bloods),
+            hp_bar=hp_bar,
+            color_bars=tuple(
+                Image.new('RGBA', (134, 728), color=color)
+                for color in (
+                    (254, 0, 0, 255),   # RED_BAR
+                    (254, 240, 0, 255),   # YELLOW_BAR
+                    (60, 254, 0, 255)   # GREEN_BAR
+                )
+            ),
+            font=load_font(
+                os.path.join(asset_path, "Exo-ExtraBold.ttf"),
+                140
+            )
+        )
+
+
 class GladitorMatchHandler(AssetGenerator):
     """
     Gladiator Match handler class
+
+    The assets come from the shared :class:`DuelAssets`, while the
+    state of a match (the canvas, sprites and hitpoints) only lives
+    within that match, so concurrent duels don't interfere.
     """
+    glad_x_offset = 270
+
     def __init__(self, asset_path: str = "assets"):
         super().__init__(asset_path)
-        self.font = ImageFont.truetype(
-            os.path.join(asset_path, "Exo-ExtraBold.ttf"),
-            140
-        )
-        self.arena = Image.open(
-            os.path.join(asset_path, "duel", "arena.jpg")
-        )
-        self.bloods = [
-            Image.open(
-                os.path.join(asset_path, 'duel', 'bloods', fname)
-            ).convert('RGBA')
-            for fname in os.listdir(
-                os.path.join(asset_path, 'duel', 'bloods')
-            )
-        ]
-        self.glad_x_offset = 270
-        self.hp_bar = Image.open(
-            os.path.join(asset_path, "duel", "hp_bar.png")
-        )
-        self.color_bars = [
-            Image.new(
-                'RGBA',
-                (134, 728),
-                color=(254, 0, 0, 255)   # RED_BAR
-            ),
-            Image.new(
-                'RGBA',
-                (134, 728),
-                color=(254, 240, 0, 255)   # YELLOW_BAR
-            ),
-            Image.new(
-                'RGBA',
-                (134, 728),
-                color=(60, 254, 0, 255)   # GREEN_BAR
-            )
-        ]
+        self.assets = DuelAssets.load(asset_path)
 
     def get(
         self, gladiators: List[Gladiator]
@@ -309,13 +546,94 @@ class GladitorMatchHandler(AssetGenerator):
         :return: The image and the damages dealt.
         :rtype: Tuple[:class:`PIL.Image.Image`, int, int]
         """
-        canvas = self.__prepare_arena([
-            glad.owner.name
-            for glad in gladiators
-        ])
+        yield from self.__rounds(
+            [glad.owner.name for glad in gladiators],
+            [glad.image for glad in gladiators]
+        )
+
+    def get_rounds(
+        self, players: List[str],
+        sprites: List[Image.Image]
+    ) -> List[Tuple[Image.Image, int, int]]:
+        """Plays out a whole duel match between Gladiators.
+        Unlike :meth:`get`, this only needs picklable arguments,
+        so that it can run in the render pool.
+
+        :param players: The names of the gladiator owners.
+        :type players: List[str]
+        :param sprites: The images of the gladiators.
+        :type sprites: List[:class:`PIL.Image.Image`]
+        :return: The image and the damages dealt, for every round.
+        :rtype: List[Tuple[:class:`PIL.Image.Image`, int, int]]
+        """
+        return list(self.__rounds(players, sprites))
+
+    def get_replay(
+        self, players: List[str],
+        sprites: List[Image.Image],
+        fmt: str = "WEBP", scale: float = 0.5,
+        colors: int = 128, duration: int = 3000
+    ) -> Tuple[bytes, bytes, List[Tuple[int, int]]]:
+        """Plays out a whole duel match between Gladiators, as a
+        single animated replay instead of an image per round.
+
+        The frames are downscaled and, for GIF, share a reduced
+        palette. Both formats only store what changes between frames.
+
+        :param players: The names of the gladiator owners.
+        :type players: List[str]
+        :param sprites: The images of the gladiators.
+        :type sprites: List[:class:`PIL.Image.Image`]
+        :param fmt: Either WEBP or GIF., default is WEBP.
+        :type fmt: str
+        :param scale: The scale of the replay frames., default is 0.5.
+        :type scale: float
+        :param colors: The palette size for GIF., default is 128.
+        :type colors: int
+        :param duration: Milliseconds per frame., default is 3000.
+        :type duration: int
+        :return: The JPEG of the starting arena, the replay,
+            and the damages dealt in every round.
+        :rtype: Tuple[bytes, bytes, List[Tuple[int, int]]]
+        """
+
+        # pylint: disable=too-many-locals
+
+        rounds = self.__rounds(players, sprites)
+        start = next(rounds)[0]
+        size = (int(start.width * scale), int(start.height * scale))
+        frames = [start.resize(size)]
+        damages = []
+        for img, dmg1, dmg2 in rounds:
+            frames.append(img.resize(size))
+            damages.append((dmg1, dmg2))
+        start_byio = BytesIO()
+        start.save(start_byio, "JPEG")
+        replay_byio = BytesIO()
+        if fmt.upper() == "GIF":
+            palette = frames[-1].quantize(colors=colors)
+            frames = [
+                frame.quantize(palette=palette)
+                for frame in frames
+            ]
+            options = {"optimize": True, "disposal": 1}
+        else:
+            options = {"quality": 75, "method": 4, "loop": 1}
+        frames[0].save(
+            replay_byio, fmt.upper(),
+            save_all=True, append_images=frames[1:],
+            duration=duration, **options
+        )
+        return start_byio.getvalue(), replay_byio.getvalue(), damages
+
+    def __rounds(
+        self, players: List[str],
+        sprites: List[Image.Image]
+    ) -> Generator[Tuple[Image.Image, int, int], None, None]:
+        canvas = self.__prepare_arena(players)
         old_hp1 = old_hp2 = 300
         for (glad1, hp1), (glad2, hp2) in zip(
-            self.__fight(gladiators[0]), self.__fight(gladiators[1])
+            self.__fight(sprites[0]), self.__fight(sprites[1])
         ):
             canvas.paste(glad1, (500, 675), glad1)
             canvas.paste(glad2, (2340, 675), glad2)
@@ -345,7 +663,7 @@ class GladitorMatchHandler(AssetGenerator):
             )
         gladiator_sprite.paste(blood, pos, blood)
 
-    def __fight(self, gladiator: Gladiator) -> Tuple[Image.Image, int]:
+    def __fight(self, sprite: Image.Image) -> Tuple[Image.Image, int]:
         # sourcery skip: use-named-expression
         """
         Makes the provider gladiator take damage and returns
@@ -354,11 +672,11 @@ class GladitorMatchHandler(AssetGenerator):
         fresh = True
         if fresh:
             fresh = False
-            glad = gladiator.image
-            glad.paste(self.hp_bar, (0, 0), self.hp_bar)
+            glad = sprite.copy()
+            glad.paste(self.assets.hp_bar, (0, 0), self.assets.hp_bar)
             hitpoints = 300
             fresh_glad = glad.copy()
-            green_bar = self.color_bars[-1]
+            green_bar = self.assets.color_bars[-1]
             fresh_glad.paste(green_bar, (833, 187), green_bar)
             yield fresh_glad, 300
         while hitpoints >= 0:
@@ -372,7 +690,7 @@ class GladitorMatchHandler(AssetGenerator):
         """
         Returns corresponding blood image for the damage done.
         """
-        return self.bloods[int(damage // 50)]
+        return self.assets.bloods[int(damage // 50)]
 
     @staticmethod
     def __get_damage():
@@ -390,22 +708,22 @@ class GladitorMatchHandler(AssetGenerator):
         """
         Sets up the initial arena.
         """
-        canvas = self.arena.copy()
+        canvas = self.assets.arena.copy()
         board = ImageDraw.Draw(canvas)
         gn_pad1, gn_pad2 = [
-            int((1000 - self.font.getsize(plyr)[0]) / 2)
+            int((1000 - self.assets.font.getsize(plyr)[0]) / 2)
             for plyr in players
         ]
         board.text(
             (500 + gn_pad1, 463),
             players[0],
-            font=self.font,
+            font=self.assets.font,
             fill=(255, 255, 255)
         )
         board.text(
             (2340 + gn_pad2, 463),
             players[1],
-            font=self.font,
+            font=self.assets.font,
             fill=(255, 255, 255)
         )
         return canvas
@@ -417,7 +735,7 @@ class GladitorMatchHandler(AssetGenerator):
         bar_ht = int((728 / 300) * hitpoints)
         final_glad = gladiator
         if bar_ht > 0:
-            clrbar = self.color_bars[int((hitpoints / 300) * 3)].resize(
+            clrbar = self.assets.color_bars[int((hitpoints / 300) * 3)].resize(
                     (134, bar_ht)
                 )
             final_glad = gladiator.copy()
@@ -425,30 +743,123 @@ class GladitorMatchHandler(AssetGenerator):
         return final_glad
 
 
+@dataclass(frozen=True)
+class RankCardTemplate:
+    """
+    A Rank Card template, pre-scaled to the output resolution.
+    The layout is defined in the coordinates of the original template,
+    and mapped onto the scaled one with :meth:`point` and :meth:`length`.
+    """
+    base: Image.Image
+    hexagons: Dict[str, Image.Image]
+    scale: float
+    origin: Tuple[int, int]
+
+    @staticmethod
+    def build(
+        base: Image.Image, hexagons: Dict[str, Image.Image],
+        size: Tuple[int, int], crop: Optional[Tuple[int, ...]] = None
+    ) -> RankCardTemplate:
+        """Crops and scales the template images to the output size.
+
+        :param base: The rank card template.
+        :type base: :class:`PIL.Image.Image`
+        :param hexagons: The rank hexagons, same size as the template.
+        :type hexagons: Dict[str, :class:`PIL.Image.Image`]
+        :param size: The size of the rendered rank card.
+        :type size: Tuple[int, int]
+        :param crop: The region of the template to keep., default is all.
+        :type crop: Optional[Tuple[int, int, int, int]]
+        :return: The scaled template.
+        :rtype: :class:`RankCardTemplate`
+        """
+        crop = crop or (0, 0, *base.size)
+
+        def fit(img: Image.Image) -> Image.Image:
+            return img.convert('RGBA').crop(crop).resize(
+                size, Image.ANTIALIAS
+            )
+
+        return RankCardTemplate(
+            base=fit(base),
+            hexagons={
+                name: fit(hexagon)
+                for name, hexagon in hexagons.items()
+            },
+            scale=size[0] / (crop[2] - crop[0]),
+            origin=crop[:2]
+        )
+
+    def length(self, value: float) -> int:
+        """Scales a length from the original template.
+
+        :param value: The length in the original template.
+        :type value: float
+        :return: The length in the scaled template.
+        :rtype: int
+        """
+        return round(value * self.scale)
+
+    def point(self, pos: Tuple[int, int]) -> Tuple[int, int]:
+        """Maps a position from the original template.
+
+        :param pos: The position in the original template.
+        :type pos: Tuple[int, int]
+        :return: The position in the scaled template.
+        :rtype: Tuple[int, int]
+        """
+        return (
+            self.length(pos[0] - self.origin[0]),
+            self.length(pos[1] - self.origin[1])
+        )
+
+
 class LeaderBoardGenerator(AssetGenerator):
     """
     Leaderboard Image Generation Class
+
+    The templates are scaled down once on load, to the size at which
+    they are finally displayed, so the rank cards are drawn directly
+    at the output resolution.
+
+    :param asset_path: The path to the assets folder.
+    :type asset_path: str
+    :param max_fetches: Max avatars downloaded in parallel., default is 4.
+    :type max_fetches: int
     """
-    def __init__(self, asset_path: str = "assets"):
+    #: Top left corners of the rank cards in the scaled leaderboard.
+    card_positions = [
+        (20, 217), (685, 217),
+        (20, 475), (685, 475)
+    ]
+
+    def __init__(self, asset_path: str = "assets", max_fetches: int = 4):
         super().__init__(asset_path)
-        self.leaderboard = Image.open(
-            os.path.join(
-                asset_path, "basecards",
-                "leaderboard", "lb.jpg"
+        lb_path = os.path.join(asset_path, "basecards", "leaderboard")
+        with Image.open(os.path.join(lb_path, "lb.jpg")) as leaderboard:
+            self.leaderboard = leaderboard.resize(
+                (leaderboard.size[0] // 2, leaderboard.size[1] // 2),
+                Image.ANTIALIAS
             )
-        )
-        self.rankcard = Image.open(
-            os.path.join(
-                asset_path, "basecards",
-                "leaderboard", "rankcard.png"
+        hexagons = {}
+        for hexagon in ["gold", "silver", "bronze", "black"]:
+            with Image.open(
+                os.path.join(lb_path, "hexagons", f"{hexagon}.png")
+            ) as img:
+                hexagons[hexagon] = img.convert('RGBA')
+        with Image.open(os.path.join(lb_path, "rankcard.png")) as img:
+            self.rankcard = RankCardTemplate.build(
+                img, hexagons, (1280, 530)
             )
-        )
-        self.rankcard_no_head = Image.open(
-            os.path.join(
-                asset_path, "basecards",
-                "leaderboard", "rankcard_no_heading.png"
+        with Image.open(
+            os.path.join(lb_path, "rankcard_no_heading.png")
+        ) as img:
+            self.rankcard_no_head = RankCardTemplate.build(
+                img, hexagons, (640, 218),
+                crop=(0, 70, 1920, 725)
             )
-        )
+        self.max_fetches = max_fetches
+        self._fetch_sem: Optional[asyncio.Semaphore] = None
 
     # pylint: disable=invalid-overridden-method
     async def get(
@@ -456,6 +867,8 @@ class LeaderBoardGenerator(AssetGenerator):
         data: Dict
     ) -> Image.Image:
         """Returns the leaderboard image.
+        The avatars are fetched concurrently and the compositing
+        runs in the :class:`~scripts.helpers.renderer.RenderService`.
 
         :param ctx: The PokeGambler client object.
         :type ctx: :class:`bot.PokeGambler`
@@ -464,19 +877,61 @@ class LeaderBoardGenerator(AssetGenerator):
         :return: The leaderboard image.
         :rtype: :class:`PIL.Image.Image`
         """
-        poslist = [
-            (41, 435), (1371, 435),
-            (41, 950), (1371, 950)
-        ]
+        with LineTimer(ctx.logger, "Leaderboard Fetch Avatars"):
+            avatars = await asyncio.gather(*[
+                self.fetch_avatar(ctx, user_data["user_id"])
+                for user_data in data
+            ])
+        with LineTimer(ctx.logger, "Leaderboard Composite"):
+            return await ctx.renderer.render(
+                LeaderBoardGenerator, "compose", data, avatars
+            )
+
+    def compose(
+        self, data: List[Dict],
+        avatars: List[Image.Image]
+    ) -> Image.Image:
+        """Composites the leaderboard image from the rank cards.
+
+        :param data: The data to be used to generate the leaderboard.
+        :type data: List[Dict]
+        :param avatars: The avatars of the users in data.
+        :type avatars: List[:class:`PIL.Image.Image`]
+        :return: The leaderboard image.
+        :rtype: :class:`PIL.Image.Image`
+        """
         leaderboard = self.leaderboard.copy()
-        for idx, user_data in enumerate(data):
-            rankcard = await self.get_rankcard(ctx, data=user_data)
-            leaderboard.paste(rankcard, poslist[idx])
-        leaderboard = leaderboard.resize(
-            (int(leaderboard.size[0] / 2), int(leaderboard.size[1] / 2))
-        )
+        for pos, user_data, avatar in zip(
+            self.card_positions, data, avatars
+        ):
+            rankcard = self.compose_rankcard(user_data, avatar)
+            leaderboard.paste(rankcard, pos)
         return leaderboard
 
+    async def fetch_avatar(
+        self, ctx: PokeGambler,
+        user_id: str
+    ) -> Image.Image:
+        """Fetches the avatar of a user from the avatar cache,
+        with bounded parallelism for the downloads.
+
+        :param ctx: The PokeGambler client object.
+        :type ctx: :class:`bot.PokeGambler`
+        :param user_id: The ID of the user.
+        :type user_id: str
+        :return: The avatar image.
+        :rtype: :class:`PIL.Image.Image`
+        """
+        if self._fetch_sem is None:
+            self._fetch_sem = asyncio.Semaphore(self.max_fetches)
+        if user := ctx.get_user(int(user_id)):
+            asset = user.avatar or user.default_avatar
+        else:
+            user_id = ctx.user.id
+            asset = ctx.user.default_avatar
+        async with self._fetch_sem:
+            return await ctx.avatar_cache.get(user_id, asset, 512)
+
     async def get_rankcard(
         self, ctx: PokeGambler,
         data: Dict, heading: bool = False
@@ -492,6 +947,28 @@ class LeaderBoardGenerator(AssetGenerator):
         :return: The rank card image.
         :rtype: :class:`PIL.Image.Image`
         """
+        avatar = await self.fetch_avatar(ctx, data["user_id"])
+        return await ctx.renderer.render(
+            LeaderBoardGenerator, "compose_rankcard",
+            data, avatar, heading
+        )
+
+    def compose_rankcard(
+        self, data: Dict,
+        avatar: Image.Image, heading: bool = False
+    ) -> Image.Image:
+        """Composites a Rank Card from the user data and avatar.
+
+        :param data: The data to be used to generate the rank card.
+        :type data: Dict
+        :param avatar: The avatar image of the user.
+        :type avatar: :class:`PIL.Image.Image`
+        :param heading: Whether or not to include the rank card heading.
+        :type heading: bool
+        :return: The rank card image.
+        :rtype: :class:`PIL.Image.Image`
+        """
+        # Positions in the coordinates of the original 1920px template.
         pos_dict = {
             "name": {
                 "start_pos": (799, 310),
@@ -514,29 +991,22 @@ class LeaderBoardGenerator(AssetGenerator):
                 "bbox": (320, 144)
             }
         }
-        base = (
-            self.rankcard.copy()
-            if heading else self.rankcard_no_head.copy()
-        )
+        template = self.rankcard if heading else self.rankcard_no_head
+        base = template.base.copy()
         canvas = ImageDraw.Draw(base)
         for key, pos in pos_dict.items():
             txt = str(data[key])
             self.imprint_text(
                 canvas, txt,
-                pos["start_pos"],
-                pos["bbox"], 60
+                template.point(pos["start_pos"]),
+                tuple(template.length(side) for side in pos["bbox"]),
+                template.length(60)
             )
-        avatar_byio = BytesIO()
-        if user := ctx.get_user(int(data["user_id"])):
-            await (
-                user.avatar or user.default_avatar
-            ).with_size(512).save(avatar_byio)
-        else:
-            await ctx.user.default_avatar.with_size(512).save(avatar_byio)
-        avatar = Image.open(avatar_byio).resize(
-            (402, 402)
+        avatar_size = template.length(402)
+        avatar = avatar.resize(
+            (avatar_size, avatar_size), Image.ANTIALIAS
         ).convert('RGBA')
-        base.paste(avatar, (131, 196), avatar)
+        base.paste(avatar, template.point((131, 196)), avatar)
         if any([
             int(data["rank"]) >= 4,
             int(data["rank"]) == 0
@@ -544,21 +1014,9 @@ class LeaderBoardGenerator(AssetGenerator):
             hexagon = "black"
         else:
             hexagon = ["gold", "silver", "bronze"][int(data["rank"]) - 1]
-        hexagon = Image.open(
-            os.path.join(
-                self.asset_path, "basecards",
-                "leaderboard", "hexagons", f"{hexagon}.png"
-            )
-        )
-        rankcard = Image.alpha_composite(base, hexagon)
+        rankcard = Image.alpha_composite(base, template.hexagons[hexagon])
         if not heading:
-            rankcard = rankcard.crop(
-                (0, 70, 1920, 725)
-            ).resize(
-                (1280, 437), Image.ANTIALIAS
-            ).convert("RGB")
-        else:
-            rankcard = rankcard.resize((1280, 530), Image.ANTIALIAS)
+            rankcard = rankcard.convert("RGB")
         return rankcard
 
 
@@ -568,7 +1026,7 @@ class ProfileCardGenerator(AssetGenerator):
     """
     def __init__(self, asset_path: str = "assets"):
         super().__init__(asset_path)
-        self.font = ImageFont.truetype(
+        self.font = load_font(
             os.path.join(asset_path, "Exo-ExtraBold.ttf"),
             36
         )
@@ -697,7 +1155,7 @@ class ProfileCardGenerator(AssetGenerator):
             (50, 205),
             "BLACKLISTED",
             fill=(255, 255, 255, 255),
-            font=ImageFont.truetype(self.font.path, 130)
+            font=load_font(self.font.path, 130)
         )
         profilecard.paste(
             text_layer.rotate(-20),
@@ -714,7 +1172,7 @@ class WalletGenerator(AssetGenerator):
     def __init__(self, asset_path: str = "assets"):
         super().__init__(asset_path)
         self.asset_path = asset_path
-        self.font = ImageFont.truetype(
+        self.font = load_font(
             os.path.join(asset_path, "Exo-ExtraBold.ttf"),
             32
         )
@@ -23,7 +23,13 @@ Custom Pagination Module for Discord Embeds.
 
 from __future__ import annotations
 
-from typing import Any, Optional, TYPE_CHECKING, List
+import asyncio
+from collections import OrderedDict
+from io import BytesIO
+from typing import (
+    Any, Awaitable, Callable, List,
+    Optional, Tuple, TYPE_CHECKING
+)
 
 import discord
 
@@ -32,6 +38,12 @@ from ..base.views import BaseView
 if TYPE_CHECKING:
     from discord import Embed
 
+#: The filename and contents of the image attached to a page.
+PageAttachment = Tuple[str, bytes]
+
+#: A produced page, the embed and the optional attachment.
+Page = Tuple["Embed", Optional[PageAttachment]]
+
 
 class BidirectionalCycler:
     """
@@ -71,20 +83,122 @@ class Paginator(BaseView):
     .. tip:: Adds a :class:`discord.ui.Button` based \
         pagination to discord Embeds.
 
+    .. note::
+
+        If a producer is provided, the pages are created lazily when
+        viewed (and optionally prefetched), instead of using embeds.
+        The image of such a page is attached to the paginated message
+        itself, and swapped whenever the page changes.
+
     :param embeds: The list of embeds to paginate.
     :type embeds: List[:class:`discord.Embed`]
     :param content: The content to display in the embed.
     :type content: Optional[str]
+    :param producer: Coroutine function which creates the page at an index.
+    :type producer: Optional[Callable[[int], Awaitable[Page]]]
+    :param num_pages: The number of pages, required with a producer.
+    :type num_pages: Optional[int]
+    :param prefetch: Produce the next page while the current one is viewed?
+    :type prefetch: Optional[bool]
+    :param max_cached: Number of produced pages to keep., default is 8.
+    :type max_cached: Optional[int]
     """
 
+    # pylint: disable=too-many-arguments, too-many-instance-attributes
+
     def __init__(
         self, embeds: List[Embed],
-        content: Optional[str] = None,
+        content: Optional[str] = None, *,
+        producer: Optional[Callable[[int], Awaitable[Page]]] = None,
+        num_pages: Optional[int] = None,
+        prefetch: Optional[bool] = True,
+        max_cached: Optional[int] = 8,
         **kwargs
     ):
         super().__init__(timeout=None)
         self.embeds = BidirectionalCycler(embeds)
         self.content = content
+        self.producer = producer
+        self.num_pages = num_pages or len(embeds)
+        self.prefetch = prefetch
+        self._cursor = 0
+        self.max_cached = max(max_cached, 2)
+        # Least recently viewed pages come first.
+        self._pages: OrderedDict[int, asyncio.Task] = OrderedDict()
+
+    @staticmethod
+    def get_files(page: Page) -> List[discord.File]:
+        """Gets the files to attach for a page.
+        A fresh File is created every time, since they can be sent once.
+
+        :param page: The produced page.
+        :type page: Page
+        :return: The files to attach, empty if the page has no image.
+        :rtype: List[:class:`discord.File`]
+        """
+        if page[1] is None:
+            return []
+        fname, data = page[1]
+        return [discord.File(BytesIO(data), fname)]
+
+    async def get_page(self, idx: int) -> Page:
+        """Gets the page at the index from the producer.
+        Pages are produced only once and reused on revisits,
+        as long as they stay within the last max_cached pages.
+
+        :param idx: The index of the page.
+        :type idx: int
+        :return: The page at the index.
+        :rtype: Page
+        """
+        if idx not in self._pages:
+            self.__remember(idx)
+        self._pages.move_to_end(idx)
+        try:
+            return await self._pages[idx]
+        except Exception:
+            # Allow the page to be retried on the next visit.
+            self._pages.pop(idx, None)
+            raise
+
+    def prefetch_next(self, idx: int):
+        """Starts producing the page after the index in the background.
+
+        :param idx: The index of the page being viewed.
+        :type idx: int
+        """
+        nxt = (idx + 1) % self.num_pages
+        if self.prefetch and nxt not in self._pages:
+            self.__remember(nxt)
+
+    def __remember(self, idx: int):
+        task = asyncio.create_task(self.producer(idx))
+        task.add_done_callback(self.__retrieve_exception)
+        self._pages[idx] = task
+        while len(self._pages) > self.max_cached:
+            _, evicted = self._pages.popitem(last=False)
+            evicted.cancel()
+
+    @staticmethod
+    def __retrieve_exception(task: asyncio.Task):
+        # Prefetched pages might never be awaited, so mark their
+        # failures as retrieved. Visited pages still raise them.
+        if not task.cancelled():
+            task.exception()
+
+    async def _turn_page(
+        self, interaction: discord.Interaction,
+        step: int
+    ):
+        self._cursor = (self._cursor + step) % self.num_pages
+        await interaction.response.defer()
+        page = await self.get_page(self._cursor)
+        await interaction.message.edit(
+            embed=page[0],
+            content=self.content,
+            attachments=self.get_files(page)
+        )
+        self.prefetch_next(self._cursor)
 
     @discord.ui.button(label='👈')
     async def prev(
@@ -99,6 +213,9 @@ class Paginator(BaseView):
         :param interaction: The interaction that triggered this view.
         :type interaction: :class:`discord.Interaction`
         """
+        if self.producer:
+            await self._turn_page(interaction, -1)
+            return
         await interaction.response.edit_message(
             embed=self.embeds.backward(),
             content=self.content
@@ -117,6 +234,9 @@ class Paginator(BaseView):
         :param interaction: The interaction that triggered this view.
         :type interaction: :class:`discord.Interaction`
         """
+        if self.producer:
+            await self._turn_page(interaction, 1)
+            return
         await interaction.response.edit_message(
             embed=self.embeds.forward(),
             content=self.content
@@ -19,9 +19,13 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 RestructuredText and Parameter parsers
 """
 
+from __future__ import annotations
+
 import re
+from copy import deepcopy
+from dataclasses import dataclass, field
 from functools import cached_property
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from ..base.enums import OptionTypes
 
@@ -447,3 +451,94 @@ class CustomRstParser:
             self.sections[-1].children.append(
                 self.directives[-1]
             )
+
+
+@dataclass(frozen=True)
+class CommandSchema:
+    """
+    The slash command signature of a command, compiled once from its
+    docstring, so that the interactions and the sync don't need to
+    parse the docstring again.
+    """
+    #: The name of the command, without the cmd\_ prefix.
+    name: str
+    #: The description shown in the slash command menu.
+    description: str
+    #: The parsed options, with the required ones first.
+    options: Tuple[Dict[str, Any], ...] = ()
+    #: The autocomplete callbacks, keyed by the option name.
+    autocomplete: Dict[str, Callable] = field(default_factory=dict)
+
+    @classmethod
+    def from_command(cls, command: Callable) -> CommandSchema:
+        """Compiles the schema of a command from its docstring.
+
+        :param command: The command to compile.
+        :type command: Callable
+        :return: The compiled schema.
+        :rtype: :class:`CommandSchema`
+        """
+        description = command.__doc__.split("\n")[0]
+        with CustomRstParser() as rst_parser:
+            rst_parser.parse(command.__doc__)
+            meta = rst_parser.meta
+            options = rst_parser.parsed_params
+        if len(meta.description) <= 100:
+            description = meta.description
+        return cls(
+            name=command.__name__.replace("cmd_", "", 1),
+            description=description,
+            options=tuple(
+                sorted(options, key=lambda opt: -opt['required'])
+            ),
+            autocomplete=getattr(command, "autocomplete", {})
+        )
+
+    @cached_property
+    def param_names(self) -> List[str]:
+        """Returns the names of the options.
+
+        :return: The option names.
+        :rtype: List[str]
+        """
+        return [opt['name'] for opt in self.options]
+
+    @cached_property
+    def params(self) -> Dict[str, Dict[str, Any]]:
+        """Returns the options in the form the registered slash
+        commands report them, for comparison during the sync.
+
+        :return: The set fields of every option, except the default.
+        :rtype: Dict[str, Dict[str, Any]]
+        """
+        return {
+            opt['name']: {
+                key: val
+                for key, val in opt.items()
+                if all([
+                    val is not None,
+                    # Fix for Discord API not supporting Default option
+                    key != 'default'
+                ])
+            }
+            for opt in self.options
+        }
+
+    def to_dict(self, local: Optional[bool] = False) -> Dict[str, Any]:
+        """Converts the schema into a slash command payload.
+
+        :param local: Whether to use local or official server.
+        :type local: Optional[bool]
+        :return: Dictionary representation of the command.
+        :rtype: Dict[str, Any]
+        """
+        options = deepcopy(list(self.options))
+        # Fix for Discord API not supporting Default Option
+        for option in options:
+            option.pop('default', None)
+        return {
+            "name": f"{self.name}_" if local else self.name,
+            "description": self.description,
+            "type": 1,
+            "options": options
+        }
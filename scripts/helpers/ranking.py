@@ -0,0 +1,196 @@
+"""
+PokeGambler - A Pokemon themed gambling bot for Discord.
+Copyright (C) 2021 Harshith Thota
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as
+published by the Free Software Foundation, either version 3 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+----------------------------------------------------------------------------
+
+Order Statistics Module for fast Rank lookups.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left, insort
+from typing import Any, Iterator, List, Optional
+
+
+class RankIndex:
+    """
+    A sorted collection of unique keys which supports rank lookups.
+    The keys are stored in sorted chunks, with a Fenwick tree over the
+    chunk sizes, so that both :meth:`rank` and locating the start of
+    :meth:`islice` are O(log n).
+
+    :param load: The preferred size of a chunk., default is 512.
+    :type load: Optional[int]
+    """
+
+    def __init__(self, load: Optional[int] = 512):
+        self._load = load
+        self._chunks: List[List[Any]] = []
+        self._maxes: List[Any] = []
+        self._tree: List[int] = [0]
+        self._len = 0
+
+    def __contains__(self, key: Any) -> bool:
+        pos = bisect_left(self._maxes, key)
+        if pos == len(self._chunks):
+            return False
+        chunk = self._chunks[pos]
+        idx = bisect_left(chunk, key)
+        return idx < len(chunk) and chunk[idx] == key
+
+    def __iter__(self) -> Iterator[Any]:
+        for chunk in self._chunks:
+            yield from chunk
+
+    def __len__(self) -> int:
+        return self._len
+
+    def add(self, key: Any):
+        """Adds a key to the index.
+
+        :param key: The key to add.
+        :type key: Any
+        """
+        self._len += 1
+        if not self._chunks:
+            self._chunks.append([key])
+            self._maxes.append(key)
+            self._build_tree()
+            return
+        pos = bisect_left(self._maxes, key)
+        if pos == len(self._chunks):
+            pos -= 1
+            self._chunks[pos].append(key)
+            self._maxes[pos] = key
+        else:
+            insort(self._chunks[pos], key)
+        chunk = self._chunks[pos]
+        if len(chunk) > 2 * self._load:
+            self._chunks[pos:pos + 1] = [
+                chunk[:self._load], chunk[self._load:]
+            ]
+            self._maxes[pos:pos + 1] = [
+                chunk[self._load - 1], chunk[-1]
+            ]
+            self._build_tree()
+        else:
+            self._tree_add(pos, 1)
+
+    def clear(self):
+        """
+        Removes all the keys.
+        """
+        self._chunks.clear()
+        self._maxes.clear()
+        self._tree = [0]
+        self._len = 0
+
+    def discard(self, key: Any):
+        """Removes a key from the index, if it exists.
+
+        :param key: The key to remove.
+        :type key: Any
+        """
+        pos = bisect_left(self._maxes, key)
+        if pos == len(self._chunks):
+            return
+        chunk = self._chunks[pos]
+        idx = bisect_left(chunk, key)
+        if idx == len(chunk) or chunk[idx] != key:
+            return
+        del chunk[idx]
+        self._len -= 1
+        if not chunk:
+            del self._chunks[pos]
+            del self._maxes[pos]
+            self._build_tree()
+        else:
+            self._maxes[pos] = chunk[-1]
+            self._tree_add(pos, -1)
+
+    def islice(
+        self, start: int = 0,
+        stop: Optional[int] = None
+    ) -> Iterator[Any]:
+        """Iterates over the keys from position start till stop.
+
+        :param start: The position of the first key., default is 0.
+        :type start: int
+        :param stop: The position to stop at., default is the end.
+        :type stop: Optional[int]
+        :return: An iterator over the keys in the range.
+        :rtype: Iterator[Any]
+        """
+        stop = self._len if stop is None else min(stop, self._len)
+        if start >= stop:
+            return
+        pos, idx = self._locate(start)
+        remaining = stop - start
+        while remaining > 0:
+            chunk = self._chunks[pos][idx:idx + remaining]
+            yield from chunk
+            remaining -= len(chunk)
+            pos, idx = pos + 1, 0
+
+    def rank(self, key: Any) -> int:
+        """Returns the position of a key in the index.
+
+        :param key: The key to look up.
+        :type key: Any
+        :return: The 0-based position, -1 if the key doesn't exist.
+        :rtype: int
+        """
+        pos = bisect_left(self._maxes, key)
+        if pos == len(self._chunks):
+            return -1
+        chunk = self._chunks[pos]
+        idx = bisect_left(chunk, key)
+        if idx == len(chunk) or chunk[idx] != key:
+            return -1
+        return self._prefix(pos) + idx
+
+    def _build_tree(self):
+        num_chunks = len(self._chunks)
+        self._tree = [0] * (num_chunks + 1)
+        for pos, chunk in enumerate(self._chunks, start=1):
+            self._tree[pos] += len(chunk)
+            parent = pos + (pos & -pos)
+            if parent <= num_chunks:
+                self._tree[parent] += self._tree[pos]
+
+    def _locate(self, index: int):
+        pos = 0
+        step = 1 << (len(self._tree) - 1).bit_length()
+        while step:
+            nxt = pos + step
+            if nxt < len(self._tree) and self._tree[nxt] <= index:
+                pos = nxt
+                index -= self._tree[nxt]
+            step >>= 1
+        return pos, index
+
+    def _prefix(self, pos: int) -> int:
+        total = 0
+        while pos > 0:
+            total += self._tree[pos]
+            pos -= pos & -pos
+        return total
+
+    def _tree_add(self, pos: int, delta: int):
+        pos += 1
+        while pos < len(self._tree):
+            self._tree[pos] += delta
+            pos += pos & -pos
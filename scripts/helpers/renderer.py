@@ -0,0 +1,269 @@
+"""
+PokeGambler - A Pokemon themed gambling bot for Discord.
+Copyright (C) 2021 Harshith Thota
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as
+published by the Free Software Foundation, either version 3 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+----------------------------------------------------------------------------
+
+Render Service Module for drawing images off the event loop.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import (
+    Executor, ProcessPoolExecutor, ThreadPoolExecutor
+)
+from io import BytesIO
+from typing import (
+    Any, Callable, Deque, Dict,
+    Iterable, Optional, Type, Union
+)
+
+import discord
+from PIL import Image
+
+# Generator instances owned by the current pool worker.
+_WORKER = threading.local()
+
+
+def _get_generator(cls: Type, asset_path: str) -> Any:
+    generators = getattr(_WORKER, "generators", None)
+    if generators is None:
+        generators = _WORKER.generators = {}
+    if cls not in generators:
+        generators[cls] = cls(asset_path)
+    return generators[cls]
+
+
+def _preload(asset_path: str, generators: Iterable[Type]):
+    for cls in generators:
+        _get_generator(cls, asset_path)
+
+
+def _call_generator(
+    cls: Type, asset_path: str,
+    method: str, args: tuple, kwargs: dict
+) -> Any:
+    generator = _get_generator(cls, asset_path)
+    return getattr(generator, method)(*args, **kwargs)
+
+
+def encode_image(img: Image.Image, ext: str = "JPEG") -> bytes:
+    """Encodes a PIL Image into the bytes of the given format.
+
+    :param img: The PIL Image to be encoded.
+    :type img: :class:`PIL.Image.Image`
+    :param ext: The format of the image., default is JPEG.
+    :type ext: str
+    :return: The encoded image.
+    :rtype: bytes
+    """
+    byio = BytesIO()
+    img.save(byio, ext)
+    return byio.getvalue()
+
+
+class RenderService:
+    """
+    Runs the image generation in a thread or a process pool,
+    so that the event loop stays responsive while drawing.
+
+    Every worker builds its own copy of the generators (and thus
+    preloads their assets) once, and reuses it for all the renders.
+    At most max_queue renders are pending at once, the rest wait
+    for a free slot.
+
+    .. note::
+
+        In process mode, the arguments and the results must be
+        picklable, so pass plain data and images instead of models.
+
+    :param asset_path: The path to the assets folder.
+    :type asset_path: str
+    :param mode: Either "thread" or "process"., default is thread.
+    :type mode: str
+    :param max_workers: The size of the pool., default is 2.
+    :type max_workers: int
+    :param max_queue: Max renders pending at once., default is 32.
+    :type max_queue: int
+    :param preload: The generator classes to preload in every worker.
+    :type preload: Optional[Iterable[Type]]
+    :param window: Number of latest timings kept per label.
+    :type window: int
+    """
+
+    # pylint: disable=too-many-arguments, too-many-instance-attributes
+
+    def __init__(
+        self, asset_path: str = "assets", *,
+        mode: str = "thread", max_workers: int = 2,
+        max_queue: int = 32, preload: Optional[Iterable[Type]] = None,
+        window: int = 512
+    ):
+        if mode not in ("thread", "process"):
+            raise ValueError(f"Unknown render mode: {mode}")
+        self.asset_path = asset_path
+        self.mode = mode
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.preload = tuple(preload or ())
+        self._executor: Optional[Executor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._pending = 0
+        self._timings: Dict[str, Deque[float]] = defaultdict(
+            lambda: deque(maxlen=window)
+        )
+        self._counts: Dict[str, int] = defaultdict(int)
+
+    @property
+    def depth(self) -> int:
+        """Number of renders either queued or being drawn.
+
+        :return: The current queue depth.
+        :rtype: int
+        """
+        return self._pending
+
+    @property
+    def stats(self) -> Dict[str, Dict[str, Union[int, float]]]:
+        """Latency percentiles (in ms) of the renders, per label.
+        The latency includes the time spent waiting in the queue.
+
+        :return: The count, p50, p90, p99 and max for every label.
+        :rtype: Dict[str, Dict[str, Union[int, float]]]
+        """
+        stats = {}
+        for label, timings in self._timings.items():
+            ordered = sorted(timings)
+            if not ordered:
+                continue
+            stats[label] = {
+                "count": self._counts[label],
+                **{
+                    f"p{pct}": ordered[
+                        min(len(ordered) - 1, len(ordered) * pct // 100)
+                    ]
+                    for pct in (50, 90, 99)
+                },
+                "max": ordered[-1]
+            }
+        return stats
+
+    def close(self):
+        """
+        Shuts down the worker pool.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def encode(
+        self, img: Image.Image,
+        fname: str, ext: str = "JPEG"
+    ) -> discord.File:
+        """Encodes a PIL Image into a discord File in the pool.
+
+        :param img: The PIL Image to be converted.
+        :type img: :class:`PIL.Image.Image`
+        :param fname: The filename of the file.
+        :type fname: str
+        :param ext: The extension of the file.
+        :type ext: str
+        :return: The discord File object.
+        :rtype: :class:`discord.File`
+        """
+        data = await self.encode_bytes(img, ext)
+        return discord.File(BytesIO(data), fname)
+
+    async def encode_bytes(
+        self, img: Image.Image,
+        ext: str = "JPEG"
+    ) -> bytes:
+        """Encodes a PIL Image into bytes in the pool.
+
+        :param img: The PIL Image to be encoded.
+        :type img: :class:`PIL.Image.Image`
+        :param ext: The format of the image., default is JPEG.
+        :type ext: str
+        :return: The encoded image.
+        :rtype: bytes
+        """
+        return await self.submit(
+            f"encode_{ext.lower()}", encode_image, img, ext
+        )
+
+    async def render(
+        self, generator: Type,
+        method: str, *args, **kwargs
+    ) -> Any:
+        """Calls a method of the worker's copy of a generator.
+
+        :param generator: The class of the generator.
+        :type generator: Type
+        :param method: The name of the method to call.
+        :type method: str
+        :return: Whatever the method returns.
+        :rtype: Any
+        """
+        return await self.submit(
+            f"{generator.__name__}.{method}",
+            _call_generator, generator, self.asset_path,
+            method, args, kwargs
+        )
+
+    async def submit(
+        self, label: str,
+        func: Callable, *args
+    ) -> Any:
+        """Runs a function in the pool and records its latency.
+
+        :param label: The name under which the latency is recorded.
+        :type label: str
+        :param func: The function to run.
+        :type func: Callable
+        :return: Whatever the function returns.
+        :rtype: Any
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_queue)
+        start = time.perf_counter()
+        self._pending += 1
+        try:
+            async with self._slots:
+                return await asyncio.get_running_loop().run_in_executor(
+                    self.__get_executor(), func, *args
+                )
+        finally:
+            self._pending -= 1
+            self._timings[label].append(
+                (time.perf_counter() - start) * 1000
+            )
+            self._counts[label] += 1
+
+    def __get_executor(self) -> Executor:
+        if self._executor is None:
+            pool = (
+                ThreadPoolExecutor if self.mode == "thread"
+                else ProcessPoolExecutor
+            )
+            self._executor = pool(
+                max_workers=self.max_workers,
+                initializer=_preload,
+                initargs=(self.asset_path, self.preload)
+            )
+        return self._executor
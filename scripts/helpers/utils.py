@@ -19,10 +19,13 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 Compilation of Utility Functions
 """
 
+# pylint: disable=too-many-lines
+
 from __future__ import annotations
 
 import asyncio
 import cProfile
+import hashlib
 import json
 import os
 import re
@@ -31,7 +34,7 @@ from datetime import date, datetime
 from io import BytesIO
 from typing import (
     Any, Callable, Dict, Iterable, List, Literal,
-    Optional, TYPE_CHECKING, Tuple, Union
+    Optional, TYPE_CHECKING, Union
 )
 
 from cachetools import Cache, TTLCache
@@ -96,56 +99,138 @@ class LineTimer:
             )
 
 
-class ImageCacher:
+class CacheStats:  # pylint: disable=too-few-public-methods
+    """
+    Mixin which counts the hits and misses of a cache.
     """
-    A TTL Cache for images created in a command for a user.
+    hits: int = 0
+    misses: int = 0
 
-    :param user: The user to cache images for.
-    :type user: :class:`discord.Member`
-    :param kwargs: Additional Keyword Arguments.
-    :type kwargs: Dict[str, Any]
+    def get_stats(self, cache: Cache) -> Dict[str, Union[int, float]]:
+        """Hit/Miss statistics of the cache.
+
+        :param cache: The underlying cache.
+        :type cache: :class:`cachetools.Cache`
+        :return: The counters along with the hit ratio and size.
+        :rtype: Dict[str, Union[int, float]]
+        """
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits / total) if total else 0.0,
+            "size": len(cache),
+            "maxsize": cache.maxsize
+        }
+
+
+class RenderCache(CacheStats):
+    """
+    A bounded cache for the images rendered by commands, keyed by
+    a hash of the exact inputs used for rendering. Stores both the
+    uploaded attachment URL and the encoded image bytes.
+
+    :param maxsize: The maximum number of cached images.
+    :type maxsize: int
+    :param ttl: Seconds after which an image is dropped.
+    :type ttl: float
+    :param url_ttl: Seconds for which an uploaded URL is reused,
+        after which the bytes are uploaded again.
+    :type url_ttl: float
     """
-    def __init__(self, user: discord.Member, **kwargs):
-        self.cache = TTLCache(maxsize=1, ttl=60)
-        self.user = user
-        self.kwargs = kwargs
+    def __init__(
+        self, maxsize: int = 512,
+        ttl: float = 3600.0,
+        url_ttl: float = 600.0
+    ):
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.url_ttl = url_ttl
+        self.owners: Dict[int, set] = {}
+
+    @staticmethod
+    def make_key(*inputs: Any) -> str:
+        """Hashes the render inputs into a cache key.
+
+        :param inputs: Everything that affects the rendered image.
+        :type inputs: Any
+        :return: The cache key.
+        :rtype: str
+        """
+        return hashlib.sha1(
+            json.dumps(inputs, sort_keys=True, default=str).encode()
+        ).hexdigest()
 
     @property
-    def keys(self) -> Tuple[str, Tuple[str, Any]]:
-        """Returns a hashable key for the cache.
+    def stats(self) -> Dict[str, Union[int, float]]:
+        """Hit/Miss statistics of the cache.
 
-        :return: Hashable Key
-        :rtype: Tuple[str, Tuple[str, Any]]
-        """
-        kwgs = tuple({
-            key: val
-            for key, val in self.kwargs.items()
-            if key not in ["args", "mentions", "selected_user"]
-        })
-        return (self.user.id, kwgs)
-
-    def expire(self):
+        :return: The counters along with the hit ratio and size.
+        :rtype: Dict[str, Union[int, float]]
         """
-        Expire the cache.
+        return {
+            **self.get_stats(self.cache),
+            "bytes": sum(
+                len(entry["data"])
+                for entry in self.cache.values()
+            )
+        }
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Returns the cached image for the key, if any.
+
+        :param key: The key from :meth:`make_key`.
+        :type key: str
+        :return: The url, upload time and bytes of the image.
+        :rtype: Optional[Dict[str, Any]]
         """
-        Cache.clear(self.cache)
+        entry = self.cache.get(key)
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
 
-    def register(self, img_url: str):
-        """Registers the image url to the cache.
+    def invalidate(self, user_id: int):
+        """Drops all the cached images rendered for a user.
 
-        :param img_url: The image url to register.
-        :type img_url: str
+        :param user_id: The ID of the user.
+        :type user_id: int
         """
-        self.cache[self.keys] = img_url
+        for key in self.owners.pop(user_id, ()):
+            self.cache.pop(key, None)
 
-    @property
-    def cached(self) -> Optional[str]:
-        """Returns the cached image URL if it exists.
+    def put(
+        self, key: str, user_id: int,
+        url: str, data: bytes
+    ):
+        """Caches an uploaded image.
 
-        :return: The cached image URL.
-        :rtype: Optional[str]
+        :param key: The key from :meth:`make_key`.
+        :type key: str
+        :param user_id: The ID of the user the image belongs to.
+        :type user_id: int
+        :param url: The URL of the uploaded attachment.
+        :type url: str
+        :param data: The encoded image.
+        :type data: bytes
         """
-        return self.cache.get(self.keys)
+        self.cache[key] = {
+            "url": url,
+            "uploaded": time.time(),
+            "data": data
+        }
+        self.__prune_owners()
+        self.owners.setdefault(user_id, set()).add(key)
+
+    def __prune_owners(self):
+        # Forget the keys which were evicted or expired in the meantime,
+        # along with the users who have none left.
+        self.cache.expire()
+        live = set(self.cache.keys())
+        for user_id in list(self.owners):
+            self.owners[user_id] &= live
+            if not self.owners[user_id]:
+                del self.owners[user_id]
 
 
 # pylint: disable=too-few-public-methods
@@ -217,6 +302,47 @@ class EmbedFieldsConfig:
         return self.field_config_map.get(key, self.FieldConfig(self))
 
 
+async def coalesce(
+    inflight: Dict[Any, asyncio.Future],
+    key: Any, func: Callable, *args
+) -> Any:
+    """Awaits a coroutine function once per key, the concurrent calls
+    with the same key wait for that result instead of repeating it.
+
+    .. note::
+
+        If the first call gets cancelled, the waiting calls are
+        cancelled as well, instead of waiting forever.
+
+    :param inflight: The futures of the calls in progress, by key.
+    :type inflight: Dict[Any, :class:`asyncio.Future`]
+    :param key: The key identifying the call.
+    :type key: Any
+    :param func: The coroutine function to call.
+    :type func: Callable
+    :return: Whatever the coroutine function returns.
+    :rtype: Any
+    """
+    if key in inflight:
+        return await asyncio.shield(inflight[key])
+    future = inflight[key] = asyncio.get_running_loop().create_future()
+    try:
+        result = await func(*args)
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as excp:
+        future.set_exception(excp)
+        # Mark as retrieved, in case nobody else was waiting on it.
+        future.exception()
+        raise
+    else:
+        future.set_result(result)
+    finally:
+        inflight.pop(key, None)
+    return result
+
+
 def dedent(message: str) -> str:
     """Strips whitespaces from the left of every line.
 
@@ -0,0 +1,85 @@
+"""
+PokeGambler - A Pokemon themed gambling bot for Discord.
+Copyright (C) 2021 Harshith Thota
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as
+published by the Free Software Foundation, either version 3 of the
+License, or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+----------------------------------------------------------------------------
+
+Tests for compiling the slash command schemas of the Commands modules.
+"""
+
+import importlib
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from scripts.base.models import DuelActionsModel
+from scripts.commands.basecommand import Commands
+from scripts.helpers.dispatch import CommandIndex
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COMMANDS_DIR = os.path.join(ROOT, "scripts", "commands")
+MODULE_TYPES = sorted(
+    fname.replace("commands.py", "")
+    for fname in os.listdir(COMMANDS_DIR)
+    if fname.endswith("commands.py") and fname != "basecommand.py"
+)
+
+
+@pytest.fixture(name="ctx")
+def fixture_ctx(monkeypatch):
+    """The PokeGambler attributes used while building the modules.
+    The duel actions are given here, instead of read from the DB.
+    """
+    actions = [
+        {"level": "Normal", "action": "<g1> pokes <g2> in the eye."},
+        {"level": "Critical", "action": "<g1> aims for vitals."}
+    ]
+    monkeypatch.setattr(
+        DuelActionsModel, "get_actions",
+        classmethod(lambda cls: actions)
+    )
+    return SimpleNamespace(
+        logger=None,
+        assets_path=os.path.join(ROOT, "data", "assets"),
+        gamble_limit=3,
+        command_index=CommandIndex()
+    )
+
+
+@pytest.mark.parametrize("module_type", MODULE_TYPES)
+def test_compile_schemas(ctx, module_type):
+    """Every documented command of a module gets a schema,
+    and compiling them doesn't toggle the module."""
+    module = importlib.import_module(
+        f"scripts.commands.{module_type}commands"
+    )
+    cmd_obj: Commands = getattr(
+        module, f"{module_type.title()}Commands"
+    )(ctx=ctx)
+    cmd_obj.compile_schemas()
+    assert cmd_obj.enabled
+    documented = {
+        getattr(cmd_obj, attr).__name__
+        for attr in dir(cmd_obj)
+        if attr.startswith("cmd_") and getattr(cmd_obj, attr).__doc__
+    }
+    assert documented
+    assert set(cmd_obj.schemas) == documented
+    for name, schema in cmd_obj.schemas.items():
+        assert schema.name == name.replace("cmd_", "", 1)
+        payload = schema.to_dict()
+        assert payload["name"] == schema.name
+        assert payload["description"]